@@ -0,0 +1,59 @@
+"""Add attendance daily fact table
+
+Revision ID: b4d2e7a1c9f3
+Revises: f8b9c3e6d2a1
+Create Date: 2025-06-02 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d2e7a1c9f3'
+down_revision = 'f8b9c3e6d2a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_daily_fact',
+    sa.Column('employee_id', sa.Uuid(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('net_minutes', sa.Float(), nullable=False),
+    sa.Column('checked_out', sa.Boolean(), nullable=False),
+    sa.Column('team_name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True),
+    sa.Column('site_location', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('employee_id', 'date')
+    )
+
+    # Backfill from existing attendance; later changes are kept in sync by the API
+    # and can be replayed with `python app/rebuild_attendance_facts.py`
+    op.execute("""
+        INSERT INTO attendance_daily_fact
+            (employee_id, date, net_minutes, checked_out, team_name, site_location, updated_at)
+        SELECT
+            a.employee_id,
+            a.date,
+            SUM(CASE WHEN a.check_out IS NOT NULL
+                THEN EXTRACT(EPOCH FROM a.check_out - a.check_in) / 60
+                     - COALESCE(a.break_duration, 0)
+                ELSE 0 END),
+            BOOL_AND(a.check_out IS NOT NULL),
+            (SELECT t.team_name FROM teamassignment t
+              WHERE t.laborer_id = a.employee_id AND t.is_active
+              ORDER BY t.assigned_date DESC LIMIT 1),
+            (SELECT t.site_location FROM teamassignment t
+              WHERE t.laborer_id = a.employee_id AND t.is_active
+              ORDER BY t.assigned_date DESC LIMIT 1),
+            timezone('utc', now())
+        FROM attendance a
+        GROUP BY a.employee_id, a.date
+    """)
+
+
+def downgrade():
+    op.drop_table('attendance_daily_fact')
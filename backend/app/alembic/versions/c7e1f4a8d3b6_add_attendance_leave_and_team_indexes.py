@@ -0,0 +1,52 @@
+"""Add attendance, leave request and team assignment indexes
+
+Revision ID: c7e1f4a8d3b6
+Revises: b4d2e7a1c9f3
+Create Date: 2025-06-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1f4a8d3b6'
+down_revision = 'b4d2e7a1c9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The unique index replaces the SELECT-then-INSERT duplicate check-in probe,
+    # so refuse to continue if duplicates already slipped through
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM (SELECT 1 FROM attendance"
+        " GROUP BY employee_id, date HAVING count(*) > 1) AS d"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} employee/day pairs have more than one attendance row; "
+            "merge them before creating ix_attendance_employee_id_date"
+        )
+
+    op.create_index('ix_attendance_employee_id_date', 'attendance', ['employee_id', 'date'], unique=True)
+    op.create_index('ix_attendance_date', 'attendance', ['date'], unique=False)
+    op.create_index('ix_attendance_daily_fact_date', 'attendance_daily_fact', ['date'], unique=False)
+    op.create_index('ix_leaverequest_supervisor_id_status', 'leaverequest', ['supervisor_id', 'status'], unique=False)
+    op.create_index('ix_leaverequest_pending_supervisor_id', 'leaverequest', ['supervisor_id'], unique=False, postgresql_where=sa.text("status = 'PENDING'"))
+    op.create_index('ix_leaverequest_employee_id_dates', 'leaverequest', ['employee_id', 'start_date', 'end_date'], unique=False)
+    op.create_index('ix_teamassignment_active_supervisor_id', 'teamassignment', ['supervisor_id'], unique=False, postgresql_where=sa.text('is_active'))
+    op.create_index('ix_teamassignment_active_laborer_id', 'teamassignment', ['laborer_id'], unique=False, postgresql_where=sa.text('is_active'))
+    op.create_index(op.f('ix_user_supervisor_id'), 'user', ['supervisor_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_supervisor_id'), table_name='user')
+    op.drop_index('ix_teamassignment_active_laborer_id', table_name='teamassignment')
+    op.drop_index('ix_teamassignment_active_supervisor_id', table_name='teamassignment')
+    op.drop_index('ix_leaverequest_employee_id_dates', table_name='leaverequest')
+    op.drop_index('ix_leaverequest_pending_supervisor_id', table_name='leaverequest')
+    op.drop_index('ix_leaverequest_supervisor_id_status', table_name='leaverequest')
+    op.drop_index('ix_attendance_daily_fact_date', table_name='attendance_daily_fact')
+    op.drop_index('ix_attendance_date', table_name='attendance')
+    op.drop_index('ix_attendance_employee_id_date', table_name='attendance')
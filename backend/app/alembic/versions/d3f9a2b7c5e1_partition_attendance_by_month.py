@@ -0,0 +1,100 @@
+"""Partition attendance by month
+
+Revision ID: d3f9a2b7c5e1
+Revises: c7e1f4a8d3b6
+Create Date: 2025-06-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f9a2b7c5e1'
+down_revision = 'c7e1f4a8d3b6'
+branch_labels = None
+depends_on = None
+
+# Partitions created past the current month; the API's partition job keeps
+# this many ahead from then on
+MONTHS_AHEAD = 3
+
+
+def create_attendance_table(**kwargs):
+    # A partitioned table's primary key must include the partition key
+    op.create_table('attendance',
+    sa.Column('check_in', sa.DateTime(), nullable=False),
+    sa.Column('check_out', sa.DateTime(), nullable=True),
+    sa.Column('break_duration', sa.Integer(), nullable=True),
+    sa.Column('location', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.Column('notes', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('employee_id', sa.Uuid(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['user.id'], ),
+    **kwargs,
+    )
+
+
+def upgrade():
+    op.drop_index('ix_attendance_date', table_name='attendance')
+    op.drop_index('ix_attendance_employee_id_date', table_name='attendance')
+    op.rename_table('attendance', 'attendance_unpartitioned')
+    op.execute('ALTER TABLE attendance_unpartitioned RENAME CONSTRAINT attendance_pkey TO attendance_unpartitioned_pkey')
+    op.execute('ALTER TABLE attendance_unpartitioned RENAME CONSTRAINT attendance_employee_id_fkey TO attendance_unpartitioned_employee_id_fkey')
+
+    create_attendance_table(postgresql_partition_by='RANGE (date)')
+    op.create_primary_key('attendance_pkey', 'attendance', ['id', 'date'])
+
+    # One partition per month from the oldest row until MONTHS_AHEAD from now,
+    # and a default one so a stray date is never rejected
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month timestamp;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST(
+                        (SELECT min(date) FROM attendance_unpartitioned),
+                        timezone('utc', now())
+                    )),
+                    date_trunc('month', timezone('utc', now()))
+                        + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF attendance FOR VALUES FROM (%L) TO (%L)',
+                    'attendance_' || to_char(month, 'YYYY_MM'),
+                    month,
+                    month + interval '1 month'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute('CREATE TABLE attendance_default PARTITION OF attendance DEFAULT')
+
+    op.execute('INSERT INTO attendance SELECT check_in, check_out, break_duration, location, notes, id, employee_id, date, created_at FROM attendance_unpartitioned')
+    op.drop_table('attendance_unpartitioned')
+
+    op.create_index('ix_attendance_employee_id_date', 'attendance', ['employee_id', 'date'], unique=True)
+    op.create_index('ix_attendance_date', 'attendance', ['date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_attendance_date', table_name='attendance')
+    op.drop_index('ix_attendance_employee_id_date', table_name='attendance')
+    op.rename_table('attendance', 'attendance_partitioned')
+    op.execute('ALTER TABLE attendance_partitioned RENAME CONSTRAINT attendance_pkey TO attendance_partitioned_pkey')
+
+    create_attendance_table()
+    op.create_primary_key('attendance_pkey', 'attendance', ['id'])
+    op.execute('INSERT INTO attendance SELECT check_in, check_out, break_duration, location, notes, id, employee_id, date, created_at FROM attendance_partitioned')
+    # Drops the partitions with it; detached ones are left alone
+    op.drop_table('attendance_partitioned')
+
+    op.create_index('ix_attendance_employee_id_date', 'attendance', ['employee_id', 'date'], unique=True)
+    op.create_index('ix_attendance_date', 'attendance', ['date'], unique=False)
@@ -0,0 +1,40 @@
+"""Add outbound email queue
+
+Revision ID: f1c6d8e2a7b4
+Revises: e5a8c1f4b9d2
+Create Date: 2025-06-30 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c6d8e2a7b4'
+down_revision = 'e5a8c1f4b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outboundemail',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('email_to', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('subject', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+    sa.Column('html_content', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'FAILED', name='outboundemailstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outboundemail_pending_next_attempt_at', 'outboundemail', ['next_attempt_at'], unique=False, postgresql_where=sa.text("status = 'PENDING'"))
+
+
+def downgrade():
+    op.drop_index('ix_outboundemail_pending_next_attempt_at', table_name='outboundemail')
+    op.drop_table('outboundemail')
+    sa.Enum(name='outboundemailstatus').drop(op.get_bind())
@@ -1,4 +1,4 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
@@ -6,11 +6,16 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
+from app.core.cache import user_cache
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import async_engine, engine
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -23,22 +28,31 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Objects stay loaded after commit: lazy refreshes would need awaiting
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def decode_token(token: str) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**payload)
     except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+
+
+def check_user(user: User | None) -> User:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -46,7 +60,52 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+# Cached per user; everything else is loaded from the database on first access
+CACHED_USER_FIELDS = ("id", "role", "is_active", "is_superuser", "supervisor_id")
+
+
+def cache_user(user: User | None) -> User | None:
+    if user:
+        user_cache.set(
+            str(user.id), {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+        )
+    return user
+
+
+def cached_user(session: Session | AsyncSession, subject: str | None) -> User | None:
+    """
+    Attach the cached user to `session` without querying it. Fields that are
+    not cached are expired and load on access (sync sessions only).
+    """
+    fields = user_cache.get(str(subject))
+    if fields is None:
+        return None
+    user: User = inspect(User).class_manager.new_instance()
+    for field, value in fields.items():
+        set_committed_value(user, field, value)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    token_data = decode_token(token)
+    user = cached_user(session, token_data.sub) or cache_user(
+        session.get(User, token_data.sub)
+    )
+    return check_user(user)
+
+
+async def get_current_user_async(session: AsyncSessionDep, token: TokenDep) -> User:
+    token_data = decode_token(token)
+    user = cached_user(session, token_data.sub) or cache_user(
+        await session.get(User, token_data.sub)
+    )
+    return check_user(user)
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
 
 
 def get_current_active_superuser(current_user: CurrentUser) -> User:
@@ -1,17 +1,38 @@
 import uuid
-from datetime import date, datetime
-from typing import Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import and_, func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Date, DateTime, Uuid, column, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
+from app import live, reports, scoping
 from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncSessionDep,
     CurrentUser,
     SessionDep,
 )
+from app.core.cache import invalidate_dashboards
+from app.core.config import settings
+from app.export import ExportFormat, export_response
 from app.models import (
     Attendance,
+    AttendanceBulkAction,
+    AttendanceBulkCreate,
+    AttendanceBulkEntry,
+    AttendanceBulkResult,
+    AttendanceBulkResults,
+    AttendanceBulkStatus,
     AttendanceCreate,
+    AttendanceDailyFact,
+    AttendanceLiveEvent,
+    AttendanceLiveTotals,
     AttendancePublic,
     AttendancesPublic,
     AttendanceUpdate,
@@ -19,66 +40,138 @@ from app.models import (
     User,
     UserRole,
 )
+from app.pagination import CountMode, count_rows, next_cursor, paginate
 
 router = APIRouter()
 
 
-@router.get("/", response_model=AttendancesPublic)
-def read_attendance_records(
+def scoped_attendance_statement(
     session: SessionDep,
     current_user: CurrentUser,
-    skip: int = 0,
-    limit: int = 100,
     employee_id: uuid.UUID | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
-) -> Any:
+) -> SelectOfScalar[Attendance]:
     """
-    Retrieve attendance records.
+    Attendance visible to the current user, with the common list filters applied.
     """
     statement = select(Attendance)
-    count_statement = select(func.count()).select_from(Attendance)
     
     # Apply filters based on user role and permissions
-    if current_user.role == UserRole.LABORER:
-        # Laborers can only see their own attendance
-        statement = statement.where(Attendance.employee_id == current_user.id)
-        count_statement = count_statement.where(Attendance.employee_id == current_user.id)
-    elif current_user.role == UserRole.SUPERVISOR:
-        # Supervisors can see their team's attendance
-        if employee_id:
-            # Check if the employee is supervised by this supervisor
-            employee = session.get(User, employee_id)
-            if not employee or employee.supervisor_id != current_user.id:
-                raise HTTPException(status_code=403, detail="Not enough permissions")
-            statement = statement.where(Attendance.employee_id == employee_id)
-            count_statement = count_statement.where(Attendance.employee_id == employee_id)
-        else:
-            # Get all supervised employees' attendance
-            supervised_stmt = select(User.id).where(User.supervisor_id == current_user.id)
-            supervised_ids = session.exec(supervised_stmt).all()
-            statement = statement.where(Attendance.employee_id.in_(supervised_ids))
-            count_statement = count_statement.where(Attendance.employee_id.in_(supervised_ids))
+    if current_user.role == UserRole.SUPERVISOR and employee_id:
+        # Check if the employee is supervised by this supervisor
+        if not scoping.is_direct_report(session, current_user.id, employee_id):
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        statement = statement.where(Attendance.employee_id == employee_id)
     else:
-        # Admin can see all attendance, optionally filtered by employee
-        if employee_id:
+        # Laborers see their own attendance, supervisors their team's, admins all
+        statement = statement.where(
+            *scoping.employee_scope(Attendance.employee_id, current_user)
+        )
+        if current_user.role == UserRole.ADMIN and employee_id:
             statement = statement.where(Attendance.employee_id == employee_id)
-            count_statement = count_statement.where(Attendance.employee_id == employee_id)
     
     # Apply date filters
     if start_date:
         statement = statement.where(Attendance.date >= start_date)
-        count_statement = count_statement.where(Attendance.date >= start_date)
     if end_date:
         statement = statement.where(Attendance.date <= end_date)
-        count_statement = count_statement.where(Attendance.date <= end_date)
     
-    # Execute queries
-    count = session.exec(count_statement).one()
-    statement = statement.offset(skip).limit(limit).order_by(Attendance.date.desc())
+    return statement
+
+
+ScopedAttendanceDep = Annotated[
+    SelectOfScalar[Attendance], Depends(scoped_attendance_statement)
+]
+
+
+def attendance_by_id(id: uuid.UUID) -> SelectOfScalar[Attendance]:
+    # The primary key is (id, date), so session.get() can't look up by id
+    return select(Attendance).where(Attendance.id == id)
+
+
+@router.get("/", response_model=AttendancesPublic)
+def read_attendance_records(
+    session: SessionDep,
+    statement: ScopedAttendanceDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = CountMode.EXACT,
+) -> Any:
+    """
+    Retrieve attendance records, newest first.
+    Pass the returned `next_cursor` as `cursor` to page without OFFSET.
+    """
+    count = count_rows(session, statement, count_mode)
+    statement = paginate(
+        statement,
+        Attendance.date,
+        Attendance.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        descending=True,
+    )
     attendance_records = session.exec(statement).all()
     
-    return AttendancesPublic(data=attendance_records, count=count)
+    return AttendancesPublic(
+        data=attendance_records,
+        count=count,
+        next_cursor=next_cursor(attendance_records, limit, "date", "id"),
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_attendance_records(
+    statement: ScopedAttendanceDep,
+    format: ExportFormat = ExportFormat.CSV,
+) -> Any:
+    """
+    Stream all matching attendance records as CSV or NDJSON, newest first.
+    Same filters and permissions as listing attendance records.
+    """
+    statement = statement.order_by(
+        col(Attendance.date).desc(), col(Attendance.id).desc()
+    )
+    return export_response(statement, AttendancePublic, format, "attendance")
+
+
+@router.get("/live", response_class=StreamingResponse)
+async def live_attendance(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Stream today's check-ins and check-outs as server-sent events, each
+    followed by the running totals. Supervisors see their team, admins see
+    all.
+    """
+    if current_user.role == UserRole.LABORER:
+        raise HTTPException(
+            status_code=403,
+            detail="Laborers cannot access attendance summaries"
+        )
+
+    # Subscribe first, so no event falls between the totals and the stream
+    subscription = live.broker.subscribe(
+        current_user.id if current_user.role == UserRole.SUPERVISOR else None
+    )
+    today = datetime.utcnow().date()
+    try:
+        checked_in, checked_out = (
+            await session.execute(live.totals_statement(current_user, today))
+        ).one()
+    except Exception:
+        live.broker.unsubscribe(subscription)
+        raise
+    totals = AttendanceLiveTotals(
+        date=today, checked_in=checked_in, checked_out=checked_out
+    )
+    return StreamingResponse(
+        live.stream(subscription, totals),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{id}", response_model=AttendancePublic)
@@ -88,7 +181,7 @@ def read_attendance_record(
     """
     Get attendance record by ID.
     """
-    attendance = session.get(Attendance, id)
+    attendance = session.exec(attendance_by_id(id)).first()
     if not attendance:
         raise HTTPException(status_code=404, detail="Attendance record not found")
     
@@ -96,37 +189,25 @@ def read_attendance_record(
     if current_user.role == UserRole.LABORER and attendance.employee_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    if current_user.role == UserRole.SUPERVISOR:
-        employee = session.get(User, attendance.employee_id)
-        if employee and employee.supervisor_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not enough permissions")
+    if current_user.role == UserRole.SUPERVISOR and not scoping.is_direct_report(
+        session, current_user.id, attendance.employee_id
+    ):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
     
     return attendance
 
 
 @router.post("/", response_model=AttendancePublic)
-def create_attendance_record(
-    *, session: SessionDep, current_user: CurrentUser, attendance_in: AttendanceCreate
+async def create_attendance_record(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    attendance_in: AttendanceCreate,
 ) -> Any:
     """
     Create new attendance record (check-in).
     """
-    # Check if there's already an attendance record for today
     today = datetime.utcnow().date()
-    existing_stmt = select(Attendance).where(
-        and_(
-            Attendance.employee_id == current_user.id,
-            Attendance.date == today
-        )
-    )
-    existing_attendance = session.exec(existing_stmt).first()
-    
-    if existing_attendance:
-        raise HTTPException(
-            status_code=400,
-            detail="Attendance already recorded for today"
-        )
-    
     attendance = Attendance.model_validate(
         attendance_in,
         update={
@@ -135,11 +216,279 @@ def create_attendance_record(
         },
     )
     session.add(attendance)
-    session.commit()
-    session.refresh(attendance)
+    
+    # The unique (employee_id, date) index rejects a second check-in for today
+    try:
+        await session.flush()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Attendance already recorded for today"
+        )
+    await session.execute(
+        reports.refresh_attendance_facts_statement(
+            [(attendance.employee_id, attendance.date)]
+        )
+    )
+    await live.publish(
+        session,
+        [
+            live.attendance_event(
+                AttendanceBulkAction.CHECK_IN, attendance, current_user.supervisor_id
+            )
+        ],
+    )
+    await session.commit()
+    invalidate_dashboards([current_user.id], [current_user.supervisor_id])
+    await session.refresh(attendance)
     return attendance
 
 
+AttendanceKey = tuple[uuid.UUID, date]
+
+# Badge clocks may run a little ahead of the server's
+BADGE_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def _badge_time(entry: AttendanceBulkEntry, now: datetime) -> datetime:
+    # Attendance times are stored as naive UTC
+    if entry.timestamp is None:
+        return now
+    if entry.timestamp.tzinfo is not None:
+        return entry.timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return entry.timestamp
+
+
+async def _bulk_check_in(
+    session: AsyncSession,
+    entries: dict[AttendanceKey, tuple[AttendanceBulkEntry, datetime]],
+    now: datetime,
+) -> dict[AttendanceKey, uuid.UUID]:
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "employee_id": employee_id,
+            "date": day,
+            "check_in": badge_time,
+            "location": entry.location,
+            "break_duration": 0,
+            "created_at": now,
+        }
+        for (employee_id, day), (entry, badge_time) in entries.items()
+    ]
+    statement = (
+        insert(Attendance)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["employee_id", "date"])
+        .returning(
+            col(Attendance.id), col(Attendance.employee_id), col(Attendance.date)
+        )
+    )
+    result = await session.execute(statement)
+    return {(employee_id, day.date()): id for id, employee_id, day in result}
+
+
+async def _last_check_ins(
+    session: AsyncSession, badges: list[tuple[uuid.UUID, datetime] | None]
+) -> list[AttendanceKey | None]:
+    """
+    The attendance each check-out badge closes: the employee's last check-in
+    before it, on the badge day or the day before, so a shift ending after
+    midnight closes the day it started. None where there is no such check-in
+    (or no badge).
+    """
+    valid = [badge for badge in badges if badge is not None]
+    if not valid:
+        return [None for _ in badges]
+    first_day = min(badge_time for _, badge_time in valid).date() - timedelta(days=1)
+    last_day = max(badge_time for _, badge_time in valid).date()
+    statement = select(
+        Attendance.employee_id, Attendance.date, Attendance.check_in
+    ).where(
+        col(Attendance.employee_id).in_({employee_id for employee_id, _ in valid}),
+        Attendance.date >= first_day,
+        Attendance.date <= last_day,
+    )
+    check_ins: dict[uuid.UUID, list[tuple[datetime, date]]] = {}
+    for employee_id, day, check_in in await session.exec(statement):
+        check_ins.setdefault(employee_id, []).append((check_in, day.date()))
+
+    keys: list[AttendanceKey | None] = []
+    for badge in badges:
+        if badge is None:
+            keys.append(None)
+            continue
+        employee_id, badge_time = badge
+        candidates = [
+            (check_in, day)
+            for check_in, day in check_ins.get(employee_id, [])
+            if check_in <= badge_time and day >= badge_time.date() - timedelta(days=1)
+        ]
+        keys.append((employee_id, max(candidates)[1]) if candidates else None)
+    return keys
+
+
+async def _bulk_check_out(
+    session: AsyncSession,
+    entries: dict[AttendanceKey, tuple[AttendanceBulkEntry, datetime]],
+) -> dict[AttendanceKey, uuid.UUID]:
+    check_outs = values(
+        column("employee_id", Uuid),
+        column("date", Date),
+        column("check_out", DateTime),
+        name="check_outs",
+    ).data(
+        [
+            (employee_id, day, badge_time)
+            for (employee_id, day), (_, badge_time) in entries.items()
+        ]
+    )
+    statement = (
+        update(Attendance)
+        .where(
+            col(Attendance.employee_id) == check_outs.c.employee_id,
+            col(Attendance.date) == check_outs.c.date,
+            col(Attendance.check_out).is_(None),
+        )
+        .values(check_out=check_outs.c.check_out)
+        .returning(
+            col(Attendance.id), col(Attendance.employee_id), col(Attendance.date)
+        )
+    )
+    result = await session.execute(statement)
+    return {(employee_id, day.date()): id for id, employee_id, day in result}
+
+
+@router.post("/bulk", response_model=AttendanceBulkResults)
+async def bulk_attendance(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    bulk_in: AttendanceBulkCreate,
+) -> Any:
+    """
+    Check in or check out many employees at once, e.g. from a site kiosk.
+    Each entry gets its own result, in request order; the whole batch is
+    written in one transaction.
+    """
+    if current_user.role == UserRole.LABORER:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    employee_ids = {entry.employee_id for entry in bulk_in.entries}
+    allowed_stmt = select(User.id, User.supervisor_id).where(
+        col(User.id).in_(employee_ids)
+    )
+    if current_user.role == UserRole.SUPERVISOR:
+        allowed_stmt = allowed_stmt.where(User.supervisor_id == current_user.id)
+    supervisors = dict((await session.exec(allowed_stmt)).all())
+    allowed = set(supervisors)
+
+    # Entries rejected before writing get their status here
+    now = datetime.utcnow()
+    earliest = now - timedelta(days=settings.ATTENDANCE_BULK_MAX_AGE_DAYS)
+    latest = now + BADGE_CLOCK_SKEW
+    statuses: list[AttendanceBulkStatus | None] = []
+    badge_times: list[datetime] = []
+    for entry in bulk_in.entries:
+        badge_time = _badge_time(entry, now)
+        badge_times.append(badge_time)
+        if entry.employee_id not in allowed:
+            statuses.append(AttendanceBulkStatus.FORBIDDEN)
+        elif not earliest <= badge_time <= latest:
+            statuses.append(AttendanceBulkStatus.INVALID)
+        else:
+            statuses.append(None)
+
+    # A check-in writes the badge day's attendance, a check-out closes the
+    # attendance of the employee's last check-in
+    keys: list[AttendanceKey | None]
+    if bulk_in.action == AttendanceBulkAction.CHECK_IN:
+        keys = [
+            (entry.employee_id, badge_time.date())
+            for entry, badge_time in zip(bulk_in.entries, badge_times, strict=True)
+        ]
+    else:
+        keys = await _last_check_ins(
+            session,
+            [
+                (entry.employee_id, badge_time) if status is None else None
+                for entry, badge_time, status in zip(
+                    bulk_in.entries, badge_times, statuses, strict=True
+                )
+            ],
+        )
+
+    # The first entry per attendance is written, later ones are duplicates
+    entries: dict[AttendanceKey, tuple[AttendanceBulkEntry, datetime]] = {}
+    for i, (entry, badge_time, key) in enumerate(
+        zip(bulk_in.entries, badge_times, keys, strict=True)
+    ):
+        if statuses[i] is not None:
+            continue
+        if key is None:
+            statuses[i] = AttendanceBulkStatus.NOT_CHECKED_IN
+            continue
+        entries.setdefault(key, (entry, badge_time))
+
+    written: dict[AttendanceKey, uuid.UUID] = {}
+    if entries:
+        if bulk_in.action == AttendanceBulkAction.CHECK_IN:
+            written = await _bulk_check_in(session, entries, now)
+        else:
+            written = await _bulk_check_out(session, entries)
+
+    if written:
+        await session.execute(reports.refresh_attendance_facts_statement(list(written)))
+        await live.publish(
+            session,
+            [
+                AttendanceLiveEvent(
+                    action=bulk_in.action,
+                    attendance_id=attendance_id,
+                    employee_id=employee_id,
+                    supervisor_id=supervisors[employee_id],
+                    date=day,
+                    time=entries[(employee_id, day)][1],
+                )
+                for (employee_id, day), attendance_id in written.items()
+            ],
+        )
+    await session.commit()
+    if written:
+        written_ids = {employee_id for employee_id, _ in written}
+        invalidate_dashboards(
+            written_ids, {supervisors[employee_id] for employee_id in written_ids}
+        )
+
+    results = []
+    reported: set[AttendanceKey] = set()
+    for entry, rejected, key in zip(bulk_in.entries, statuses, keys, strict=True):
+        attendance_id = None
+        if rejected is not None or key is None:
+            status = rejected or AttendanceBulkStatus.NOT_CHECKED_IN
+        elif key not in reported and key in written:
+            status = AttendanceBulkStatus.SUCCESS
+            attendance_id = written[key]
+            reported.add(key)
+        else:
+            # Repeated in the batch, or already checked in (or out)
+            status = AttendanceBulkStatus.DUPLICATE
+            reported.add(key)
+        results.append(
+            AttendanceBulkResult(
+                employee_id=entry.employee_id, status=status, attendance_id=attendance_id
+            )
+        )
+
+    return AttendanceBulkResults(
+        data=results,
+        succeeded=sum(
+            result.status == AttendanceBulkStatus.SUCCESS for result in results
+        ),
+    )
+
+
 @router.put("/{id}", response_model=AttendancePublic)
 def update_attendance_record(
     *,
@@ -151,7 +500,7 @@ def update_attendance_record(
     """
     Update attendance record (check-out, add notes, etc.).
     """
-    attendance = session.get(Attendance, id)
+    attendance = session.exec(attendance_by_id(id)).first()
     if not attendance:
         raise HTTPException(status_code=404, detail="Attendance record not found")
     
@@ -165,19 +514,30 @@ def update_attendance_record(
     update_dict = attendance_in.model_dump(exclude_unset=True)
     attendance.sqlmodel_update(update_dict)
     session.add(attendance)
+    session.flush()
+    reports.refresh_attendance_facts(
+        session=session, keys=[(attendance.employee_id, attendance.date)]
+    )
     session.commit()
+    invalidate_dashboards(
+        [attendance.employee_id],
+        # An admin editing someone else's record doesn't know their supervisor
+        [current_user.supervisor_id]
+        if attendance.employee_id == current_user.id
+        else [None],
+    )
     session.refresh(attendance)
     return attendance
 
 
 @router.post("/check-out/{id}", response_model=AttendancePublic)
-def check_out(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def check_out(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Any:
     """
     Quick check-out for an attendance record.
     """
-    attendance = session.get(Attendance, id)
+    attendance = (await session.exec(attendance_by_id(id))).first()
     if not attendance:
         raise HTTPException(status_code=404, detail="Attendance record not found")
     
@@ -190,8 +550,23 @@ def check_out(
     
     attendance.check_out = datetime.utcnow()
     session.add(attendance)
-    session.commit()
-    session.refresh(attendance)
+    await session.flush()
+    await session.execute(
+        reports.refresh_attendance_facts_statement(
+            [(attendance.employee_id, attendance.date)]
+        )
+    )
+    await live.publish(
+        session,
+        [
+            live.attendance_event(
+                AttendanceBulkAction.CHECK_OUT, attendance, current_user.supervisor_id
+            )
+        ],
+    )
+    await session.commit()
+    invalidate_dashboards([current_user.id], [current_user.supervisor_id])
+    await session.refresh(attendance)
     return attendance
 
 
@@ -213,29 +588,25 @@ def get_daily_attendance_summary(
         )
     
     statement = select(Attendance).where(Attendance.date == date)
+    fact_conditions = [AttendanceDailyFact.date == date]
     
-    if current_user.role == UserRole.SUPERVISOR:
-        # Get supervised employees
-        supervised_stmt = select(User.id).where(User.supervisor_id == current_user.id)
-        supervised_ids = session.exec(supervised_stmt).all()
-        statement = statement.where(Attendance.employee_id.in_(supervised_ids))
+    # Supervisors see their team
+    statement = statement.where(
+        *scoping.employee_scope(Attendance.employee_id, current_user)
+    )
+    fact_conditions += scoping.employee_scope(
+        AttendanceDailyFact.employee_id, current_user
+    )
     
     attendance_records = session.exec(statement).all()
     
-    # Calculate summary statistics
-    total_employees = len(attendance_records)
-    checked_out = len([a for a in attendance_records if a.check_out])
+    # Totals come from the precomputed daily facts
+    daily, _ = reports.attendance_summary(session=session, where=fact_conditions)
+    day = daily[0] if daily else None
+    total_employees = day["employees_present"] if day else 0
+    checked_out = day["employees_checked_out"] if day else 0
     still_working = total_employees - checked_out
-    
-    # Calculate total hours worked
-    total_hours = 0
-    for record in attendance_records:
-        if record.check_out:
-            delta = record.check_out - record.check_in
-            hours = delta.total_seconds() / 3600
-            if record.break_duration:
-                hours -= record.break_duration / 60
-            total_hours += hours
+    total_hours = day["total_hours_worked"] if day else 0
     
     return {
         "date": date,
@@ -1,82 +1,160 @@
 import uuid
-from datetime import datetime
-from typing import Any
+from datetime import date, datetime
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import and_, func, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, Uuid, column, update, values
+from sqlmodel import and_, col, func, select
+from sqlmodel.sql.expression import SelectOfScalar
 
+from app import leave_calendar, notifications, scoping
 from app.api.deps import (
     CurrentUser,
     SessionDep,
     get_current_active_superuser,
 )
+from app.core.cache import invalidate_dashboards
+from app.export import ExportFormat, export_response
 from app.models import (
+    LeaveCalendar,
     LeaveRequest,
+    LeaveRequestBatchResult,
+    LeaveRequestBatchResults,
+    LeaveRequestBatchStatus,
+    LeaveRequestBatchUpdate,
     LeaveRequestCreate,
     LeaveRequestPublic,
     LeaveRequestsPublic,
     LeaveRequestUpdate,
+    LeaveStatus,
     Message,
     User,
     UserRole,
 )
+from app.pagination import CountMode, count_rows, next_cursor, paginate
 
 router = APIRouter()
 
 
+def scoped_leave_requests_statement(
+    current_user: CurrentUser,
+) -> SelectOfScalar[LeaveRequest]:
+    """
+    Leave requests visible to the current user.
+    """
+    statement = select(LeaveRequest)
+    
+    if current_user.role == UserRole.SUPERVISOR:
+        # Supervisor can see requests from their supervised workers
+        statement = statement.where(LeaveRequest.supervisor_id == current_user.id)
+    elif current_user.role == UserRole.LABORER:
+        # Laborers can only see their own requests
+        statement = statement.where(LeaveRequest.employee_id == current_user.id)
+    
+    return statement
+
+
+ScopedLeaveRequestsDep = Annotated[
+    SelectOfScalar[LeaveRequest], Depends(scoped_leave_requests_statement)
+]
+
+
 @router.get("/", response_model=LeaveRequestsPublic)
 def read_leave_requests(
     session: SessionDep,
-    current_user: CurrentUser,
+    statement: ScopedLeaveRequestsDep,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = CountMode.EXACT,
 ) -> Any:
     """
-    Retrieve leave requests.
+    Retrieve leave requests, oldest first.
     - Admin: can see all requests
     - Supervisor: can see their team's requests
     - Laborer: can see only their own requests
+    Pass the returned `next_cursor` as `cursor` to page without OFFSET.
     """
-    
-    if current_user.role == UserRole.ADMIN:
-        # Admin can see all leave requests
-        count_statement = select(func.count()).select_from(LeaveRequest)
-        count = session.exec(count_statement).one()
-        
-        statement = select(LeaveRequest).offset(skip).limit(limit)
-        leave_requests = session.exec(statement).all()
-        
-    elif current_user.role == UserRole.SUPERVISOR:
-        # Supervisor can see requests from their supervised workers
-        count_statement = select(func.count()).select_from(LeaveRequest).where(
-            LeaveRequest.supervisor_id == current_user.id
-        )
-        count = session.exec(count_statement).one()
-        
-        statement = (
-            select(LeaveRequest)
-            .where(LeaveRequest.supervisor_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-        )
-        leave_requests = session.exec(statement).all()
-        
-    else:
-        # Laborers can only see their own requests
-        count_statement = select(func.count()).select_from(LeaveRequest).where(
-            LeaveRequest.employee_id == current_user.id
+    count = count_rows(session, statement, count_mode)
+    statement = paginate(
+        statement,
+        LeaveRequest.created_at,
+        LeaveRequest.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+    leave_requests = session.exec(statement).all()
+
+    return LeaveRequestsPublic(
+        data=leave_requests,
+        count=count,
+        next_cursor=next_cursor(leave_requests, limit, "created_at", "id"),
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_leave_requests(
+    statement: ScopedLeaveRequestsDep,
+    format: ExportFormat = ExportFormat.CSV,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> Any:
+    """
+    Stream leave requests as CSV or NDJSON, oldest first.
+    Optionally limited to requests overlapping the given dates.
+    """
+    if start_date:
+        statement = statement.where(LeaveRequest.end_date >= start_date)
+    if end_date:
+        statement = statement.where(LeaveRequest.start_date <= end_date)
+    statement = statement.order_by(col(LeaveRequest.created_at), col(LeaveRequest.id))
+    return export_response(statement, LeaveRequestPublic, format, "leave-requests")
+
+
+@router.get("/calendar", response_model=LeaveCalendar)
+def read_leave_calendar(
+    session: SessionDep,
+    current_user: CurrentUser,
+    start_date: date,
+    end_date: date,
+    supervisor_id: uuid.UUID | None = None,
+    team_name: str | None = None,
+    site_location: str | None = None,
+) -> Any:
+    """
+    Employees on pending or approved leave on each day of a date range.
+    - Admin: everyone, or one supervisor's team with `supervisor_id`
+    - Supervisor: their direct reports
+    - Laborer: only themselves
+    Optionally narrowed to the laborers actively assigned to a team and/or site.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    if (end_date - start_date).days >= leave_calendar.MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range is longer than {leave_calendar.MAX_CALENDAR_DAYS} days",
         )
-        count = session.exec(count_statement).one()
-        
-        statement = (
-            select(LeaveRequest)
-            .where(LeaveRequest.employee_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
+    
+    conditions = scoping.employee_scope(
+        LeaveRequest.employee_id, current_user, supervisor_id=supervisor_id
+    )
+    if team_name or site_location:
+        if current_user.role == UserRole.SUPERVISOR:
+            supervisor_id = current_user.id
+        team = scoping.team_laborers(
+            supervisor_id=supervisor_id,
+            team_name=team_name,
+            site_location=site_location,
         )
-        leave_requests = session.exec(statement).all()
-
-    return LeaveRequestsPublic(data=leave_requests, count=count)
+        conditions.append(col(LeaveRequest.employee_id).in_(team))
+    
+    days = leave_calendar.leave_calendar(
+        session, start_date=start_date, end_date=end_date, where=conditions
+    )
+    return LeaveCalendar(start_date=start_date, end_date=end_date, data=days)
 
 
 @router.get("/{id}", response_model=LeaveRequestPublic)
@@ -131,6 +209,22 @@ def create_leave_request(
         admin_user = session.exec(supervisor_stmt).first()
         supervisor_id = admin_user.id if admin_user else None
     
+    # Also keeps the leave period index from rejecting the row
+    if leave_request_in.end_date < leave_request_in.start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    
+    overlap = leave_calendar.overlapping_leave(
+        session,
+        employee_id=current_user.id,
+        start=leave_request_in.start_date,
+        end=leave_request_in.end_date,
+    )
+    if overlap:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Overlaps leave request {overlap.id}",
+        )
+    
     leave_request = LeaveRequest.model_validate(
         leave_request_in,
         update={
@@ -140,10 +234,96 @@ def create_leave_request(
     )
     session.add(leave_request)
     session.commit()
+    invalidate_dashboards([leave_request.employee_id], [leave_request.supervisor_id])
     session.refresh(leave_request)
     return leave_request
 
 
+@router.put("/batch", response_model=LeaveRequestBatchResults)
+def update_leave_requests_batch(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    batch_in: LeaveRequestBatchUpdate,
+    background_tasks: BackgroundTasks,
+) -> Any:
+    """
+    Approve or reject many leave requests at once.
+    Each entry gets its own result, in request order; the whole batch is
+    written in one transaction. Employees are emailed after the response.
+    """
+    if current_user.role == UserRole.LABORER:
+        raise HTTPException(
+            status_code=403,
+            detail="Laborers cannot update leave requests"
+        )
+    
+    # One query finds which requests exist and who they are addressed to
+    ids = {entry.id for entry in batch_in.entries}
+    supervisors_stmt = select(LeaveRequest.id, LeaveRequest.supervisor_id).where(
+        col(LeaveRequest.id).in_(ids)
+    )
+    supervisors = dict(session.exec(supervisors_stmt).all())
+    
+    results: list[LeaveRequestBatchResult] = []
+    changes: dict[LeaveStatus, list[tuple[uuid.UUID, str | None]]] = {}
+    seen: set[uuid.UUID] = set()
+    for entry in batch_in.entries:
+        if entry.id not in supervisors:
+            status = LeaveRequestBatchStatus.NOT_FOUND
+        elif (
+            current_user.role == UserRole.SUPERVISOR
+            and supervisors[entry.id] != current_user.id
+        ):
+            status = LeaveRequestBatchStatus.FORBIDDEN
+        elif entry.status == LeaveStatus.PENDING:
+            status = LeaveRequestBatchStatus.INVALID
+        elif entry.id in seen:
+            status = LeaveRequestBatchStatus.DUPLICATE
+        else:
+            status = LeaveRequestBatchStatus.SUCCESS
+            seen.add(entry.id)
+            changes.setdefault(entry.status, []).append(
+                (entry.id, entry.supervisor_comments)
+            )
+        results.append(LeaveRequestBatchResult(id=entry.id, status=status))
+    
+    # One UPDATE per status; comments left out keep their current value
+    now = datetime.utcnow()
+    employee_ids: set[uuid.UUID] = set()
+    for leave_status, rows in changes.items():
+        comments = values(
+            column("id", Uuid),
+            column("supervisor_comments", String),
+            name="comments",
+        ).data(rows)
+        statement = (
+            update(LeaveRequest)
+            .where(col(LeaveRequest.id) == comments.c.id)
+            .values(
+                status=leave_status,
+                supervisor_comments=func.coalesce(
+                    comments.c.supervisor_comments, LeaveRequest.supervisor_comments
+                ),
+                updated_at=now,
+            )
+            .returning(col(LeaveRequest.employee_id))
+        )
+        employee_ids.update(session.execute(statement).scalars())
+    session.commit()
+    
+    updated = [
+        result.id
+        for result in results
+        if result.status == LeaveRequestBatchStatus.SUCCESS
+    ]
+    if updated:
+        invalidate_dashboards(employee_ids, {supervisors[id] for id in updated})
+        background_tasks.add_task(notifications.send_leave_decision_emails, updated)
+    
+    return LeaveRequestBatchResults(data=results, succeeded=len(updated))
+
+
 @router.put("/{id}", response_model=LeaveRequestPublic)
 def update_leave_request(
     *,
@@ -178,6 +358,7 @@ def update_leave_request(
     leave_request.sqlmodel_update(update_dict)
     session.add(leave_request)
     session.commit()
+    invalidate_dashboards([leave_request.employee_id], [leave_request.supervisor_id])
     session.refresh(leave_request)
     return leave_request
 
@@ -203,4 +384,5 @@ def delete_leave_request(
     
     session.delete(leave_request)
     session.commit()
+    invalidate_dashboards([leave_request.employee_id], [leave_request.supervisor_id])
     return Message(message="Leave request deleted successfully")
@@ -1,4 +1,3 @@
-import secrets
 import uuid
 from datetime import datetime, timedelta
 from typing import Any
@@ -7,69 +6,45 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlmodel import select
 
-from app.api.deps import SessionDep
+from app.api.deps import AsyncSessionDep
+from app.core.config import settings
 from app.core.security import create_access_token
 from app.models import Message, QRCode, QRCodeCreate, QRCodePublic, Token, User
+from app.qr_codes import qr_code_store
 
 router = APIRouter()
 security = HTTPBearer()
 
 
 @router.post("/generate", response_model=QRCodePublic)
-def generate_qr_code(session: SessionDep) -> Any:
+async def generate_qr_code(session: AsyncSessionDep) -> Any:
     """
     Generate a new QR code for login.
-    QR codes expire after 5 minutes.
+    QR codes expire after QR_CODE_EXPIRE_SECONDS (5 minutes by default).
     """
-    # Generate a secure random code
-    code = secrets.token_urlsafe(32)
-    expires_at = datetime.utcnow() + timedelta(minutes=5)
-    
-    qr_code = QRCode(
-        code=code,
-        expires_at=expires_at,
-    )
-    session.add(qr_code)
-    session.commit()
-    session.refresh(qr_code)
-    
-    return qr_code
+    return await qr_code_store.issue(session)
+
+
+def _unusable_reason(qr_code: QRCode | None) -> str:
+    if not qr_code:
+        return "QR code not found"
+    if qr_code.is_used:
+        return "QR code already used"
+    if datetime.utcnow() > qr_code.expires_at:
+        return "QR code expired"
+    return ""
 
 
 @router.post("/validate", response_model=Token)
-def validate_qr_code(
-    *, session: SessionDep, qr_code: str, employee_id: str
+async def validate_qr_code(
+    *, session: AsyncSessionDep, qr_code: str, employee_id: str
 ) -> Any:
     """
     Validate QR code and authenticate user.
     """
-    # Find the QR code
-    statement = select(QRCode).where(QRCode.code == qr_code)
-    db_qr_code = session.exec(statement).first()
-    
-    if not db_qr_code:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid QR code",
-        )
-    
-    # Check if QR code is expired
-    if datetime.utcnow() > db_qr_code.expires_at:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="QR code expired",
-        )
-    
-    # Check if QR code is already used
-    if db_qr_code.is_used:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="QR code already used",
-        )
-    
     # Find the user by employee_id
     user_statement = select(User).where(User.employee_id == employee_id)
-    user = session.exec(user_statement).first()
+    user = (await session.exec(user_statement)).first()
     
     if not user:
         raise HTTPException(
@@ -83,33 +58,37 @@ def validate_qr_code(
             detail="Inactive user",
         )
     
-    # Mark QR code as used
-    db_qr_code.is_used = True
-    session.add(db_qr_code)
-    session.commit()
+    # Check and mark the code used in one step, so it can't be used twice
+    if not await qr_code_store.consume(session, qr_code):
+        reason = _unusable_reason(await qr_code_store.get(session, qr_code))
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=(
+                "Invalid QR code"
+                if reason in ("", "QR code not found")
+                else reason
+            ),
+        )
     
     # Create access token
-    access_token = create_access_token(subject=str(user.id))
+    access_token = create_access_token(
+        subject=str(user.id),
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
     
     return Token(access_token=access_token)
 
 
 @router.get("/status/{code}")
-def check_qr_status(session: SessionDep, code: str) -> Any:
+async def check_qr_status(session: AsyncSessionDep, code: str) -> Any:
     """
     Check if QR code is still valid and unused.
     """
-    statement = select(QRCode).where(QRCode.code == code)
-    qr_code = session.exec(statement).first()
-    
-    if not qr_code:
-        return {"valid": False, "message": "QR code not found"}
+    qr_code = await qr_code_store.get(session, code)
     
-    if datetime.utcnow() > qr_code.expires_at:
-        return {"valid": False, "message": "QR code expired"}
-    
-    if qr_code.is_used:
-        return {"valid": False, "message": "QR code already used"}
+    reason = _unusable_reason(qr_code)
+    if not qr_code or reason:
+        return {"valid": False, "message": reason}
     
     return {
         "valid": True, 
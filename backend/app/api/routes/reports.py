@@ -3,20 +3,23 @@ from datetime import date, datetime, timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import and_, func, select
+from sqlmodel import col, select
 
+from app import reports, scoping
 from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncSessionDep,
     CurrentUser,
     SessionDep,
 )
+from app.core.cache import dashboard_cache
 from app.models import (
-    Attendance,
+    AttendanceDailyFact,
     LeaveRequest,
     LeaveStatus,
-    TeamAssignment,
-    User,
     UserRole,
 )
+from app.pagination import next_cursor, paginate
 
 router = APIRouter()
 
@@ -40,82 +43,30 @@ def get_attendance_summary(
             detail="Laborers cannot access attendance summaries"
         )
     
-    # Base query
-    statement = select(Attendance).where(
-        and_(
-            Attendance.date >= start_date,
-            Attendance.date <= end_date
-        )
-    )
+    conditions: list[Any] = [
+        AttendanceDailyFact.date >= start_date,
+        AttendanceDailyFact.date <= end_date,
+    ]
     
-    # Apply filters based on user role
-    if current_user.role == UserRole.SUPERVISOR:
-        # Get supervised employees
-        supervised_stmt = select(User.id).where(User.supervisor_id == current_user.id)
-        supervised_ids = session.exec(supervised_stmt).all()
-        statement = statement.where(Attendance.employee_id.in_(supervised_ids))
-    else:
-        # Admin can filter by supervisor
-        if supervisor_id:
-            supervised_stmt = select(User.id).where(User.supervisor_id == supervisor_id)
-            supervised_ids = session.exec(supervised_stmt).all()
-            statement = statement.where(Attendance.employee_id.in_(supervised_ids))
+    # Supervisors see their team, admins can filter by supervisor
+    conditions += scoping.employee_scope(
+        AttendanceDailyFact.employee_id, current_user, supervisor_id=supervisor_id
+    )
     
-    # Apply additional filters
+    # Team and site are the employee's current assignment, like the other
+    # team filters; the values stamped on fact rows go stale on reassignment
     if site_location or team_name:
-        # Need to join with team assignments
-        team_stmt = select(TeamAssignment.laborer_id).where(TeamAssignment.is_active == True)
-        if site_location:
-            team_stmt = team_stmt.where(TeamAssignment.site_location == site_location)
-        if team_name:
-            team_stmt = team_stmt.where(TeamAssignment.team_name == team_name)
-        
-        team_member_ids = session.exec(team_stmt).all()
-        statement = statement.where(Attendance.employee_id.in_(team_member_ids))
-    
-    attendance_records = session.exec(statement).all()
-    
-    # Calculate summary statistics
-    total_records = len(attendance_records)
-    total_employees = len(set(record.employee_id for record in attendance_records))
-    
-    # Group by date
-    daily_stats = {}
-    for record in attendance_records:
-        record_date = record.date
-        if record_date not in daily_stats:
-            daily_stats[record_date] = {
-                "date": record_date,
-                "employees": set(),
-                "total_hours": 0,
-                "checked_out": 0,
-            }
-        
-        daily_stats[record_date]["employees"].add(record.employee_id)
-        
-        if record.check_out:
-            daily_stats[record_date]["checked_out"] += 1
-            delta = record.check_out - record.check_in
-            hours = delta.total_seconds() / 3600
-            if record.break_duration:
-                hours -= record.break_duration / 60
-            daily_stats[record_date]["total_hours"] += hours
-    
-    # Convert sets to counts and format data
-    daily_summary = []
-    for date_key, stats in daily_stats.items():
-        daily_summary.append({
-            "date": date_key,
-            "employees_present": len(stats["employees"]),
-            "employees_checked_out": stats["checked_out"],
-            "total_hours_worked": round(stats["total_hours"], 2),
-            "average_hours_per_employee": round(
-                stats["total_hours"] / len(stats["employees"]), 2
-            ) if len(stats["employees"]) > 0 else 0,
-        })
+        team = scoping.team_laborers(
+            team_name=team_name, site_location=site_location
+        )
+        conditions.append(col(AttendanceDailyFact.employee_id).in_(team))
     
-    # Sort by date
-    daily_summary.sort(key=lambda x: x["date"])
+    # Per-day rollups are computed in the database
+    daily_summary, totals = reports.attendance_summary(
+        session=session, where=conditions
+    )
+    total_records = totals["records"]
+    total_employees = totals["employees"]
     
     # Overall statistics
     total_hours = sum(day["total_hours_worked"] for day in daily_summary)
@@ -148,9 +99,16 @@ def get_leave_summary(
     end_date: date,
     status: LeaveStatus | None = None,
     supervisor_id: uuid.UUID | None = None,
+    include_requests: bool = True,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
 ) -> Any:
     """
     Get leave requests summary for a date range.
+    Approved leave days only count the days inside the range. The requests
+    themselves are paginated like other lists, or left out with
+    `include_requests=false`.
     """
     if current_user.role == UserRole.LABORER:
         raise HTTPException(
@@ -158,46 +116,42 @@ def get_leave_summary(
             detail="Laborers cannot access leave summaries"
         )
     
-    # Base query
-    statement = select(LeaveRequest).where(
-        and_(
-            LeaveRequest.start_date <= end_date,
-            LeaveRequest.end_date >= start_date
-        )
-    )
+    # Requests overlapping the range
+    conditions = [
+        LeaveRequest.start_date <= end_date,
+        LeaveRequest.end_date >= start_date,
+    ]
     
     # Apply filters based on user role
     if current_user.role == UserRole.SUPERVISOR:
-        statement = statement.where(LeaveRequest.supervisor_id == current_user.id)
+        conditions.append(LeaveRequest.supervisor_id == current_user.id)
     else:
         # Admin can filter by supervisor
         if supervisor_id:
-            statement = statement.where(LeaveRequest.supervisor_id == supervisor_id)
+            conditions.append(LeaveRequest.supervisor_id == supervisor_id)
     
     # Apply status filter
     if status:
-        statement = statement.where(LeaveRequest.status == status)
-    
-    leave_requests = session.exec(statement).all()
+        conditions.append(LeaveRequest.status == status)
     
-    # Calculate statistics
-    total_requests = len(leave_requests)
-    status_counts = {}
-    leave_type_counts = {}
-    
-    for request in leave_requests:
-        # Count by status
-        status_counts[request.status] = status_counts.get(request.status, 0) + 1
-        
-        # Count by leave type
-        leave_type_counts[request.leave_type] = leave_type_counts.get(request.leave_type, 0) + 1
+    # Breakdowns and day counts are computed in the database
+    summary = reports.leave_summary(
+        session=session, start_date=start_date, end_date=end_date, where=conditions
+    )
     
-    # Calculate leave days
-    total_leave_days = 0
-    for request in leave_requests:
-        if request.status == LeaveStatus.APPROVED:
-            delta = request.end_date - request.start_date
-            total_leave_days += delta.days + 1
+    leave_requests = None
+    requests_cursor = None
+    if include_requests:
+        statement = paginate(
+            select(LeaveRequest).where(*conditions),
+            LeaveRequest.start_date,
+            LeaveRequest.id,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+        )
+        leave_requests = session.exec(statement).all()
+        requests_cursor = next_cursor(leave_requests, limit, "start_date", "id")
     
     return {
         "period": {
@@ -208,13 +162,9 @@ def get_leave_summary(
             "status": status,
             "supervisor_id": supervisor_id,
         },
-        "summary": {
-            "total_requests": total_requests,
-            "approved_leave_days": total_leave_days,
-            "status_breakdown": status_counts,
-            "leave_type_breakdown": leave_type_counts,
-        },
+        "summary": summary,
         "requests": leave_requests,
+        "next_cursor": requests_cursor,
     }
 
 
@@ -234,231 +184,73 @@ def get_team_performance_report(
             detail="Laborers cannot access team performance reports"
         )
     
-    # Get team assignments
-    team_stmt = select(TeamAssignment).where(TeamAssignment.is_active == True)
-    
-    if current_user.role == UserRole.SUPERVISOR:
-        team_stmt = team_stmt.where(TeamAssignment.supervisor_id == current_user.id)
-    
-    team_assignments = session.exec(team_stmt).all()
-    
-    team_performance = {}
-    
-    for assignment in team_assignments:
-        team_key = f"{assignment.team_name}_{assignment.site_location or 'No Site'}"
-        
-        if team_key not in team_performance:
-            team_performance[team_key] = {
-                "team_name": assignment.team_name,
-                "site_location": assignment.site_location,
-                "supervisor_id": assignment.supervisor_id,
-                "members": [],
-                "total_attendance_days": 0,
-                "total_hours_worked": 0,
-                "total_leave_days": 0,
-            }
-        
-        # Get laborer info
-        laborer = session.get(User, assignment.laborer_id)
-        if not laborer:
-            continue
-        
-        # Get attendance for this laborer
-        attendance_stmt = select(Attendance).where(
-            and_(
-                Attendance.employee_id == assignment.laborer_id,
-                Attendance.date >= start_date,
-                Attendance.date <= end_date
-            )
-        )
-        attendance_records = session.exec(attendance_stmt).all()
-        
-        # Calculate hours worked
-        hours_worked = 0
-        for record in attendance_records:
-            if record.check_out:
-                delta = record.check_out - record.check_in
-                hours = delta.total_seconds() / 3600
-                if record.break_duration:
-                    hours -= record.break_duration / 60
-                hours_worked += hours
-        
-        # Get leave requests for this laborer
-        leave_stmt = select(LeaveRequest).where(
-            and_(
-                LeaveRequest.employee_id == assignment.laborer_id,
-                LeaveRequest.start_date <= end_date,
-                LeaveRequest.end_date >= start_date,
-                LeaveRequest.status == LeaveStatus.APPROVED
-            )
-        )
-        leave_requests = session.exec(leave_stmt).all()
-        
-        leave_days = 0
-        for leave_req in leave_requests:
-            delta = leave_req.end_date - leave_req.start_date
-            leave_days += delta.days + 1
-        
-        # Add member data
-        team_performance[team_key]["members"].append({
-            "employee_id": laborer.id,
-            "full_name": laborer.full_name,
-            "employee_number": laborer.employee_id,
-            "attendance_days": len(attendance_records),
-            "hours_worked": round(hours_worked, 2),
-            "leave_days": leave_days,
-        })
-        
-        # Update team totals
-        team_performance[team_key]["total_attendance_days"] += len(attendance_records)
-        team_performance[team_key]["total_hours_worked"] += hours_worked
-        team_performance[team_key]["total_leave_days"] += leave_days
-    
-    # Convert to list and calculate averages
-    team_list = []
-    for team_data in team_performance.values():
-        member_count = len(team_data["members"])
-        team_data["member_count"] = member_count
-        team_data["average_attendance_per_member"] = round(
-            team_data["total_attendance_days"] / member_count, 2
-        ) if member_count > 0 else 0
-        team_data["average_hours_per_member"] = round(
-            team_data["total_hours_worked"] / member_count, 2
-        ) if member_count > 0 else 0
-        team_data["total_hours_worked"] = round(team_data["total_hours_worked"], 2)
-        
-        team_list.append(team_data)
-    
+    teams = reports.team_performance(
+        session=session,
+        start_date=start_date,
+        end_date=end_date,
+        supervisor_id=(
+            current_user.id if current_user.role == UserRole.SUPERVISOR else None
+        ),
+    )
+
     return {
         "period": {
             "start_date": start_date,
             "end_date": end_date,
         },
-        "teams": team_list,
+        "teams": teams,
     }
 
 
 @router.get("/dashboard-stats")
-def get_dashboard_statistics(
-    session: SessionDep,
-    current_user: CurrentUser,
+async def get_dashboard_statistics(
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
 ) -> Any:
     """
     Get dashboard statistics for the current user.
     """
     today = datetime.utcnow().date()
-    
+    cache_key = (current_user.role, current_user.id, today)
+    cached = dashboard_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # All counts come back in a single row
+    row = (
+        await session.execute(reports.dashboard_statement(current_user, today))
+    ).one()
+
     if current_user.role == UserRole.LABORER:
-        # Get personal statistics
-        # Today's attendance
-        today_attendance_stmt = select(Attendance).where(
-            and_(
-                Attendance.employee_id == current_user.id,
-                Attendance.date == today
-            )
-        )
-        today_attendance = session.exec(today_attendance_stmt).first()
-        
-        # Pending leave requests
-        pending_leaves_stmt = select(func.count()).select_from(LeaveRequest).where(
-            and_(
-                LeaveRequest.employee_id == current_user.id,
-                LeaveRequest.status == LeaveStatus.PENDING
-            )
-        )
-        pending_leaves = session.exec(pending_leaves_stmt).one()
-        
-        # This month's attendance count
-        month_start = today.replace(day=1)
-        month_attendance_stmt = select(func.count()).select_from(Attendance).where(
-            and_(
-                Attendance.employee_id == current_user.id,
-                Attendance.date >= month_start
-            )
-        )
-        month_attendance = session.exec(month_attendance_stmt).one()
-        
-        return {
+        stats = {
             "role": current_user.role,
-            "today_checked_in": today_attendance is not None,
-            "today_checked_out": today_attendance.check_out is not None if today_attendance else False,
-            "pending_leave_requests": pending_leaves,
-            "month_attendance_days": month_attendance,
+            "today_checked_in": row.today_checked_in > 0,
+            "today_checked_out": row.today_checked_out > 0,
+            "pending_leave_requests": row.pending_leave_requests,
+            "month_attendance_days": row.month_attendance_days,
         }
-    
     elif current_user.role == UserRole.SUPERVISOR:
-        # Get team statistics
-        # Team members count
-        team_members_stmt = select(func.count()).select_from(User).where(
-            User.supervisor_id == current_user.id
-        )
-        team_members = session.exec(team_members_stmt).one()
-        
-        # Today's team attendance
-        supervised_ids_stmt = select(User.id).where(User.supervisor_id == current_user.id)
-        supervised_ids = session.exec(supervised_ids_stmt).all()
-        
-        today_team_attendance_stmt = select(func.count()).select_from(Attendance).where(
-            and_(
-                Attendance.employee_id.in_(supervised_ids),
-                Attendance.date == today
-            )
-        )
-        today_team_attendance = session.exec(today_team_attendance_stmt).one()
-        
-        # Pending leave requests for team
-        pending_team_leaves_stmt = select(func.count()).select_from(LeaveRequest).where(
-            LeaveRequest.supervisor_id == current_user.id,
-            LeaveRequest.status == LeaveStatus.PENDING
-        )
-        pending_team_leaves = session.exec(pending_team_leaves_stmt).one()
-        
-        return {
+        stats = {
             "role": current_user.role,
-            "team_members": team_members,
-            "today_team_attendance": today_team_attendance,
-            "pending_leave_approvals": pending_team_leaves,
+            "team_members": row.team_members,
+            "today_team_attendance": row.today_team_attendance,
+            "pending_leave_approvals": row.pending_leave_approvals,
             "team_attendance_rate": round(
-                (today_team_attendance / team_members * 100), 2
-            ) if team_members > 0 else 0,
+                (row.today_team_attendance / row.team_members * 100), 2
+            ) if row.team_members > 0 else 0,
         }
-    
     else:  # Admin
-        # Get overall statistics
-        # Total users by role
-        total_users_stmt = select(func.count()).select_from(User).where(User.is_active == True)
-        total_users = session.exec(total_users_stmt).one()
-        
-        laborers_stmt = select(func.count()).select_from(User).where(
-            and_(User.role == UserRole.LABORER, User.is_active == True)
-        )
-        total_laborers = session.exec(laborers_stmt).one()
-        
-        supervisors_stmt = select(func.count()).select_from(User).where(
-            and_(User.role == UserRole.SUPERVISOR, User.is_active == True)
-        )
-        total_supervisors = session.exec(supervisors_stmt).one()
-        
-        # Today's overall attendance
-        today_attendance_stmt = select(func.count()).select_from(Attendance).where(
-            Attendance.date == today
-        )
-        today_attendance = session.exec(today_attendance_stmt).one()
-        
-        # All pending leave requests
-        all_pending_leaves_stmt = select(func.count()).select_from(LeaveRequest).where(
-            LeaveRequest.status == LeaveStatus.PENDING
-        )
-        all_pending_leaves = session.exec(all_pending_leaves_stmt).one()
-        
-        return {
+        stats = {
             "role": current_user.role,
-            "total_users": total_users,
-            "total_laborers": total_laborers,
-            "total_supervisors": total_supervisors,
-            "today_attendance": today_attendance,
+            "total_users": row.total_users,
+            "total_laborers": row.total_laborers,
+            "total_supervisors": row.total_supervisors,
+            "today_attendance": row.today_attendance,
             "overall_attendance_rate": round(
-                (today_attendance / total_laborers * 100), 2
-            ) if total_laborers > 0 else 0,
-            "pending_leave_requests": all_pending_leaves,
+                (row.today_attendance / row.total_laborers * 100), 2
+            ) if row.total_laborers > 0 else 0,
+            "pending_leave_requests": row.pending_leave_requests,
         }
+
+    dashboard_cache.set(cache_key, stats)
+    return stats
@@ -1,18 +1,20 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from sqlmodel import col, delete, select
 
-from app import crud
+from app import crud, importer
 from app.api.deps import (
     CurrentUser,
     SessionDep,
     get_current_active_superuser,
 )
+from app.core.cache import invalidate_user
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.models import (
+    ImportResult,
     Item,
     Message,
     UpdatePassword,
@@ -24,6 +26,7 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
+from app.pagination import CountMode, count_rows, next_cursor, paginate
 from app.utils import generate_new_account_email, send_email
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -34,18 +37,27 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = CountMode.EXACT,
+) -> Any:
     """
     Retrieve users.
+    Pass the returned `next_cursor` as `cursor` to page without OFFSET.
     """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    statement = select(User)
+    count = count_rows(session, statement, count_mode)
 
-    statement = select(User).offset(skip).limit(limit)
+    statement = paginate(statement, User.id, cursor=cursor, skip=skip, limit=limit)
     users = session.exec(statement).all()
 
-    return UsersPublic(data=users, count=count)
+    return UsersPublic(
+        data=users, count=count, next_cursor=next_cursor(users, limit, "id")
+    )
 
 
 @router.post(
@@ -65,7 +77,7 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
     user = crud.create_user(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
-            email_to=user_in.email, username=user_in.email, password=user_in.password
+            email_to=user_in.email, username=user_in.email
         )
         send_email(
             email_to=user_in.email,
@@ -75,6 +87,27 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
     return user
 
 
+@router.post(
+    "/import",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=ImportResult,
+)
+def import_users(
+    *,
+    session: SessionDep,
+    file: UploadFile,
+    format: importer.ImportFormat = importer.ImportFormat.CSV,
+) -> Any:
+    """
+    Create users from an uploaded CSV or JSONL file, one user per row.
+    Invalid rows and taken emails are reported by line and skipped.
+    """
+    try:
+        return importer.import_users(session=session, file=file.file, format=format)
+    except importer.ImportFileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.patch("/me", response_model=UserPublic)
 def update_user_me(
     *, session: SessionDep, user_in: UserUpdateMe, current_user: CurrentUser
@@ -92,6 +125,7 @@ def update_user_me(
     user_data = user_in.model_dump(exclude_unset=True)
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
+    invalidate_user(session, current_user.id)
     session.commit()
     session.refresh(current_user)
     return current_user
@@ -135,6 +169,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
     session.delete(current_user)
+    invalidate_user(session, current_user.id)
     session.commit()
     return Message(message="User deleted successfully")
 
@@ -222,5 +257,6 @@ def delete_user(
     statement = delete(Item).where(col(Item.owner_id) == user_id)
     session.exec(statement)  # type: ignore
     session.delete(user)
+    invalidate_user(session, user_id)
     session.commit()
     return Message(message="User deleted successfully")
@@ -1,7 +1,12 @@
+import os
+from typing import Any
+
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
+from app.core.db import async_engine, engine
+from app.core.pool import pool_stats
 from app.models import Message
 from app.utils import generate_test_email, send_email
 
@@ -26,6 +31,18 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get("/db-pool/", dependencies=[Depends(get_current_active_superuser)])
+def db_pool_stats() -> Any:
+    """
+    Connection pool usage and checkout wait times of this worker process.
+    """
+    return {
+        "pid": os.getpid(),
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.sync_engine.pool),
+    }
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
@@ -1,11 +1,19 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
 from sqlmodel import func, select
 
-from app import crud
+from app import crud, importer
 from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
-from app.models import Worker, WorkerCreate, WorkerPublic, WorkerUpdate, WorkersPublic
+from app.models import (
+    ImportResult,
+    Worker,
+    WorkerCreate,
+    WorkerPublic,
+    WorkersPublic,
+    WorkerUpdate,
+)
+from app.pagination import CountMode, count_rows, decode_cursor, next_cursor
 
 router = APIRouter(prefix="/workers", tags=["workers"])
 
@@ -16,19 +24,30 @@ def read_workers(
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = CountMode.EXACT,
 ) -> Any:
     """
     Retrieve workers.
+    Pass the returned `next_cursor` as `cursor` to page without OFFSET.
     """
-    if current_user.is_superuser:
-        workers = crud.get_workers(session=session, skip=skip, limit=limit)
-        count = crud.get_workers_count(session=session)
+    owner_id = None if current_user.is_superuser else current_user.id
+    after = decode_cursor(cursor, Worker.id)[0] if cursor else None
+    workers = crud.get_workers(
+        session=session, skip=skip, limit=limit, owner_id=owner_id, after=after
+    )
+    if count_mode == CountMode.EXACT:
+        count = crud.get_workers_count(session=session, owner_id=owner_id)
     else:
-        workers = crud.get_workers(
-            session=session, skip=skip, limit=limit, owner_id=current_user.id
-        )
-        count = crud.get_workers_count(session=session, owner_id=current_user.id)
-    return {"data": workers, "count": count}
+        statement = select(Worker)
+        if owner_id is not None:
+            statement = statement.where(Worker.owner_id == owner_id)
+        count = count_rows(session, statement, count_mode)
+    return {
+        "data": workers,
+        "count": count,
+        "next_cursor": next_cursor(workers, limit, "id"),
+    }
 
 
 @router.post("/", response_model=WorkerPublic)
@@ -47,6 +66,29 @@ def create_worker(
     return worker
 
 
+@router.post("/import", response_model=ImportResult)
+def import_workers(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    file: UploadFile,
+    format: importer.ImportFormat = importer.ImportFormat.CSV,
+) -> Any:
+    """
+    Create workers from an uploaded CSV or JSONL file, one worker per row.
+    Invalid rows are reported by line and skipped.
+    """
+    try:
+        return importer.import_workers(
+            session=session,
+            file=file.file,
+            format=format,
+            owner_id=current_user.id,
+        )
+    except importer.ImportFileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{id}", response_model=WorkerPublic)
 def read_worker(
     *,
@@ -0,0 +1,217 @@
+"""
+Compare query plans for the attendance, leave request and team assignment
+access paths before and after the indexes declared on the models.
+
+The tables are copied into a scratch `bench_indexes` schema, seeded with
+generated data and dropped again at the end, so the benchmark can be pointed
+at any database:
+
+    python -m app.benchmarks.attendance_indexes --rows 1000000
+"""
+
+import argparse
+import json
+import logging
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy import Connection, MetaData, Table, text
+from sqlalchemy.schema import CreateTable
+
+from app.core.db import engine
+from app.models import Attendance, LeaveRequest, TeamAssignment, User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = "bench_indexes"
+LABORERS_PER_SUPERVISOR = 40
+
+QUERIES = {
+    "check-in probe": (
+        "SELECT id FROM {s}.attendance WHERE employee_id = :employee_id AND date = :day"
+    ),
+    "team attendance for a month": (
+        "SELECT count(*) FROM {s}.attendance WHERE date BETWEEN :start AND :end"
+        ' AND employee_id IN (SELECT id FROM {s}."user" WHERE supervisor_id = :supervisor_id)'
+    ),
+    "daily attendance (all sites)": (
+        "SELECT count(*) FROM {s}.attendance WHERE date = :day"
+    ),
+    "pending approvals": (
+        "SELECT count(*) FROM {s}.leaverequest"
+        " WHERE supervisor_id = :supervisor_id AND status = 'PENDING'"
+    ),
+    "supervisor leave list": (
+        "SELECT id FROM {s}.leaverequest WHERE supervisor_id = :supervisor_id"
+        " AND status = 'APPROVED'"
+    ),
+    "employee leave overlap": (
+        "SELECT id FROM {s}.leaverequest WHERE employee_id = :employee_id"
+        " AND start_date <= :end AND end_date >= :start"
+    ),
+    "active team": (
+        "SELECT laborer_id FROM {s}.teamassignment"
+        " WHERE supervisor_id = :supervisor_id AND is_active"
+    ),
+    "direct reports": (
+        'SELECT id FROM {s}."user" WHERE supervisor_id = :supervisor_id'
+    ),
+}
+
+
+def copy_tables(conn: Connection) -> list[Table]:
+    metadata = MetaData()
+    tables = [
+        model.__table__.to_metadata(metadata, schema=SCHEMA)  # type: ignore[union-attr]
+        for model in (User, Attendance, LeaveRequest, TeamAssignment)
+    ]
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table in tables:
+        conn.execute(CreateTable(table, include_foreign_key_constraints=[]))
+    return tables
+
+
+def seed(conn: Connection, rows: int) -> None:
+    days = 250
+    employees = max(rows // days, LABORERS_PER_SUPERVISOR)
+    supervisors = max(employees // LABORERS_PER_SUPERVISOR, 1)
+    s = SCHEMA
+    conn.execute(
+        text(f"""
+        INSERT INTO {s}."user"
+            (id, email, is_active, is_superuser, role, hashed_password, supervisor_id)
+        SELECT
+            md5('user' || n)::uuid, 'user' || n || '@example.com', true, false,
+            CASE WHEN n <= :supervisors THEN 'SUPERVISOR' ELSE 'LABORER' END::userrole,
+            'x',
+            CASE WHEN n > :supervisors
+                THEN md5('user' || (1 + n % :supervisors))::uuid END
+        FROM generate_series(1, :supervisors + :employees) AS n
+        """),
+        {"supervisors": supervisors, "employees": employees},
+    )
+    conn.execute(
+        text(f"""
+        INSERT INTO {s}.attendance
+            (id, employee_id, date, check_in, check_out, break_duration, created_at)
+        SELECT
+            gen_random_uuid(), u.id, d, d + interval '7 hours',
+            d + interval '15 hours', 30, d
+        FROM {s}."user" AS u
+        CROSS JOIN generate_series(
+            date '2025-01-01', date '2025-01-01' + :days - 1, interval '1 day'
+        ) AS d
+        WHERE u.supervisor_id IS NOT NULL
+        """),
+        {"days": days},
+    )
+    conn.execute(
+        text(f"""
+        INSERT INTO {s}.leaverequest
+            (id, employee_id, supervisor_id, leave_type, reason, status,
+             start_date, end_date, created_at, updated_at)
+        SELECT
+            gen_random_uuid(), u.id, u.supervisor_id, 'sick', 'bench',
+            (ARRAY['PENDING', 'APPROVED', 'APPROVED', 'REJECTED'])[1 + k % 4]::leavestatus,
+            date '2025-01-01' + k * 20, date '2025-01-01' + k * 20 + 2, now(), now()
+        FROM {s}."user" AS u CROSS JOIN generate_series(0, 11) AS k
+        WHERE u.supervisor_id IS NOT NULL
+        """)
+    )
+    conn.execute(
+        text(f"""
+        INSERT INTO {s}.teamassignment
+            (id, team_name, supervisor_id, laborer_id, assigned_date, is_active)
+        SELECT
+            gen_random_uuid(), 'team', u.supervisor_id, u.id,
+            now() - k * interval '90 days', k = 0
+        FROM {s}."user" AS u CROSS JOIN generate_series(0, 3) AS k
+        WHERE u.supervisor_id IS NOT NULL
+        """)
+    )
+    conn.execute(
+        text(
+            f'ANALYZE {s}."user", {s}.attendance, {s}.leaverequest, {s}.teamassignment'
+        )
+    )
+
+
+def sample_parameters(conn: Connection) -> dict[str, Any]:
+    s = SCHEMA
+    supervisor_id, employee_id = conn.execute(
+        text(
+            f'SELECT supervisor_id, id FROM {s}."user" WHERE supervisor_id IS NOT NULL LIMIT 1'
+        )
+    ).one()
+    return {
+        "supervisor_id": supervisor_id,
+        "employee_id": employee_id,
+        "day": "2025-03-03",
+        "start": "2025-03-01",
+        "end": "2025-03-31",
+    }
+
+
+def _scan_nodes(plan: dict[str, Any]) -> Iterator[str]:
+    if "Relation Name" in plan or "Index Name" in plan:
+        node = plan["Node Type"]
+        if "Relation Name" in plan:
+            node += f" on {plan['Relation Name']}"
+        if "Index Name" in plan:
+            node += f" using {plan['Index Name']}"
+        yield node
+    for child in plan.get("Plans", []):
+        yield from _scan_nodes(child)
+
+
+def explain(
+    conn: Connection, parameters: dict[str, Any]
+) -> dict[str, tuple[list[str], float]]:
+    results = {}
+    for name, query in QUERIES.items():
+        statement = text("EXPLAIN (ANALYZE, FORMAT JSON) " + query.format(s=SCHEMA))
+        plan = conn.execute(statement, parameters).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        results[name] = (list(_scan_nodes(plan[0]["Plan"])), plan[0]["Execution Time"])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        tables = copy_tables(conn)
+        started = time.perf_counter()
+        seed(conn, args.rows)
+        logger.info(
+            f"Seeded {args.rows} attendance rows in {time.perf_counter() - started:.1f}s"
+        )
+        parameters = sample_parameters(conn)
+
+        before = explain(conn, parameters)
+        for table in tables:
+            for index in table.indexes:
+                index.create(conn)
+        conn.execute(text(f"ANALYZE {SCHEMA}.attendance, {SCHEMA}.leaverequest"))
+        after = explain(conn, parameters)
+
+        for name in QUERIES:
+            plan_before, ms_before = before[name]
+            plan_after, ms_after = after[name]
+            print(f"\n{name}: {ms_before:.2f} ms -> {ms_after:.2f} ms")
+            print(f"  before: {'; '.join(plan_before)}")
+            print(f"  after:  {'; '.join(plan_after)}")
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Load test the check-in and check-out endpoints with many concurrent laborers.
+
+Creates `--users` scratch laborers, has each one check in and check out against
+a running server with at most `--concurrency` requests in flight, reports
+throughput and latency percentiles, then removes the scratch data:
+
+    python -m app.benchmarks.checkin_load --base-url http://localhost:8000
+
+Run it against a build before the async routes to compare the two.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import delete, insert
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import create_access_token, get_password_hash
+from app.models import Attendance, AttendanceDailyFact, User, UserRole
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+EMAIL_DOMAIN = "checkin-load.example.com"
+
+
+def create_laborers(count: int) -> list[uuid.UUID]:
+    # One shared hash: the benchmark authenticates with tokens, not passwords
+    hashed_password = get_password_hash(uuid.uuid4().hex)
+    ids = [uuid.uuid4() for _ in range(count)]
+    rows = [
+        {
+            "id": id,
+            "email": f"laborer{i}@{EMAIL_DOMAIN}",
+            "hashed_password": hashed_password,
+            "role": UserRole.LABORER,
+            "is_active": True,
+            "is_superuser": False,
+        }
+        for i, id in enumerate(ids)
+    ]
+    with Session(engine) as session:
+        session.execute(insert(User), rows)
+        session.commit()
+    return ids
+
+
+def remove_laborers() -> None:
+    with Session(engine) as session:
+        user_ids = select(User.id).where(col(User.email).like(f"%@{EMAIL_DOMAIN}"))
+        session.execute(
+            delete(AttendanceDailyFact).where(
+                col(AttendanceDailyFact.employee_id).in_(user_ids)
+            )
+        )
+        session.execute(
+            delete(Attendance).where(col(Attendance.employee_id).in_(user_ids))
+        )
+        session.execute(delete(User).where(col(User.id).in_(user_ids)))
+        session.commit()
+
+
+async def run_shift(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    user_id: uuid.UUID,
+    latencies: dict[str, list[float]],
+) -> None:
+    token = create_access_token(user_id, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with semaphore:
+        started = time.perf_counter()
+        response = await client.post(
+            f"{settings.API_V1_STR}/attendance/",
+            headers=headers,
+            json={"check_in": datetime.utcnow().isoformat()},
+        )
+        latencies["check-in"].append(time.perf_counter() - started)
+    response.raise_for_status()
+    attendance_id = response.json()["id"]
+
+    async with semaphore:
+        started = time.perf_counter()
+        response = await client.post(
+            f"{settings.API_V1_STR}/attendance/check-out/{attendance_id}",
+            headers=headers,
+        )
+        latencies["check-out"].append(time.perf_counter() - started)
+    response.raise_for_status()
+
+
+async def run(base_url: str, user_ids: list[uuid.UUID], concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: dict[str, list[float]] = {"check-in": [], "check-out": []}
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(run_shift(client, semaphore, user_id, latencies) for user_id in user_ids)
+        )
+        elapsed = time.perf_counter() - started
+
+    requests = sum(len(values) for values in latencies.values())
+    print(
+        f"\n{requests} requests from {len(user_ids)} laborers, "
+        f"concurrency {concurrency}: {elapsed:.2f}s, {requests / elapsed:.1f} req/s"
+    )
+    for name, values in latencies.items():
+        quantiles = statistics.quantiles(values, n=100)
+        print(
+            f"  {name}: p50 {quantiles[49] * 1000:.1f} ms, "
+            f"p95 {quantiles[94] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    remove_laborers()
+    user_ids = create_laborers(args.users)
+    logger.info(f"Created {len(user_ids)} laborers")
+    try:
+        asyncio.run(run(args.base_url, user_ids, args.concurrency))
+    finally:
+        remove_laborers()
+
+
+if __name__ == "__main__":
+    main()
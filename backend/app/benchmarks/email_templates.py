@@ -0,0 +1,82 @@
+"""
+Compare email renders per second when each email reads and compiles its
+template (how `render_email_template` used to work) against the precompiled
+template registry, one render at a time and in batches:
+
+    python -m app.benchmarks.email_templates --emails 5000
+"""
+
+import argparse
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from jinja2 import Template
+
+from app.utils import EMAIL_TEMPLATES_DIR, EmailTemplates
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME = "reset_password.html"
+
+
+def contexts(emails: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "project_name": "Benchmark",
+            "username": f"user{i}@example.com",
+            "email": f"user{i}@example.com",
+            "valid_hours": 48,
+            "link": f"https://example.com/reset-password?token={i:032x}",
+        }
+        for i in range(emails)
+    ]
+
+
+def read_and_compile(batch: list[dict[str, Any]]) -> list[str]:
+    return [
+        Template((EMAIL_TEMPLATES_DIR / TEMPLATE_NAME).read_text()).render(context)
+        for context in batch
+    ]
+
+
+def measure(render: Callable[[list[dict[str, Any]]], list[str]], emails: int) -> float:
+    batch = contexts(emails)
+    started = time.perf_counter()
+    rendered = render(batch)
+    elapsed = time.perf_counter() - started
+    assert len(rendered) == emails
+    return emails / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--emails", type=int, default=5000)
+    args = parser.parse_args()
+
+    templates = EmailTemplates()
+    started = time.perf_counter()
+    loaded = templates.load()
+    logger.info(
+        f"Loaded {loaded} templates from {EMAIL_TEMPLATES_DIR.name} "
+        f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+
+    def one_at_a_time(batch: list[dict[str, Any]]) -> list[str]:
+        return [templates.render(TEMPLATE_NAME, context) for context in batch]
+
+    def batched(batch: list[dict[str, Any]]) -> list[str]:
+        return templates.render_many(TEMPLATE_NAME, batch)
+
+    for name, render in (
+        ("read and compile per email", read_and_compile),
+        ("registry, one at a time", one_at_a_time),
+        ("registry, batched", batched),
+    ):
+        print(f"{name}: {measure(render, args.emails):.0f} renders/s")
+
+
+if __name__ == "__main__":
+    main()
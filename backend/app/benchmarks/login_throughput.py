@@ -0,0 +1,87 @@
+"""
+Compare password checks per second in the request threadpool (how the sync
+login route verified passwords) against the dedicated hashing process pool.
+
+Also reports the worst event loop stall seen while the checks run, which is
+what every other request on the worker waits through:
+
+    python -m app.benchmarks.login_throughput --logins 64 --workers 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.security import PasswordHasher, _verify, pwd_context
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PASSWORD = "correct horse battery staple"
+HEARTBEAT_INTERVAL = 0.01
+
+
+async def heartbeat(stop: asyncio.Event) -> float:
+    # Longest delay beyond the expected interval before the loop woke us up
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        worst = max(worst, time.perf_counter() - started - HEARTBEAT_INTERVAL)
+    return worst
+
+
+async def measure(
+    verify: Callable[[str, str], Awaitable[bool]], hashed: str, logins: int
+) -> tuple[float, float]:
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify(PASSWORD, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    assert all(results)
+    return logins / elapsed, await monitor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash(PASSWORD)
+    cores = min(args.workers, os.cpu_count() or 1)
+    logger.info(f"bcrypt rounds {pwd_context.handler('bcrypt').default_rounds}")
+
+    async def threadpool(plain: str, hashed: str) -> bool:
+        return await run_in_threadpool(_verify, plain, hashed)
+
+    hasher = PasswordHasher(workers=args.workers, max_queue=args.logins)
+    # Start the worker processes before timing
+    hasher.submit(_verify, PASSWORD, hashed).result()
+
+    async def process_pool(plain: str, hashed: str) -> bool:
+        return await hasher.run_async(_verify, plain, hashed)
+
+    try:
+        for name, verify in (
+            ("threadpool", threadpool),
+            ("process pool", process_pool),
+        ):
+            rate, stall = asyncio.run(measure(verify, hashed, args.logins))
+            print(
+                f"{name}: {rate:.1f} logins/s, {rate / cores:.1f} per core "
+                f"({cores} cores), worst event loop stall {stall * 1000:.1f} ms"
+            )
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
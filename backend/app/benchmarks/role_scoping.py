@@ -0,0 +1,149 @@
+"""
+Compare a supervisor's attendance summary scoped with a materialized list of
+team member ids (`IN (:id_1, ..., :id_n)`) against the subquery built by
+`app.scoping.employee_scope`.
+
+Creates one scratch supervisor with `--employees` laborers and `--days` days
+of daily facts, runs both variants `--repeat` times and removes the scratch
+data again:
+
+    python -m app.benchmarks.role_scoping --employees 10000
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import delete, text
+from sqlmodel import Session, col, select
+
+from app import reports, scoping
+from app.core.db import engine
+from app.models import AttendanceDailyFact, User, UserRole
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMAIL_DOMAIN = "role-scoping.example.com"
+START_DATE = date(2025, 1, 1)
+
+
+def seed(session: Session, employees: int, days: int) -> User:
+    supervisor = User(
+        email=f"supervisor@{EMAIL_DOMAIN}",
+        hashed_password="x",
+        role=UserRole.SUPERVISOR,
+    )
+    session.add(supervisor)
+    session.flush()
+    session.execute(
+        text("""
+        INSERT INTO "user"
+            (id, email, is_active, is_superuser, role, hashed_password, supervisor_id)
+        SELECT gen_random_uuid(), 'laborer' || n || '@' || :domain, true, false,
+            'LABORER', 'x', :supervisor_id
+        FROM generate_series(1, :employees) AS n
+        """),
+        {
+            "domain": EMAIL_DOMAIN,
+            "supervisor_id": supervisor.id,
+            "employees": employees,
+        },
+    )
+    session.execute(
+        text("""
+        INSERT INTO attendance_daily_fact
+            (employee_id, date, net_minutes, checked_out, updated_at)
+        SELECT u.id, d, 480, true, now()
+        FROM "user" AS u
+        CROSS JOIN generate_series(
+            CAST(:start AS date), CAST(:start AS date) + :days - 1, interval '1 day'
+        ) AS d
+        WHERE u.supervisor_id = :supervisor_id
+        """),
+        {"start": START_DATE, "days": days, "supervisor_id": supervisor.id},
+    )
+    session.execute(text('ANALYZE "user", attendance_daily_fact'))
+    session.commit()
+    return supervisor
+
+
+def remove(session: Session) -> None:
+    user_ids = select(User.id).where(col(User.email).like(f"%@{EMAIL_DOMAIN}"))
+    session.execute(
+        delete(AttendanceDailyFact).where(
+            col(AttendanceDailyFact.employee_id).in_(user_ids)
+        )
+    )
+    session.execute(delete(User).where(col(User.supervisor_id).in_(user_ids)))
+    session.execute(delete(User).where(col(User.email).like(f"%@{EMAIL_DOMAIN}")))
+    session.commit()
+
+
+def measure(
+    session: Session, conditions: Callable[[], list[Any]], repeat: int
+) -> tuple[float, int]:
+    timings = []
+    parameters = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        where = conditions()
+        reports.attendance_summary(session=session, where=where)
+        timings.append(time.perf_counter() - started)
+        statement = select(AttendanceDailyFact.date).where(*where)
+        compiled = statement.compile(
+            bind=engine, compile_kwargs={"render_postcompile": True}
+        )
+        parameters = len(compiled.params)
+    return statistics.median(timings), parameters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--employees", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    end_date = START_DATE + timedelta(days=args.days - 1)
+    period = [
+        AttendanceDailyFact.date >= START_DATE,
+        AttendanceDailyFact.date <= end_date,
+    ]
+
+    with Session(engine) as session:
+        remove(session)
+        supervisor = seed(session, args.employees, args.days)
+        logger.info(
+            f"Seeded {args.employees} laborers and "
+            f"{args.employees * args.days} daily facts"
+        )
+
+        def id_list() -> list[Any]:
+            # How the routes scoped a supervisor's reports before
+            ids = session.exec(scoping.direct_reports(supervisor.id)).all()
+            return [*period, col(AttendanceDailyFact.employee_id).in_(ids)]
+
+        def subquery() -> list[Any]:
+            return [
+                *period,
+                *scoping.employee_scope(AttendanceDailyFact.employee_id, supervisor),
+            ]
+
+        try:
+            for name, conditions in (("id list", id_list), ("subquery", subquery)):
+                seconds, parameters = measure(session, conditions, args.repeat)
+                print(
+                    f"{name}: median {seconds * 1000:.1f} ms over {args.repeat} runs, "
+                    f"{parameters} bind parameters"
+                )
+        finally:
+            remove(session)
+
+
+if __name__ == "__main__":
+    main()
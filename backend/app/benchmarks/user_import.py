@@ -0,0 +1,91 @@
+"""
+Compare creating laborer accounts one by one through `crud.create_user` (how
+onboarding a site worked before) against the bulk import pipeline:
+
+    python -m app.benchmarks.user_import --users 500
+
+Both runs create `--users` scratch users and report rows per second, then the
+scratch users are removed.
+"""
+
+import argparse
+import io
+import logging
+import os
+import time
+
+from sqlalchemy import delete
+from sqlmodel import Session, col
+
+from app import crud, importer
+from app.core.db import engine
+from app.core.security import password_hasher, pwd_context
+from app.models import User, UserCreate, UserRole
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMAIL_DOMAIN = "user-import.example.com"
+PASSWORD = "onboarding-password"
+
+
+def remove_users() -> None:
+    with Session(engine) as session:
+        session.execute(delete(User).where(col(User.email).like(f"%@{EMAIL_DOMAIN}")))
+        session.commit()
+
+
+def one_by_one(count: int) -> float:
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for i in range(count):
+            crud.create_user(
+                session=session,
+                user_create=UserCreate(
+                    email=f"single{i}@{EMAIL_DOMAIN}",
+                    password=PASSWORD,
+                    role=UserRole.LABORER,
+                ),
+            )
+    return time.perf_counter() - started
+
+
+def bulk(count: int) -> float:
+    lines = ["email,password,role"] + [
+        f"bulk{i}@{EMAIL_DOMAIN},{PASSWORD},laborer" for i in range(count)
+    ]
+    file = io.BytesIO("\n".join(lines).encode())
+    started = time.perf_counter()
+    with Session(engine) as session:
+        result = importer.import_users(
+            session=session, file=file, format=importer.ImportFormat.CSV
+        )
+    elapsed = time.perf_counter() - started
+    assert result.created == count, result.errors[:5]
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    logger.info(
+        f"bcrypt rounds {pwd_context.handler('bcrypt').default_rounds}, "
+        f"hashing workers {password_hasher.workers or os.cpu_count()}"
+    )
+    remove_users()
+    try:
+        for name, run in (("one by one", one_by_one), ("bulk import", bulk)):
+            elapsed = run(args.users)
+            print(
+                f"{name}: {args.users} users in {elapsed:.2f}s, "
+                f"{args.users / elapsed:.1f} rows/s"
+            )
+    finally:
+        remove_users()
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
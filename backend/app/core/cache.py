@@ -0,0 +1,120 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Hashable
+from datetime import date
+from typing import Any, Generic, TypeVar
+
+from app.core import notify
+from app.core.config import settings
+from app.models import UserRole
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+USER_CACHE_CHANNEL = "user_cache"
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after being set.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[K], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Authorization fields of recently authenticated users, keyed by token subject
+user_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user(session: Any, user_id: Any) -> None:
+    """
+    Drop a user from the cache. Call it in the transaction that changes or
+    deletes the user; with the shared backend the other workers drop it when
+    that transaction commits.
+    """
+    user_cache.pop(str(user_id))
+    if settings.USER_CACHE_BACKEND == "postgres":
+        notify.notify(session, USER_CACHE_CHANNEL, str(user_id))
+
+
+def start_user_cache_listener() -> notify.Listener | None:
+    if settings.USER_CACHE_BACKEND != "postgres":
+        return None
+    listener = notify.Listener(
+        USER_CACHE_CHANNEL, user_cache.pop, on_reconnect=user_cache.clear
+    )
+    listener.start()
+    return listener
+
+
+# Dashboard statistics, keyed by (role, user id, day)
+dashboard_cache: TTLCache[tuple[UserRole, uuid.UUID, date], dict[str, Any]] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.DASHBOARD_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_dashboards(
+    employee_ids: Collection[uuid.UUID], supervisor_ids: Collection[uuid.UUID | None]
+) -> None:
+    """
+    Drop the cached dashboards that count attendance or leave of these
+    employees: their own, their supervisors' and every admin's. A None
+    supervisor (not known to the caller) drops all supervisor dashboards.
+
+    Only this worker's cache is cleared, the others catch up within the TTL.
+    Call it after committing, so a concurrent request can't cache the old
+    counts again.
+    """
+
+    def affected(key: tuple[UserRole, uuid.UUID, date]) -> bool:
+        role, user_id, _ = key
+        if role == UserRole.SUPERVISOR:
+            return None in supervisor_ids or user_id in supervisor_ids
+        return role == UserRole.ADMIN or user_id in employee_ids
+
+    dashboard_cache.pop_where(affected)
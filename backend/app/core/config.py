@@ -35,6 +35,12 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Raising the cost rehashes existing passwords on their next login
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # Processes that hash passwords, per API worker (None: one per CPU, 0: inline)
+    PASSWORD_HASH_WORKERS: int | None = None
+    # Password checks waiting for a hashing process before new ones get a 503
+    PASSWORD_HASH_MAX_QUEUE: int = 64
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -56,6 +62,18 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Connection pool, per process
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_POOL_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 30
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    # Connecting through PgBouncer in transaction pooling mode: no app-side pool
+    POSTGRES_PGBOUNCER: bool = False
+    # Postgres itself, for what needs a session of its own (LISTEN, the job
+    # leader's advisory lock); defaults to POSTGRES_SERVER and POSTGRES_PORT
+    POSTGRES_DIRECT_SERVER: str | None = None
+    POSTGRES_DIRECT_PORT: int | None = None
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -69,6 +87,18 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_DIRECT_DATABASE_URI(self) -> MultiHostUrl:
+        return MultiHostUrl.build(
+            scheme="postgresql+psycopg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_DIRECT_SERVER or self.POSTGRES_SERVER,
+            port=self.POSTGRES_DIRECT_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -91,6 +121,42 @@ class Settings(BaseSettings):
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # Authorization fields of authenticated users are cached per worker. With
+    # the "postgres" backend, changes are broadcast to the other workers.
+    USER_CACHE_TTL_SECONDS: float = 30
+    USER_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_BACKEND: Literal["memory", "postgres"] = "memory"
+    # Dashboard statistics per user, dropped on this worker's attendance and
+    # leave writes
+    DASHBOARD_CACHE_TTL_SECONDS: float = 5
+    # Login QR codes: "memory" only works with a single API worker, "signed"
+    # codes only touch the database when they are used
+    QR_CODE_STORE: Literal["memory", "postgres", "signed"] = "postgres"
+    QR_CODE_EXPIRE_SECONDS: int = 300
+    # Periodic cleanup jobs; shared tables are purged by one elected worker
+    JOBS_ENABLED: bool = True
+    JOB_BATCH_SIZE: int = 1000
+    JOB_BATCH_PAUSE_SECONDS: float = 0.1
+    # Days after which deactivated team assignments are deleted (None: never,
+    # as they are the only record of past teams)
+    TEAM_ASSIGNMENT_RETENTION_DAYS: int | None = None
+    # Monthly attendance partitions created ahead of time, and the age in
+    # months after which they are detached for archiving (None: never)
+    ATTENDANCE_PARTITION_MONTHS_AHEAD: int = 3
+    ATTENDANCE_DETACH_AFTER_MONTHS: int | None = None
+    # Oldest badge time accepted by the bulk check-in and check-out
+    ATTENDANCE_BULK_MAX_AGE_DAYS: int = 7
+    # Emails are queued in the database and sent by a thread in each worker
+    # over a reused SMTP connection, retrying with exponential backoff; when
+    # disabled, emails are sent directly
+    EMAIL_QUEUE_ENABLED: bool = True
+    EMAIL_QUEUE_BATCH_SIZE: int = 50
+    EMAIL_QUEUE_POLL_SECONDS: float = 2
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_RETRY_BASE_SECONDS: float = 30
+    EMAIL_SMTP_IDLE_SECONDS: float = 60
+    EMAIL_RETENTION_DAYS: int = 7
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
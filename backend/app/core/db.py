@@ -1,10 +1,28 @@
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
+from app.core.pool import engine_options
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **engine_options())
+
+# Used by the `async def` routes; psycopg 3 serves both engines
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options(is_async=True)
+)
+
+# For the job leader's advisory lock, which belongs to the Postgres session
+# and so can't go through PgBouncer in transaction pooling mode
+direct_async_engine = (
+    create_async_engine(
+        str(settings.SQLALCHEMY_DIRECT_DATABASE_URI), poolclass=NullPool
+    )
+    if settings.POSTGRES_PGBOUNCER
+    else async_engine
+)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
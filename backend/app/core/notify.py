@@ -0,0 +1,73 @@
+import logging
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import psycopg
+from sqlmodel import func, select
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between reconnection attempts, and between checks for shutdown
+RETRY_INTERVAL = 5
+POLL_INTERVAL = 1
+
+
+def notify(session: Any, channel: str, payload: str) -> None:
+    """
+    Queue a Postgres notification on the session's transaction; listeners
+    receive it once the transaction commits, and not at all if it rolls back.
+    """
+    session.execute(select(func.pg_notify(channel, payload)))
+
+
+class Listener(threading.Thread):
+    """
+    LISTEN on a Postgres channel in a daemon thread and pass each payload to
+    `callback`. `on_reconnect` runs after the connection is (re)established,
+    since notifications sent while disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_reconnect: Callable[[], None] | None = None,
+    ) -> None:
+        super().__init__(name=f"listen-{channel}", daemon=True)
+        self.channel = channel
+        self.callback = callback
+        self.on_reconnect = on_reconnect
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except psycopg.Error:
+                logger.exception(f"Listening on {self.channel} failed, reconnecting")
+                self._stopped.wait(RETRY_INTERVAL)
+
+    def _listen(self) -> None:
+        with psycopg.connect(
+            host=settings.POSTGRES_DIRECT_SERVER or settings.POSTGRES_SERVER,
+            port=settings.POSTGRES_DIRECT_PORT or settings.POSTGRES_PORT,
+            user=settings.POSTGRES_USER,
+            password=settings.POSTGRES_PASSWORD,
+            dbname=settings.POSTGRES_DB,
+            autocommit=True,
+        ) as conn:
+            conn.execute(f'LISTEN "{self.channel}"')
+            if self.on_reconnect:
+                self.on_reconnect()
+            while not self._stopped.is_set():
+                for message in conn.notifies(timeout=POLL_INTERVAL):
+                    try:
+                        self.callback(message.payload)
+                    except Exception:
+                        logger.exception(f"Handling {self.channel} notification failed")
+
+    def stop(self) -> None:
+        self._stopped.set()
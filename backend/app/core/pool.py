@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """
+    Time spent waiting for a connection, per pool. With a NullPool this is the
+    time to open a new connection.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, wait: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _MeasuredPool(Pool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        return connection
+
+
+class MeasuredQueuePool(_MeasuredPool, QueuePool):
+    pass
+
+
+class MeasuredAsyncQueuePool(_MeasuredPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class MeasuredNullPool(_MeasuredPool, NullPool):
+    pass
+
+
+def engine_options(*, is_async: bool = False) -> dict[str, Any]:
+    """
+    Keyword arguments for `create_engine` / `create_async_engine` from the
+    POSTGRES_POOL_* settings. The pool is per process, so every uvicorn worker
+    opens up to POOL_SIZE + MAX_OVERFLOW connections.
+    """
+    if settings.POSTGRES_PGBOUNCER:
+        # PgBouncer in transaction pooling mode does the pooling, and a server
+        # connection may change between transactions, so prepared statements
+        # are disabled.
+        return {
+            "poolclass": MeasuredNullPool,
+            "connect_args": {"prepare_threshold": None},
+        }
+    return {
+        "poolclass": MeasuredAsyncQueuePool if is_async else MeasuredQueuePool,
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+    }
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if isinstance(metrics, PoolMetrics):
+        stats.update(metrics.snapshot())
+    return stats
@@ -1,12 +1,26 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 
 
 ALGORITHM = "HS256"
@@ -19,9 +33,145 @@ def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+class HashQueueFull(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a process pool, so a burst of logins doesn't hold the GIL
+    of the API worker. At most `max_queue` calls can be pending; more raise
+    HashQueueFull. With `workers=0` hashing runs in the calling thread.
+    """
+
+    def __init__(self, *, workers: int | None, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        return self.submit_many(fn, [args])[0]
+
+    def submit_many(
+        self, fn: Callable[..., T], calls: Sequence[tuple[Any, ...]]
+    ) -> "list[Future[T]]":
+        """
+        Submit `fn` once per argument tuple. Queue slots are reserved for all
+        the calls up front, so HashQueueFull is raised before any of them
+        starts rather than leaving part of the batch running.
+        """
+        futures: list[Future[T]] = []
+        try:
+            with self._lock:
+                if self._pending + len(calls) > self.max_queue:
+                    raise HashQueueFull()
+                if self._executor is None:
+                    # Forking would copy the parent's open database connections
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                self._pending += len(calls)
+                try:
+                    for args in calls:
+                        futures.append(self._executor.submit(fn, *args))
+                except BaseException:
+                    # Submitted calls give their slot back once cancelled
+                    self._pending -= len(calls) - len(futures)
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            # Outside the lock, as a finished future runs the callback at once
+            for future in futures:
+                future.add_done_callback(self._done)
+        return futures
+
+    def _done(self, _future: "Future[Any]") -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.workers == 0:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.workers == 0:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+# Module level so they can be sent to the pool's worker processes
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def _hash_many(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hasher.run(_verify, plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return password_hasher.run(_hash, password)
+
+
+def get_password_hashes(passwords: Sequence[str]) -> list[str]:
+    """
+    Hash many passwords, e.g. for a bulk import, split into one slice per
+    hashing process so they are hashed in parallel. Each slice takes a single
+    queue slot, so an import doesn't fill the queue that logins wait in.
+    """
+    if password_hasher.workers == 0 or not passwords:
+        return _hash_many(list(passwords))
+    workers = password_hasher.workers or os.cpu_count() or 1
+    size = math.ceil(len(passwords) / workers)
+    futures = password_hasher.submit_many(
+        _hash_many,
+        [(list(passwords[i : i + size]),) for i in range(0, len(passwords), size)],
+    )
+    return [hashed for future in futures for hashed in future.result()]
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify the password and, if the hash uses outdated settings (e.g. a lower
+    bcrypt cost), also return a new hash to store.
+    """
+    return password_hasher.run(_verify_and_update, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await password_hasher.run_async(
+        _verify_and_update, plain_password, hashed_password
+    )
@@ -1,9 +1,15 @@
 import uuid
 from typing import Any
 
-from sqlmodel import Session, select, func
-
-from app.core.security import get_password_hash, verify_password
+from sqlmodel import Session, col, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import invalidate_user
+from app.core.security import (
+    get_password_hash,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
 from app.models import Item, ItemCreate, User, UserCreate, UserUpdate ,Worker, WorkerCreate, WorkerUpdate
 
 
@@ -26,6 +32,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
         extra_data["hashed_password"] = hashed_password
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
+    invalidate_user(session, db_user.id)
     session.commit()
     session.refresh(db_user)
     return db_user
@@ -41,8 +48,37 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
+    return db_user
+
+
+async def get_user_by_email_async(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    return (await session.exec(statement)).first()
+
+
+async def authenticate_async(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email_async(session=session, email=email)
+    if not db_user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash:
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
     return db_user
 
 
@@ -65,12 +101,22 @@ def get_worker(*, session: Session, id: uuid.UUID) -> Worker | None:
     return session.get(Worker, id)
 
 def get_workers(
-    *, session: Session, skip: int = 0, limit: int = 100, owner_id: uuid.UUID | None = None
+    *,
+    session: Session,
+    skip: int = 0,
+    limit: int = 100,
+    owner_id: uuid.UUID | None = None,
+    after: uuid.UUID | None = None,
 ) -> list[Worker]:
     query = select(Worker)
     if owner_id is not None:
         query = query.where(Worker.owner_id == owner_id)
-    return list(session.exec(query.offset(skip).limit(limit)))
+    # Keyset pagination on id when resuming after a known worker
+    if after is not None:
+        query = query.where(col(Worker.id) > after)
+    else:
+        query = query.offset(skip)
+    return list(session.exec(query.order_by(col(Worker.id)).limit(limit)))
 
 def get_workers_count(*, session: Session, owner_id: uuid.UUID | None = None) -> int:
     query = select(Worker)
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from emails.backend.smtp import SMTPBackend  # type: ignore
+from emails.message import Message
+from sqlalchemy import update
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import OutboundEmail, OutboundEmailStatus
+
+logger = logging.getLogger(__name__)
+
+# Seconds a claimed email is hidden from other workers while it is sent; a
+# worker that dies mid-batch leaves its emails to be retried after this
+LEASE_SECONDS = 300
+# Longest wait between two attempts at the same email
+MAX_RETRY_SECONDS = 60 * 60
+
+# Set when this process queues an email, so its worker sends it at once
+# instead of on the next poll
+email_queued = threading.Event()
+
+
+def enqueue(
+    session: Session, *, email_to: str, subject: str, html_content: str
+) -> OutboundEmail:
+    """
+    Queue an email on the session's transaction; it is sent once the
+    transaction commits, and not at all if it rolls back. The body is only
+    kept until the email is sent or given up on, as it can hold a password
+    reset link.
+    """
+    email = OutboundEmail(email_to=email_to, subject=subject, html_content=html_content)
+    session.add(email)
+    return email
+
+
+def queue_email(*, email_to: str, subject: str, html_content: str) -> None:
+    with Session(engine) as session:
+        enqueue(session, email_to=email_to, subject=subject, html_content=html_content)
+        session.commit()
+    email_queued.set()
+
+
+def send_now(*, email_to: str, subject: str, html_content: str) -> None:
+    """
+    Send an email right away over its own SMTP connection, for instances
+    that don't queue emails (EMAIL_QUEUE_ENABLED=false).
+    """
+    assert settings.EMAILS_FROM_EMAIL
+    message = Message(
+        subject=subject,
+        html=html_content,
+        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+    )
+    backend = smtp_backend()
+    try:
+        response = message.send(to=email_to, smtp=backend)
+    finally:
+        backend.close()
+    logger.info(f"send email result: {response}")
+
+
+def retry_delay(attempts: int) -> timedelta:
+    # Doubles with each failed attempt
+    seconds = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, MAX_RETRY_SECONDS))
+
+
+def smtp_backend() -> SMTPBackend:
+    smtp_options: dict[str, Any] = {
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+    }
+    if settings.SMTP_TLS:
+        smtp_options["tls"] = True
+    elif settings.SMTP_SSL:
+        smtp_options["ssl"] = True
+    if settings.SMTP_USER:
+        smtp_options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        smtp_options["password"] = settings.SMTP_PASSWORD
+    # Raise on errors so the email is retried
+    return SMTPBackend(fail_silently=False, **smtp_options)
+
+
+class EmailWorker(threading.Thread):
+    """
+    Send queued emails from a daemon thread, EMAIL_QUEUE_BATCH_SIZE at a
+    time, over one SMTP connection that is kept open between batches and
+    closed after EMAIL_SMTP_IDLE_SECONDS without use.
+
+    Every backend worker runs one. Batches are claimed with SKIP LOCKED and
+    leased for LEASE_SECONDS, so workers never send the same email twice
+    unless one of them dies mid-batch. A failed email is retried after
+    EMAIL_RETRY_BASE_SECONDS, doubling each time, and marked failed after
+    EMAIL_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, backend_factory: Callable[[], Any] = smtp_backend) -> None:
+        super().__init__(name="email-queue", daemon=True)
+        self.backend_factory = backend_factory
+        self._backend: Any = None
+        self._last_used = 0.0
+        self._stopped = threading.Event()
+
+    def claim(self) -> list[OutboundEmail]:
+        now = datetime.utcnow()
+        due = (
+            select(OutboundEmail.id)
+            .where(
+                OutboundEmail.status == OutboundEmailStatus.PENDING,
+                col(OutboundEmail.next_attempt_at) <= now,
+            )
+            .order_by(col(OutboundEmail.next_attempt_at))
+            .limit(settings.EMAIL_QUEUE_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(OutboundEmail)
+            .where(col(OutboundEmail.id).in_(due.scalar_subquery()))
+            .values(
+                attempts=OutboundEmail.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=LEASE_SECONDS),
+            )
+            .returning(OutboundEmail)
+        )
+        with Session(engine, expire_on_commit=False) as session:
+            batch = list(session.execute(statement).scalars())
+            session.commit()
+        return batch
+
+    def _send(self, email: OutboundEmail) -> None:
+        if self._backend is None:
+            self._backend = self.backend_factory()
+        # Only started with emails enabled, which requires a sender
+        assert settings.EMAILS_FROM_EMAIL
+        message = Message(
+            subject=email.subject,
+            html=email.html_content,
+            mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+        )
+        try:
+            message.send(to=email.email_to, smtp=self._backend)
+        except Exception:
+            # The connection may be unusable, start the next email afresh
+            self._close_backend()
+            raise
+        finally:
+            self._last_used = time.monotonic()
+
+    def send_batch(self, batch: list[OutboundEmail]) -> int:
+        """
+        Send the claimed emails and record the outcome; returns how many were
+        sent.
+        """
+        sent = []
+        failed: list[tuple[OutboundEmail, str]] = []
+        for email in batch:
+            try:
+                self._send(email)
+            except Exception as e:
+                logger.warning(f"Sending email {email.id} failed: {e!r}")
+                failed.append((email, repr(e)[:1000]))
+            else:
+                sent.append(email.id)
+
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            if sent:
+                session.execute(
+                    update(OutboundEmail)
+                    .where(col(OutboundEmail.id).in_(sent))
+                    .values(
+                        status=OutboundEmailStatus.SENT, sent_at=now, html_content=""
+                    )
+                )
+            for email, error in failed:
+                values: dict[str, Any] = {"last_error": error}
+                if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                    values["status"] = OutboundEmailStatus.FAILED
+                    values["html_content"] = ""
+                else:
+                    values["next_attempt_at"] = now + retry_delay(email.attempts)
+                session.execute(
+                    update(OutboundEmail)
+                    .where(col(OutboundEmail.id) == email.id)
+                    .values(**values)
+                )
+            session.commit()
+        return len(sent)
+
+    def drain(self) -> int:
+        """
+        Send due emails until none are left; returns how many were sent.
+        """
+        sent = 0
+        while not self._stopped.is_set():
+            batch = self.claim()
+            if not batch:
+                break
+            sent += self.send_batch(batch)
+        return sent
+
+    def _close_backend(self) -> None:
+        backend, self._backend = self._backend, None
+        if backend is not None:
+            try:
+                backend.close()
+            except Exception:
+                logger.exception("Closing the SMTP connection failed")
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                sent = self.drain()
+                if sent:
+                    logger.info(f"Sent {sent} queued emails")
+            except Exception:
+                logger.exception("Sending queued emails failed")
+            idle = time.monotonic() - self._last_used
+            if self._backend is not None and idle > settings.EMAIL_SMTP_IDLE_SECONDS:
+                self._close_backend()
+            email_queued.wait(settings.EMAIL_QUEUE_POLL_SECONDS)
+            email_queued.clear()
+        self._close_backend()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        email_queued.set()
+
+
+def start_email_worker() -> EmailWorker | None:
+    if not (settings.EMAIL_QUEUE_ENABLED and settings.emails_enabled):
+        return None
+    worker = EmailWorker()
+    worker.start()
+    return worker
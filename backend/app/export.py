@@ -0,0 +1,70 @@
+import csv
+import io
+from collections.abc import Iterator
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, SQLModel
+
+from app.core.db import engine
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _rows(statement: Any) -> Iterator[Any]:
+    # The request session is closed once the endpoint returns, so the stream
+    # reads through its own session and server-side cursor.
+    with Session(engine) as session:
+        result = session.exec(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        yield from result
+
+
+def _csv_lines(statement: Any, model: type[SQLModel]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(model.model_fields))
+    writer.writeheader()
+    for row in _rows(statement):
+        writer.writerow(model.model_validate(row).model_dump(mode="json"))
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(statement: Any, model: type[SQLModel]) -> Iterator[str]:
+    for row in _rows(statement):
+        yield model.model_validate(row).model_dump_json() + "\n"
+
+
+def export_response(
+    statement: Any, model: type[SQLModel], format: ExportFormat, filename: str
+) -> StreamingResponse:
+    """
+    Stream the rows selected by `statement`, serialized as `model`, as they are
+    fetched from the database.
+    """
+    if format == ExportFormat.CSV:
+        content = _csv_lines(statement, model)
+    else:
+        content = _ndjson_lines(statement, model)
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{format.value}"'
+        },
+    )
@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import Callable, Iterator
+from enum import Enum
+from itertools import islice
+from typing import Any, BinaryIO, TypeVar
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, SQLModel, col, select
+
+from app.core.security import get_password_hashes
+from app.models import (
+    ImportResult,
+    ImportRowError,
+    User,
+    UserCreate,
+    Worker,
+    WorkerCreate,
+)
+
+# Rows validated, hashed and inserted together
+IMPORT_BATCH_SIZE = 500
+
+M = TypeVar("M", bound=SQLModel)
+
+# Line in the file, and the parsed row or why it couldn't be parsed
+ParsedRow = tuple[int, dict[str, Any] | str]
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
+class ImportFileError(Exception):
+    pass
+
+
+def _csv_rows(file: BinaryIO) -> Iterator[ParsedRow]:
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    for row in reader:
+        # Empty cells are missing values, cells beyond the header are ignored
+        yield (
+            reader.line_num,
+            {
+                key: value
+                for key, value in row.items()
+                if key and value not in ("", None)
+            },
+        )
+
+
+def _jsonl_rows(file: BinaryIO) -> Iterator[ParsedRow]:
+    for line, raw in enumerate(io.TextIOWrapper(file, encoding="utf-8"), start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line, "Expected a JSON object"
+            continue
+        yield line, row
+
+
+def _parse(file: BinaryIO, format: ImportFormat) -> Iterator[list[ParsedRow]]:
+    rows = _csv_rows(file) if format == ImportFormat.CSV else _jsonl_rows(file)
+    try:
+        while chunk := list(islice(rows, IMPORT_BATCH_SIZE)):
+            yield chunk
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"Could not read the file: {e}") from e
+
+
+def _error_messages(e: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in e.errors()
+    ]
+
+
+def _import(
+    file: BinaryIO,
+    format: ImportFormat,
+    model: type[M],
+    insert_chunk: Callable[[list[tuple[int, M]]], list[ImportRowError]],
+) -> ImportResult:
+    """
+    Parse and validate the file a chunk at a time and hand the valid rows of
+    each chunk to `insert_chunk`, which returns the rows it didn't create.
+    """
+    result = ImportResult(created=0, errors=[])
+    for chunk in _parse(file, format):
+        valid: list[tuple[int, M]] = []
+        for line, row in chunk:
+            if isinstance(row, str):
+                result.errors.append(ImportRowError(line=line, errors=[row]))
+                continue
+            try:
+                valid.append((line, model.model_validate(row)))
+            except ValidationError as e:
+                result.errors.append(
+                    ImportRowError(line=line, errors=_error_messages(e))
+                )
+        if valid:
+            rejected = insert_chunk(valid)
+            result.created += len(valid) - len(rejected)
+            result.errors.extend(rejected)
+    result.errors.sort(key=lambda error: error.line)
+    return result
+
+
+def _insert_users(
+    session: Session, users: list[tuple[int, UserCreate]]
+) -> list[ImportRowError]:
+    rejected: list[ImportRowError] = []
+    emails = {user.email for _, user in users}
+    taken = set(
+        session.exec(select(User.email).where(col(User.email).in_(emails))).all()
+    )
+    # Imported rows get new ids, so supervisors must be existing users
+    supervisor_ids = {user.supervisor_id for _, user in users if user.supervisor_id}
+    supervisors = set(
+        session.exec(select(User.id).where(col(User.id).in_(supervisor_ids))).all()
+    )
+    new: list[tuple[int, UserCreate]] = []
+    for line, user in users:
+        if user.email in taken:
+            rejected.append(
+                ImportRowError(line=line, errors=["email: The user already exists"])
+            )
+            continue
+        if user.supervisor_id and user.supervisor_id not in supervisors:
+            rejected.append(
+                ImportRowError(
+                    line=line, errors=["supervisor_id: The supervisor does not exist"]
+                )
+            )
+            continue
+        taken.add(user.email)
+        new.append((line, user))
+    if not new:
+        return rejected
+
+    hashes = get_password_hashes([user.password for _, user in new])
+    rows = [
+        User.model_validate(user, update={"hashed_password": hashed}).model_dump()
+        for (_, user), hashed in zip(new, hashes, strict=True)
+    ]
+    # Users created concurrently since the check above are skipped
+    statement = (
+        pg_insert(User)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(col(User.email))
+    )
+    inserted = set(session.execute(statement).scalars())
+    rejected.extend(
+        ImportRowError(line=line, errors=["email: The user already exists"])
+        for line, user in new
+        if user.email not in inserted
+    )
+    return rejected
+
+
+def import_users(
+    *, session: Session, file: BinaryIO, format: ImportFormat
+) -> ImportResult:
+    """
+    Create users from a CSV or JSONL file with the fields of UserCreate.
+
+    Rows that don't validate, whose email is taken or whose supervisor doesn't
+    exist are reported and skipped.
+    Passwords of each chunk are hashed in parallel and the chunk is inserted
+    with one statement; everything is committed at the end.
+    """
+    result = _import(
+        file, format, UserCreate, lambda users: _insert_users(session, users)
+    )
+    session.commit()
+    return result
+
+
+def import_workers(
+    *, session: Session, file: BinaryIO, format: ImportFormat, owner_id: uuid.UUID
+) -> ImportResult:
+    """
+    Create workers owned by `owner_id` from a CSV or JSONL file with the fields
+    of WorkerCreate. Rows that don't validate are reported and skipped.
+    """
+
+    def insert_chunk(workers: list[tuple[int, WorkerCreate]]) -> list[ImportRowError]:
+        rows = [
+            Worker.model_validate(worker, update={"owner_id": owner_id}).model_dump()
+            for _, worker in workers
+        ]
+        session.execute(insert(Worker), rows)
+        return []
+
+    result = _import(file, format, WorkerCreate, insert_chunk)
+    session.commit()
+    return result
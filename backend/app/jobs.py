@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, delete, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import col, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import partitions
+from app.core import db
+from app.core.config import settings
+from app.models import OutboundEmail, OutboundEmailStatus, QRCode, TeamAssignment
+from app.qr_codes import MemoryQRCodeStore, qr_code_store
+
+logger = logging.getLogger(__name__)
+
+# Held by the worker that runs the shared jobs; any constant unique to the app
+LEADER_LOCK_ID = 0x5E7E_0001
+# Seconds between checks for due jobs and for a free leader lock
+TICK_INTERVAL = 10
+
+
+@dataclass
+class Job:
+    """
+    A periodic task returning how many rows (or partitions) it processed.
+    Jobs that work on shared tables run on the leader only; the others run on
+    every worker.
+    """
+
+    name: str
+    interval: float
+    run: Callable[[], Awaitable[int]]
+    leader_only: bool = True
+    next_run: float = 0
+    last_rows: int | None = None
+    last_seconds: float | None = None
+
+
+async def delete_in_batches(id_column: Any, *conditions: Any) -> int:
+    """
+    Delete the rows matching `conditions` JOB_BATCH_SIZE at a time, each
+    batch in its own transaction with a pause in between, so a large backlog
+    doesn't hold locks or saturate the database. Returns the rows deleted.
+    """
+    table = id_column.table
+    batch = select(id_column).where(*conditions).limit(settings.JOB_BATCH_SIZE)
+    statement = delete(table).where(id_column.in_(batch.scalar_subquery()))
+    deleted = 0
+    while True:
+        async with AsyncSession(db.async_engine) as session:
+            result = cast(CursorResult[Any], await session.execute(statement))
+            await session.commit()
+        deleted += result.rowcount
+        if result.rowcount < settings.JOB_BATCH_SIZE:
+            return deleted
+        await asyncio.sleep(settings.JOB_BATCH_PAUSE_SECONDS)
+
+
+async def purge_expired_qr_codes() -> int:
+    if isinstance(qr_code_store, MemoryQRCodeStore):
+        return await qr_code_store.purge()
+    # Also drops the nonces of used signed codes once they have expired
+    return await delete_in_batches(
+        col(QRCode.id), col(QRCode.expires_at) <= datetime.utcnow()
+    )
+
+
+async def purge_inactive_team_assignments() -> int:
+    if settings.TEAM_ASSIGNMENT_RETENTION_DAYS is None:
+        return 0
+    # Assignments have no deactivation date, the assignment date bounds it
+    cutoff = datetime.utcnow() - timedelta(days=settings.TEAM_ASSIGNMENT_RETENTION_DAYS)
+    return await delete_in_batches(
+        col(TeamAssignment.id),
+        col(TeamAssignment.is_active) == False,  # noqa: E712
+        col(TeamAssignment.assigned_date) < cutoff,
+    )
+
+
+async def purge_old_emails() -> int:
+    # Keep the delivery record of sent and failed emails only briefly
+    cutoff = datetime.utcnow() - timedelta(days=settings.EMAIL_RETENTION_DAYS)
+    return await delete_in_batches(
+        col(OutboundEmail.id),
+        col(OutboundEmail.status) != OutboundEmailStatus.PENDING,
+        col(OutboundEmail.created_at) < cutoff,
+    )
+
+
+async def create_attendance_partitions() -> int:
+    return await partitions.create_partitions(
+        settings.ATTENDANCE_PARTITION_MONTHS_AHEAD
+    )
+
+
+async def detach_old_attendance_partitions() -> int:
+    if settings.ATTENDANCE_DETACH_AFTER_MONTHS is None:
+        return 0
+    return await partitions.detach_partitions(settings.ATTENDANCE_DETACH_AFTER_MONTHS)
+
+
+def default_jobs() -> list[Job]:
+    return [
+        Job(
+            "expired-qr-codes",
+            interval=60,
+            run=purge_expired_qr_codes,
+            # Each worker has its own memory store
+            leader_only=settings.QR_CODE_STORE != "memory",
+        ),
+        Job(
+            "inactive-team-assignments",
+            interval=60 * 60,
+            run=purge_inactive_team_assignments,
+        ),
+        Job(
+            "old-emails",
+            interval=60 * 60,
+            run=purge_old_emails,
+        ),
+        Job(
+            "attendance-partitions",
+            interval=24 * 60 * 60,
+            run=create_attendance_partitions,
+        ),
+        Job(
+            "attendance-archive",
+            interval=24 * 60 * 60,
+            run=detach_old_attendance_partitions,
+        ),
+    ]
+
+
+class Scheduler:
+    """
+    Runs jobs in the API worker's event loop. Every worker runs one; the
+    worker holding the Postgres advisory lock LEADER_LOCK_ID is the leader
+    and also runs the leader-only jobs. The lock is tied to a connection kept
+    open while leading, so a crashed leader frees it and another worker
+    takes over on its next tick. Behind PgBouncer that connection goes to
+    POSTGRES_DIRECT_SERVER.
+    """
+
+    def __init__(self, jobs: list[Job]) -> None:
+        self.jobs = jobs
+        self._leader_connection: AsyncConnection | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_connection is not None
+
+    async def _elect(self) -> None:
+        if self._leader_connection is not None:
+            try:
+                # Still connected, and so still holding the lock
+                await self._leader_connection.execute(select(1))
+                await self._leader_connection.commit()
+                return
+            except Exception:
+                logger.warning("Lost the job leader connection")
+                await self._resign()
+        connection = await db.direct_async_engine.connect()
+        try:
+            acquired = (
+                await connection.execute(
+                    select(func.pg_try_advisory_lock(LEADER_LOCK_ID))
+                )
+            ).scalar()
+            # Don't hold a transaction open for as long as we lead
+            await connection.commit()
+        except Exception:
+            await connection.close()
+            raise
+        if acquired:
+            logger.info("Became the job leader")
+            self._leader_connection = connection
+        else:
+            await connection.close()
+
+    async def _resign(self) -> None:
+        connection, self._leader_connection = self._leader_connection, None
+        if connection is None:
+            return
+        try:
+            await connection.execute(select(func.pg_advisory_unlock(LEADER_LOCK_ID)))
+            await connection.commit()
+        except Exception:
+            # Closing the connection releases the lock anyway
+            pass
+        # A pooled connection would keep the lock, so discard it
+        await connection.invalidate()
+        await connection.close()
+
+    async def run_due(self) -> None:
+        now = time.monotonic()
+        for job in self.jobs:
+            if job.next_run > now or (job.leader_only and not self.is_leader):
+                continue
+            started = time.monotonic()
+            try:
+                job.last_rows = await job.run()
+            except Exception:
+                logger.exception(f"Job {job.name} failed")
+            else:
+                job.last_seconds = time.monotonic() - started
+                if job.last_rows:
+                    logger.info(
+                        f"Job {job.name} processed {job.last_rows} "
+                        f"in {job.last_seconds:.1f}s"
+                    )
+            job.next_run = time.monotonic() + job.interval
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._elect()
+            except Exception:
+                logger.exception("Job leader election failed")
+            await self.run_due()
+            await asyncio.sleep(TICK_INTERVAL)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="job-scheduler")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._resign()
+
+
+def start_scheduler() -> Scheduler | None:
+    if not settings.JOBS_ENABLED:
+        return None
+    if settings.POSTGRES_PGBOUNCER and not settings.POSTGRES_DIRECT_SERVER:
+        # Through PgBouncer the lock would stay on whichever server connection
+        # took it, so several workers could lead at once
+        logger.error("Jobs disabled: POSTGRES_PGBOUNCER needs POSTGRES_DIRECT_SERVER")
+        return None
+    scheduler = Scheduler(default_jobs())
+    scheduler.start()
+    return scheduler
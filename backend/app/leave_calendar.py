@@ -0,0 +1,98 @@
+import uuid
+from collections.abc import Sequence
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import Date, cast, literal_column
+from sqlmodel import Session, col, func, select
+
+from app.models import (
+    LeaveCalendarDay,
+    LeaveCalendarEntry,
+    LeaveRequest,
+    LeaveStatus,
+    User,
+)
+
+# Requests that keep an employee off the roster; rejected ones don't
+ACTIVE_STATUSES = (LeaveStatus.PENDING, LeaveStatus.APPROVED)
+# Longest range the calendar serves, about a quarter
+MAX_CALENDAR_DAYS = 93
+
+
+def leave_period(start: Any, end: Any) -> Any:
+    """
+    The days from `start` to `end`, both included, as a daterange. The bounds
+    flag is inlined rather than bound, so that over the leave request columns
+    this is the expression indexed by ix_leaverequest_period.
+    """
+    return func.daterange(cast(start, Date), cast(end, Date), literal_column("'[]'"))
+
+
+def overlapping(start: date, end: date) -> Any:
+    # Served by the GiST index instead of two open-ended B-tree ranges
+    return leave_period(LeaveRequest.start_date, LeaveRequest.end_date).op("&&")(
+        leave_period(start, end)
+    )
+
+
+def overlapping_leave(
+    session: Session, *, employee_id: uuid.UUID, start: date, end: date
+) -> LeaveRequest | None:
+    """
+    A pending or approved request of the employee sharing a day with the
+    given dates, if any.
+    """
+    statement = (
+        select(LeaveRequest)
+        .where(
+            LeaveRequest.employee_id == employee_id,
+            col(LeaveRequest.status).in_(ACTIVE_STATUSES),
+            overlapping(start, end),
+        )
+        .limit(1)
+    )
+    return session.exec(statement).first()
+
+
+def leave_calendar(
+    session: Session, *, start_date: date, end_date: date, where: Sequence[Any]
+) -> list[LeaveCalendarDay]:
+    """
+    Every day from `start_date` to `end_date` with the employees on pending
+    or approved leave that day, among the requests matching `where`. One
+    indexed query finds the requests; they are spread over the days here.
+    """
+    statement = (
+        select(LeaveRequest, User.full_name)
+        .join(User, col(User.id) == LeaveRequest.employee_id)
+        .where(
+            col(LeaveRequest.status).in_(ACTIVE_STATUSES),
+            overlapping(start_date, end_date),
+            *where,
+        )
+        .order_by(
+            col(User.full_name),
+            col(LeaveRequest.employee_id),
+            col(LeaveRequest.start_date),
+        )
+    )
+
+    days = [
+        LeaveCalendarDay(date=start_date + timedelta(days=offset), employees=[])
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    for leave_request, full_name in session.exec(statement):
+        entry = LeaveCalendarEntry(
+            leave_request_id=leave_request.id,
+            employee_id=leave_request.employee_id,
+            full_name=full_name,
+            leave_type=leave_request.leave_type,
+            status=leave_request.status,
+        )
+        first = (leave_request.start_date.date() - start_date).days
+        last = (leave_request.end_date.date() - start_date).days
+        first, last = max(first, 0), min(last, len(days) - 1)
+        for day in days[first : last + 1]:
+            day.employees.append(entry)
+    return days
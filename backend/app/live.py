@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import threading
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import scoping
+from app.core import notify
+from app.core.config import settings
+from app.models import (
+    Attendance,
+    AttendanceBulkAction,
+    AttendanceDailyFact,
+    AttendanceLiveEvent,
+    AttendanceLiveTotals,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+LIVE_CHANNEL = "attendance_live"
+# Events buffered per stream before a client that stopped reading is dropped
+QUEUE_SIZE = 1000
+# Comment lines keep idle streams from being closed by proxies
+KEEPALIVE_SECONDS = 15
+
+
+@dataclass(eq=False)
+class Subscription:
+    """
+    One open stream on one event loop: events for a supervisor's direct
+    reports, or for everyone when `supervisor_id` is None. A None in the
+    queue ends the stream.
+    """
+
+    supervisor_id: uuid.UUID | None
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[AttendanceLiveEvent | None]" = field(
+        default_factory=lambda: asyncio.Queue(QUEUE_SIZE)
+    )
+
+    def matches(self, live_event: AttendanceLiveEvent) -> bool:
+        return self.supervisor_id in (None, live_event.supervisor_id)
+
+    def put(self, live_event: AttendanceLiveEvent | None) -> None:
+        # Runs on the subscription's loop
+        try:
+            self.queue.put_nowait(live_event)
+        except asyncio.QueueFull:
+            # The client reconnects and starts again from fresh totals
+            logger.warning("Live attendance stream fell behind, closing it")
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class Broker:
+    """
+    Fans attendance events out to this worker's open streams. Publishing
+    threads and the streams' event loops may differ, so events are handed to
+    each loop with `call_soon_threadsafe`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: set[Subscription] = set()
+
+    def subscribe(self, supervisor_id: uuid.UUID | None) -> Subscription:
+        subscription = Subscription(supervisor_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def deliver(self, live_event: AttendanceLiveEvent | None) -> None:
+        """
+        Pass an event to the matching streams; None ends every stream.
+        """
+        with self._lock:
+            subscriptions = [
+                subscription
+                for subscription in self._subscriptions
+                if live_event is None or subscription.matches(live_event)
+            ]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, live_event)
+            except RuntimeError:
+                # Its loop is closed, so nobody is reading any more
+                self.unsubscribe(subscription)
+
+    def deliver_payload(self, payload: str) -> None:
+        self.deliver(AttendanceLiveEvent.model_validate_json(payload))
+
+    def close(self) -> None:
+        self.deliver(None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+
+broker = Broker()
+
+
+def attendance_event(
+    action: AttendanceBulkAction,
+    attendance: Attendance,
+    supervisor_id: uuid.UUID | None,
+) -> AttendanceLiveEvent:
+    time = attendance.check_in
+    if action == AttendanceBulkAction.CHECK_OUT and attendance.check_out:
+        time = attendance.check_out
+    day = attendance.date
+    return AttendanceLiveEvent(
+        action=action,
+        attendance_id=attendance.id,
+        employee_id=attendance.employee_id,
+        supervisor_id=supervisor_id,
+        date=day.date() if isinstance(day, datetime) else day,
+        time=time,
+    )
+
+
+async def publish(
+    session: AsyncSession, live_events: list[AttendanceLiveEvent]
+) -> None:
+    """
+    Send the events to the live streams once the session's transaction
+    commits, and not at all if it rolls back. With the "postgres" backend
+    they go out as one NOTIFY each and reach the streams of every worker.
+    """
+    if not live_events:
+        return
+    if settings.USER_CACHE_BACKEND == "postgres":
+        await session.execute(
+            text(
+                "SELECT pg_notify(:channel, payload) "
+                "FROM unnest(CAST(:payloads AS text[])) AS payload"
+            ),
+            {
+                "channel": LIVE_CHANNEL,
+                "payloads": [
+                    live_event.model_dump_json() for live_event in live_events
+                ],
+            },
+        )
+        return
+
+    def deliver(_session: Any) -> None:
+        for live_event in live_events:
+            broker.deliver(live_event)
+
+    event.listen(session.sync_session, "after_commit", deliver, once=True)
+
+
+def totals_statement(current_user: User, day: date) -> Any:
+    """
+    Employees the user may see who checked in on the day, and how many of
+    them have checked out.
+    """
+    return select(
+        func.count(),
+        func.count().filter(col(AttendanceDailyFact.checked_out) == True),  # noqa: E712
+    ).where(
+        *scoping.employee_scope(AttendanceDailyFact.employee_id, current_user),
+        AttendanceDailyFact.date == day,
+    )
+
+
+def _server_sent_event(
+    name: str, data: AttendanceLiveEvent | AttendanceLiveTotals
+) -> str:
+    return f"event: {name}\ndata: {data.model_dump_json()}\n\n"
+
+
+async def stream(
+    subscription: Subscription, totals: AttendanceLiveTotals
+) -> AsyncIterator[str]:
+    """
+    Server-sent events: the totals, then each check-in or check-out followed
+    by the totals it leads to. Totals are kept up to date from the events,
+    without querying again; they restart from zero when the first event of
+    a new day arrives.
+    """
+    try:
+        yield _server_sent_event("totals", totals)
+        while True:
+            try:
+                live_event = await asyncio.wait_for(
+                    subscription.queue.get(), KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if live_event is None:
+                return
+            if live_event.date > totals.date:
+                totals = AttendanceLiveTotals(date=live_event.date)
+            if live_event.date == totals.date:
+                if live_event.action == AttendanceBulkAction.CHECK_IN:
+                    totals.checked_in += 1
+                else:
+                    totals.checked_out += 1
+            yield _server_sent_event(live_event.action.value, live_event)
+            yield _server_sent_event("totals", totals)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def start_live_listener() -> notify.Listener | None:
+    if settings.USER_CACHE_BACKEND != "postgres":
+        return None
+    listener = notify.Listener(LIVE_CHANNEL, broker.deliver_payload)
+    listener.start()
+    return listener
@@ -1,10 +1,22 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.core.cache import start_user_cache_listener
 from app.core.config import settings
+from app.core.db import async_engine
+from app.core.security import HashQueueFull, password_hasher
+from app.email_queue import start_email_worker
+from app.jobs import start_scheduler
+from app.live import broker, start_live_listener
+from app.qr_codes import start_qr_code_listener
+from app.utils import email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,8 +26,37 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    email_templates.load()
+    user_cache_listener = start_user_cache_listener()
+    live_listener = start_live_listener()
+    qr_code_listener = start_qr_code_listener()
+    scheduler = start_scheduler()
+    email_worker = start_email_worker()
+    yield
+    if scheduler:
+        await scheduler.stop()
+    if email_worker:
+        # Emails left in the queue are sent by another worker, or after restart
+        email_worker.stop()
+    # End the live streams that are still open
+    broker.close()
+    if live_listener:
+        live_listener.stop()
+    if user_cache_listener:
+        user_cache_listener.stop()
+    if qr_code_listener:
+        qr_code_listener.stop()
+    password_hasher.shutdown()
+    # Async connections belong to this event loop, close them with it
+    await async_engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
@@ -30,4 +71,18 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+
+@app.exception_handler(HashQueueFull)
+async def hash_queue_full_handler(
+    _request: Request, _exc: HashQueueFull
+) -> JSONResponse:
+    # Shed load instead of letting a login storm queue up behind bcrypt. The
+    # caller may have done nothing wrong, so the message doesn't blame them
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
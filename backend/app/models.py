@@ -1,9 +1,10 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional
 
 from pydantic import EmailStr
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -30,7 +31,9 @@ class UserBase(SQLModel):
     role: UserRole = Field(default=UserRole.LABORER)
     employee_id: str | None = Field(default=None, max_length=50, index=True)
     department: str | None = Field(default=None, max_length=100)
-    supervisor_id: uuid.UUID | None = Field(default=None, foreign_key="user.id")
+    supervisor_id: uuid.UUID | None = Field(
+        default=None, foreign_key="user.id", index=True
+    )
 
 
 # Properties to receive via API on creation
@@ -98,7 +101,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -142,6 +146,17 @@ class Message(SQLModel):
     message: str
 
 
+# Outcome of a bulk import, rows are reported by their line in the file
+class ImportRowError(SQLModel):
+    line: int
+    errors: list[str]
+
+
+class ImportResult(SQLModel):
+    created: int
+    errors: list[ImportRowError]
+
+
 # JSON payload containing access token
 class Token(SQLModel):
     access_token: str
@@ -194,7 +209,8 @@ class WorkerPublic(WorkerBase):
 # For listing workers
 class WorkersPublic(SQLModel):
     data: list[WorkerPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
 
 
 # Leave Request Models
@@ -216,6 +232,28 @@ class LeaveRequestUpdate(SQLModel):
 
 
 class LeaveRequest(LeaveRequestBase, table=True):
+    __table_args__ = (
+        Index("ix_leaverequest_supervisor_id_status", "supervisor_id", "status"),
+        Index(
+            "ix_leaverequest_pending_supervisor_id",
+            "supervisor_id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_leaverequest_employee_id_dates",
+            "employee_id",
+            "start_date",
+            "end_date",
+        ),
+        # Days on leave as a range, for overlap and "who is off on day X"
+        # lookups (see app.leave_calendar.leave_period)
+        Index(
+            "ix_leaverequest_period",
+            text("daterange(CAST(start_date AS DATE), CAST(end_date AS DATE), '[]')"),
+            postgresql_using="gist",
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     employee_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
     supervisor_id: uuid.UUID | None = Field(foreign_key="user.id", nullable=True)
@@ -244,7 +282,57 @@ class LeaveRequestPublic(LeaveRequestBase):
 
 class LeaveRequestsPublic(SQLModel):
     data: list[LeaveRequestPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+class LeaveRequestBatchStatus(str, Enum):
+    SUCCESS = "success"
+    # The same request appears earlier in the batch
+    DUPLICATE = "duplicate"
+    NOT_FOUND = "not_found"
+    # Not a request addressed to the caller
+    FORBIDDEN = "forbidden"
+    # Not a decision: the status must be approved or rejected
+    INVALID = "invalid"
+
+
+class LeaveRequestBatchEntry(LeaveRequestUpdate):
+    id: uuid.UUID
+
+
+class LeaveRequestBatchUpdate(SQLModel):
+    entries: list[LeaveRequestBatchEntry] = Field(min_length=1, max_length=1000)
+
+
+class LeaveRequestBatchResult(SQLModel):
+    id: uuid.UUID
+    status: LeaveRequestBatchStatus
+
+
+class LeaveRequestBatchResults(SQLModel):
+    data: list[LeaveRequestBatchResult]
+    succeeded: int
+
+
+# Who is off on each day, for staffing
+class LeaveCalendarEntry(SQLModel):
+    leave_request_id: uuid.UUID
+    employee_id: uuid.UUID
+    full_name: str | None = None
+    leave_type: str
+    status: LeaveStatus
+
+
+class LeaveCalendarDay(SQLModel):
+    date: date
+    employees: list[LeaveCalendarEntry]
+
+
+class LeaveCalendar(SQLModel):
+    start_date: date
+    end_date: date
+    data: list[LeaveCalendarDay]
 
 
 # Attendance Models
@@ -267,9 +355,19 @@ class AttendanceUpdate(SQLModel):
 
 
 class Attendance(AttendanceBase, table=True):
+    # One attendance record per employee and day. Range partitioned by month
+    # on date (see app.partitions), so date is part of the primary key.
+    __table_args__ = (
+        Index("ix_attendance_employee_id_date", "employee_id", "date", unique=True),
+        Index("ix_attendance_date", "date"),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     employee_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
-    date: datetime = Field(default_factory=lambda: datetime.utcnow().date())
+    date: datetime = Field(
+        default_factory=lambda: datetime.utcnow().date(), primary_key=True
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     employee: User | None = Relationship(back_populates="attendance_records")
@@ -284,7 +382,84 @@ class AttendancePublic(AttendanceBase):
 
 class AttendancesPublic(SQLModel):
     data: list[AttendancePublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+# Bulk check-in / check-out from site kiosks
+class AttendanceBulkAction(str, Enum):
+    CHECK_IN = "check_in"
+    CHECK_OUT = "check_out"
+
+
+class AttendanceBulkStatus(str, Enum):
+    SUCCESS = "success"
+    # Already checked in (or out) for that day
+    DUPLICATE = "duplicate"
+    NOT_CHECKED_IN = "not_checked_in"
+    # Unknown employee, or not on the caller's team
+    FORBIDDEN = "forbidden"
+    # Badge time in the future or older than ATTENDANCE_BULK_MAX_AGE_DAYS
+    INVALID = "invalid"
+
+
+class AttendanceBulkEntry(SQLModel):
+    employee_id: uuid.UUID
+    # Badge time, defaults to now; a check-in's attendance date is taken
+    # from it, a check-out closes the last check-in before it
+    timestamp: datetime | None = None
+    location: str | None = Field(default=None, max_length=255)
+
+
+class AttendanceBulkCreate(SQLModel):
+    action: AttendanceBulkAction = AttendanceBulkAction.CHECK_IN
+    entries: list[AttendanceBulkEntry] = Field(min_length=1, max_length=1000)
+
+
+class AttendanceBulkResult(SQLModel):
+    employee_id: uuid.UUID
+    status: AttendanceBulkStatus
+    attendance_id: uuid.UUID | None = None
+
+
+class AttendanceBulkResults(SQLModel):
+    data: list[AttendanceBulkResult]
+    succeeded: int
+
+
+# Live attendance board, streamed to supervisors as server-sent events
+class AttendanceLiveEvent(SQLModel):
+    action: AttendanceBulkAction
+    attendance_id: uuid.UUID
+    employee_id: uuid.UUID
+    supervisor_id: uuid.UUID | None = None
+    date: date
+    time: datetime
+
+
+class AttendanceLiveTotals(SQLModel):
+    date: date
+    checked_in: int = 0
+    checked_out: int = 0
+
+
+# Precomputed per-employee, per-day attendance that the reports read from.
+# Rows are derived from Attendance and refreshed whenever attendance is written.
+# team_name and site_location are the assignment at the last refresh; reports
+# filter by team on the current TeamAssignment instead.
+class AttendanceDailyFact(SQLModel, table=True):
+    __tablename__ = "attendance_daily_fact"
+    __table_args__ = (Index("ix_attendance_daily_fact_date", "date"),)
+
+    employee_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    date: datetime = Field(primary_key=True)
+    net_minutes: float = Field(default=0)
+    checked_out: bool = Field(default=False)
+    team_name: str | None = Field(default=None, max_length=100)
+    site_location: str | None = Field(default=None, max_length=255)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 # QR Code Login Models
@@ -319,6 +494,19 @@ class TeamAssignmentCreate(TeamAssignmentBase):
 
 
 class TeamAssignment(TeamAssignmentBase, table=True):
+    __table_args__ = (
+        Index(
+            "ix_teamassignment_active_supervisor_id",
+            "supervisor_id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_teamassignment_active_laborer_id",
+            "laborer_id",
+            postgresql_where=text("is_active"),
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     supervisor_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
     laborer_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
@@ -341,3 +529,33 @@ class TeamAssignmentPublic(TeamAssignmentBase):
     laborer_id: uuid.UUID
     assigned_date: datetime
     is_active: bool
+
+
+# Outbound email queue, drained by app.email_queue
+class OutboundEmailStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    # Gave up after EMAIL_MAX_ATTEMPTS
+    FAILED = "failed"
+
+
+class OutboundEmail(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_outboundemail_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str = Field(max_length=500)
+    html_content: str
+    status: OutboundEmailStatus = Field(default=OutboundEmailStatus.PENDING)
+    attempts: int = Field(default=0)
+    # When a pending email is next due; pushed forward while a worker sends it
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    last_error: str | None = Field(default=None, max_length=1000)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: datetime | None = None
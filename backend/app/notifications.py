@@ -0,0 +1,49 @@
+import uuid
+from collections.abc import Iterable
+
+from sqlmodel import Session, col, select
+
+from app import email_queue
+from app.core.config import settings
+from app.core.db import engine
+from app.models import LeaveRequest, User
+from app.utils import generate_leave_decision_emails
+
+
+def send_leave_decision_emails(leave_request_ids: Iterable[uuid.UUID]) -> None:
+    """
+    Queue an email to each employee with the decision on their leave
+    request, or send it with the email queue disabled. Meant to run as a
+    background task once the decisions are committed, so rendering them
+    doesn't hold up the response.
+    """
+    if not settings.emails_enabled:
+        return
+    statement = (
+        select(LeaveRequest, User)
+        .join(User, col(User.id) == LeaveRequest.employee_id)
+        .where(col(LeaveRequest.id).in_(list(leave_request_ids)))
+    )
+    with Session(engine) as session:
+        decisions = session.exec(statement).all()
+        email_data = generate_leave_decision_emails(
+            (employee.email, employee.full_name or employee.email, leave_request)
+            for leave_request, employee in decisions
+        )
+        if not settings.EMAIL_QUEUE_ENABLED:
+            for (_, employee), data in zip(decisions, email_data, strict=True):
+                email_queue.send_now(
+                    email_to=employee.email,
+                    subject=data.subject,
+                    html_content=data.html_content,
+                )
+            return
+        for (_, employee), data in zip(decisions, email_data, strict=True):
+            email_queue.enqueue(
+                session,
+                email_to=employee.email,
+                subject=data.subject,
+                html_content=data.html_content,
+            )
+        session.commit()
+    email_queue.email_queued.set()
@@ -0,0 +1,133 @@
+import base64
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from enum import Enum
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import ClauseElement, Executable, text, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlmodel import Session, func, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+T = TypeVar("T")
+
+
+class CountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(
+        [
+            value.isoformat() if isinstance(value, datetime) else str(value)
+            for value in values
+        ]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *columns: Any) -> tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError(cursor)
+        values: list[Any] = []
+        for column, value in zip(columns, raw, strict=True):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is uuid.UUID:
+                values.append(uuid.UUID(value))
+            else:
+                values.append(python_type(value))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(values)
+
+
+def paginate(
+    statement: SelectOfScalar[T],
+    *columns: Any,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    descending: bool = False,
+) -> SelectOfScalar[T]:
+    """
+    Order by `columns` and return the page after `cursor` (keyset pagination),
+    or fall back to OFFSET when no cursor is given.
+    """
+    if descending:
+        statement = statement.order_by(*(column.desc() for column in columns))
+    else:
+        statement = statement.order_by(*columns)
+    if cursor:
+        after = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, *columns))
+        statement = statement.where(after < values if descending else after > values)
+    else:
+        statement = statement.offset(skip)
+    return statement.limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], limit: int, *attributes: str) -> str | None:
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(*(getattr(last, attribute) for attribute in attributes))
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Any) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimated_count(session: Session, statement: SelectOfScalar[Any]) -> int:
+    froms = statement.get_final_froms()
+    if statement.whereclause is None and len(froms) == 1:
+        # Unfiltered listing: the table statistics are good enough.
+        # reltuples is -1 until the table has been vacuumed or analyzed.
+        table_name = getattr(froms[0], "name", None)
+        if table_name:
+            reltuples = (
+                session.connection()
+                .execute(
+                    text(
+                        "SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"
+                    ),
+                    {"name": f'"{table_name}"'},
+                )
+                .scalar()
+            )
+            if reltuples is not None and reltuples >= 0:
+                return int(reltuples)
+    # Filtered listing: use the planner's row estimate for the query
+    plan = session.connection().execute(_Explain(statement)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(
+    session: Session, statement: SelectOfScalar[Any], mode: CountMode
+) -> int | None:
+    if mode == CountMode.NONE:
+        return None
+    if mode == CountMode.ESTIMATED:
+        return estimated_count(session, statement)
+    count_statement = select(func.count()).select_from(statement.subquery())
+    return session.exec(count_statement).one()
@@ -0,0 +1,100 @@
+import logging
+import re
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import db
+
+logger = logging.getLogger(__name__)
+
+# Monthly range partitions of `attendance`, as created by the migration
+PARENT = "attendance"
+PARTITION_NAME = re.compile(rf"^{PARENT}_(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date | None:
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+async def attached_partitions(session: AsyncSession) -> list[str]:
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits AS i"
+            " JOIN pg_class AS c ON c.oid = i.inhrelid"
+            " WHERE i.inhparent = CAST(:parent AS regclass)"
+            " ORDER BY c.relname"
+        ),
+        {"parent": PARENT},
+    )
+    return list(result.scalars())
+
+
+async def create_partitions(months_ahead: int) -> int:
+    """
+    Create the monthly partitions from this month to `months_ahead` months
+    from now that don't exist yet. Returns how many were created.
+    """
+    this_month = month_start(datetime.utcnow().date())
+    created = 0
+    async with AsyncSession(db.async_engine) as session:
+        existing = set(await attached_partitions(session))
+        for months in range(months_ahead + 1):
+            month = add_months(this_month, months)
+            name = partition_name(month)
+            if name in existing:
+                continue
+            # Rows of that month already in the default partition would make
+            # this fail; the job logs it and they have to be moved by hand
+            await session.execute(
+                text(
+                    f'CREATE TABLE "{name}" PARTITION OF {PARENT} '
+                    f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+                )
+            )
+            await session.commit()
+            logger.info(f"Created partition {name}")
+            created += 1
+    return created
+
+
+async def detach_partitions(older_than_months: int) -> int:
+    """
+    Detach the monthly partitions that ended more than `older_than_months`
+    months ago. They are left as standalone tables, to be archived (e.g. with
+    pg_dump) and dropped. Returns how many rows they hold.
+    """
+    cutoff = add_months(month_start(datetime.utcnow().date()), -older_than_months)
+    detached = 0
+    async with AsyncSession(db.async_engine) as session:
+        for name in await attached_partitions(session):
+            month = partition_month(name)
+            if month is None or add_months(month, 1) > cutoff:
+                continue
+            rows = (
+                await session.execute(text(f'SELECT count(*) FROM "{name}"'))
+            ).scalar()
+            await session.execute(
+                text(f'ALTER TABLE {PARENT} DETACH PARTITION "{name}"')
+            )
+            await session.commit()
+            logger.info(f"Detached partition {name} with {rows} rows")
+            detached += rows or 0
+    return detached
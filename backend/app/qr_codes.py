@@ -0,0 +1,237 @@
+import logging
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Protocol
+
+import jwt
+from jwt.exceptions import InvalidTokenError
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import notify, security
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import QRCode
+
+logger = logging.getLogger(__name__)
+
+# Codes held by the memory store; the oldest are dropped beyond this, since
+# anyone can generate codes
+MEMORY_MAX_CODES = 100_000
+# Keeps signed QR codes from being accepted as access tokens, and vice versa
+QR_TOKEN_AUDIENCE = "qr-login"
+# Nonces of consumed signed codes, so every worker's polls see them used
+QR_CODE_CHANNEL = "qr_code_used"
+
+
+def new_qr_code() -> QRCode:
+    return QRCode(
+        code=secrets.token_urlsafe(32),
+        expires_at=datetime.utcnow()
+        + timedelta(seconds=settings.QR_CODE_EXPIRE_SECONDS),
+    )
+
+
+class QRCodeStore(Protocol):
+    """
+    Where login QR codes live between being shown on a kiosk and scanned.
+    `consume` marks a code used only if it is unused and unexpired, in one
+    atomic step, and returns it; otherwise it returns None.
+    """
+
+    async def issue(self, session: AsyncSession) -> QRCode: ...
+
+    async def get(self, session: AsyncSession, code: str) -> QRCode | None: ...
+
+    async def consume(self, session: AsyncSession, code: str) -> QRCode | None: ...
+
+
+class MemoryQRCodeStore:
+    """
+    Codes in this process only; fits a single API worker.
+    """
+
+    def __init__(self, maxsize: int = MEMORY_MAX_CODES) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # Every code lives as long, so insertion order is expiry order
+        self._codes: OrderedDict[str, QRCode] = OrderedDict()
+
+    async def issue(self, session: AsyncSession) -> QRCode:  # noqa: ARG002
+        qr_code = new_qr_code()
+        with self._lock:
+            self._codes[qr_code.code] = qr_code
+            while len(self._codes) > self.maxsize:
+                self._codes.popitem(last=False)
+        return qr_code
+
+    async def get(self, session: AsyncSession, code: str) -> QRCode | None:  # noqa: ARG002
+        with self._lock:
+            return self._codes.get(code)
+
+    async def consume(self, session: AsyncSession, code: str) -> QRCode | None:  # noqa: ARG002
+        with self._lock:
+            qr_code = self._codes.get(code)
+            if (
+                qr_code is None
+                or qr_code.is_used
+                or qr_code.expires_at <= datetime.utcnow()
+            ):
+                return None
+            qr_code.is_used = True
+            return qr_code
+
+    async def purge(self) -> int:
+        now = datetime.utcnow()
+        purged = 0
+        with self._lock:
+            while self._codes:
+                code, qr_code = next(iter(self._codes.items()))
+                if qr_code.expires_at > now:
+                    break
+                del self._codes[code]
+                purged += 1
+        return purged
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._codes)
+
+
+class DatabaseQRCodeStore:
+    """
+    Codes in the `qrcode` table, shared by all workers.
+    """
+
+    async def issue(self, session: AsyncSession) -> QRCode:
+        qr_code = new_qr_code()
+        session.add(qr_code)
+        await session.commit()
+        await session.refresh(qr_code)
+        return qr_code
+
+    async def get(self, session: AsyncSession, code: str) -> QRCode | None:
+        statement = select(QRCode).where(QRCode.code == code)
+        return (await session.exec(statement)).first()
+
+    async def consume(self, session: AsyncSession, code: str) -> QRCode | None:
+        # Two concurrent scans can't both match the row
+        statement = (
+            update(QRCode)
+            .where(
+                col(QRCode.code) == code,
+                col(QRCode.is_used) == False,  # noqa: E712
+                col(QRCode.expires_at) > datetime.utcnow(),
+            )
+            .values(is_used=True)
+            .returning(QRCode)
+        )
+        qr_code = (await session.execute(statement)).scalars().first()
+        await session.commit()
+        return qr_code
+
+
+class SignedQRCodeStore(DatabaseQRCodeStore):
+    """
+    Codes are self-expiring tokens signed with SECRET_KEY, so issuing them
+    and checking their status needs no storage. Consuming one inserts its
+    nonce into the `qrcode` table, which turns away a second use on any
+    worker. Consumed nonces are also remembered in memory until they expire,
+    and announced to the other workers with NOTIFY, so their status polls
+    report the code as used without a query.
+    """
+
+    def __init__(self) -> None:
+        self._used: TTLCache[str, bool] = TTLCache(
+            maxsize=MEMORY_MAX_CODES, ttl=settings.QR_CODE_EXPIRE_SECONDS
+        )
+
+    def mark_used(self, nonce: str) -> None:
+        self._used.set(nonce, True)
+
+    async def issue(self, session: AsyncSession) -> QRCode:  # noqa: ARG002
+        # Token expiry has one second resolution
+        expires_at = (
+            datetime.utcnow() + timedelta(seconds=settings.QR_CODE_EXPIRE_SECONDS)
+        ).replace(microsecond=0)
+        token = jwt.encode(
+            {
+                "exp": expires_at,
+                "jti": secrets.token_urlsafe(16),
+                "aud": QR_TOKEN_AUDIENCE,
+            },
+            settings.SECRET_KEY,
+            algorithm=security.ALGORITHM,
+        )
+        return QRCode(code=token, expires_at=expires_at)
+
+    def _decode(self, code: str) -> tuple[str, datetime] | None:
+        try:
+            payload = jwt.decode(
+                code,
+                settings.SECRET_KEY,
+                algorithms=[security.ALGORITHM],
+                audience=QR_TOKEN_AUDIENCE,
+                # Expired codes are reported as such by the callers
+                options={"verify_exp": False, "require": ["exp", "jti"]},
+            )
+        except InvalidTokenError:
+            return None
+        return payload["jti"], datetime.utcfromtimestamp(payload["exp"])
+
+    async def get(self, session: AsyncSession, code: str) -> QRCode | None:  # noqa: ARG002
+        decoded = self._decode(code)
+        if decoded is None:
+            return None
+        nonce, expires_at = decoded
+        return QRCode(
+            code=code, expires_at=expires_at, is_used=bool(self._used.get(nonce))
+        )
+
+    async def consume(self, session: AsyncSession, code: str) -> QRCode | None:
+        decoded = self._decode(code)
+        if decoded is None:
+            return None
+        nonce, expires_at = decoded
+        if expires_at <= datetime.utcnow() or self._used.get(nonce):
+            return None
+        statement = (
+            insert(QRCode)
+            .values(code=nonce, expires_at=expires_at, is_used=True)
+            .on_conflict_do_nothing(index_elements=["code"])
+            .returning(col(QRCode.id))
+        )
+        inserted = (await session.execute(statement)).first()
+        if inserted is not None:
+            # Sent on commit; a code that was already consumed was announced then
+            await session.execute(select(func.pg_notify(QR_CODE_CHANNEL, nonce)))
+        await session.commit()
+        self.mark_used(nonce)
+        if inserted is None:
+            return None
+        return QRCode(code=code, expires_at=expires_at, is_used=True)
+
+
+def _qr_code_store() -> QRCodeStore:
+    if settings.QR_CODE_STORE == "memory":
+        return MemoryQRCodeStore()
+    if settings.QR_CODE_STORE == "signed":
+        return SignedQRCodeStore()
+    return DatabaseQRCodeStore()
+
+
+qr_code_store = _qr_code_store()
+
+
+def start_qr_code_listener() -> notify.Listener | None:
+    if not isinstance(qr_code_store, SignedQRCodeStore):
+        return None
+    # Nonces consumed while disconnected are missed; until they expire, polls
+    # on this worker may report those codes as valid, but scanning them fails
+    listener = notify.Listener(QR_CODE_CHANNEL, qr_code_store.mark_used)
+    listener.start()
+    return listener
@@ -0,0 +1,35 @@
+import argparse
+import logging
+from datetime import date
+
+from sqlmodel import Session
+
+from app import reports
+from app.core.db import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def rebuild(start_date: date | None = None, end_date: date | None = None) -> int:
+    with Session(engine) as session:
+        return reports.rebuild_attendance_facts(
+            session=session, start_date=start_date, end_date=end_date
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild attendance_daily_fact from the attendance table"
+    )
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    logger.info("Rebuilding attendance daily facts")
+    rows = rebuild(start_date=args.start_date, end_date=args.end_date)
+    logger.info(f"Attendance daily facts rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+import uuid
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import Float, Integer, case, cast, delete, tuple_
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, and_, col, func, select
+
+from app import scoping
+from app.models import (
+    Attendance,
+    AttendanceDailyFact,
+    LeaveRequest,
+    LeaveStatus,
+    TeamAssignment,
+    User,
+    UserRole,
+)
+
+
+def net_hours(check_in: Any, check_out: Any, break_duration: Any) -> Any:
+    # Hours between check-in and check-out minus the break; open shifts count 0
+    return case(
+        (
+            check_out.is_not(None),
+            func.extract("epoch", check_out - check_in) / 3600
+            - func.coalesce(break_duration, 0) / 60.0,
+        ),
+        else_=0,
+    )
+
+
+def leave_days(start: Any, end: Any) -> Any:
+    # Inclusive day count, same as `(end - start).days + 1`
+    return func.extract("day", end - start) + 1
+
+
+def _attendance_fact_upsert(where: list[Any]) -> Any:
+    active_assignment = (
+        select(TeamAssignment)
+        .where(
+            and_(
+                TeamAssignment.laborer_id == Attendance.employee_id,
+                TeamAssignment.is_active == True,  # noqa: E712
+            )
+        )
+        .order_by(col(TeamAssignment.assigned_date).desc())
+        .limit(1)
+    )
+    source = (
+        sa_select(
+            col(Attendance.employee_id),
+            col(Attendance.date),
+            func.sum(
+                net_hours(
+                    Attendance.check_in, Attendance.check_out, Attendance.break_duration
+                )
+                * 60
+            ),
+            func.bool_and(col(Attendance.check_out).is_not(None)),
+            active_assignment.with_only_columns(
+                col(TeamAssignment.team_name)
+            ).scalar_subquery(),
+            active_assignment.with_only_columns(
+                col(TeamAssignment.site_location)
+            ).scalar_subquery(),
+            func.timezone("utc", func.now()),
+        )
+        .where(*where)
+        .group_by(col(Attendance.employee_id), col(Attendance.date))
+    )
+    columns = [
+        "employee_id",
+        "date",
+        "net_minutes",
+        "checked_out",
+        "team_name",
+        "site_location",
+        "updated_at",
+    ]
+    statement = insert(AttendanceDailyFact).from_select(columns, source)
+    return statement.on_conflict_do_update(
+        index_elements=["employee_id", "date"],
+        set_={column: statement.excluded[column] for column in columns[2:]},
+    )
+
+
+def refresh_attendance_facts_statement(
+    keys: Sequence[tuple[uuid.UUID, datetime | date]],
+) -> Any:
+    where = [tuple_(Attendance.employee_id, Attendance.date).in_(list(keys))]
+    return _attendance_fact_upsert(where)
+
+
+def refresh_attendance_facts(
+    *, session: Session, keys: Sequence[tuple[uuid.UUID, datetime | date]]
+) -> None:
+    """
+    Recompute the fact rows for the given (employee_id, date) pairs.
+
+    Runs in the caller's transaction, so call it after flushing the attendance
+    change and before committing. Async routes execute
+    `refresh_attendance_facts_statement(keys)` on their own session instead.
+    """
+    if not keys:
+        return
+    session.execute(refresh_attendance_facts_statement(keys))
+
+
+def rebuild_attendance_facts(
+    *,
+    session: Session,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> int:
+    """
+    Rebuild the fact table from Attendance, optionally limited to a date range.
+    """
+    fact_where: list[Any] = []
+    where: list[Any] = []
+    if start_date:
+        fact_where.append(AttendanceDailyFact.date >= start_date)
+        where.append(Attendance.date >= start_date)
+    if end_date:
+        fact_where.append(AttendanceDailyFact.date <= end_date)
+        where.append(Attendance.date <= end_date)
+    session.execute(delete(AttendanceDailyFact).where(*fact_where))
+    session.execute(_attendance_fact_upsert(where))
+    session.commit()
+    count_statement = (
+        select(func.count()).select_from(AttendanceDailyFact).where(*fact_where)
+    )
+    return session.exec(count_statement).one()
+
+
+def fact_hours() -> Any:
+    return AttendanceDailyFact.net_minutes / 60
+
+
+def attendance_summary(
+    *, session: Session, where: list[Any]
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    # ROLLUP(date) yields one row per day plus a grand-total row with a NULL date.
+    # Facts are unique per employee and day, so COUNT(*) counts distinct employees.
+    statement = (
+        sa_select(
+            col(AttendanceDailyFact.date),
+            func.count(),
+            func.count(func.distinct(AttendanceDailyFact.employee_id)),
+            func.count().filter(col(AttendanceDailyFact.checked_out) == True),  # noqa: E712
+            cast(func.coalesce(func.sum(fact_hours()), 0), Float),
+        )
+        .where(*where)
+        .group_by(func.rollup(AttendanceDailyFact.date))
+        .order_by(col(AttendanceDailyFact.date))
+    )
+
+    daily: list[dict[str, Any]] = []
+    totals = {"records": 0, "employees": 0}
+    for day, records, employees, checked_out, total_hours in session.execute(statement):
+        if day is None:
+            totals = {"records": records, "employees": employees}
+            continue
+        daily.append(
+            {
+                "date": day,
+                "employees_present": employees,
+                "employees_checked_out": checked_out,
+                "total_hours_worked": round(total_hours, 2),
+                "average_hours_per_employee": round(total_hours / employees, 2)
+                if employees > 0
+                else 0,
+            }
+        )
+    return daily, totals
+
+
+def leave_summary(
+    *, session: Session, start_date: date, end_date: date, where: list[Any]
+) -> dict[str, Any]:
+    """
+    Requests per status and per leave type, and approved leave days counted
+    only inside the window, for the leave requests matching `where`.
+    """
+    approved_days = leave_days(
+        func.greatest(LeaveRequest.start_date, start_date),
+        func.least(LeaveRequest.end_date, end_date),
+    )
+    statement = (
+        select(
+            LeaveRequest.status,
+            LeaveRequest.leave_type,
+            func.count(),
+            func.sum(approved_days).filter(
+                col(LeaveRequest.status) == LeaveStatus.APPROVED
+            ),
+        )
+        .where(*where)
+        .group_by(LeaveRequest.status, LeaveRequest.leave_type)
+    )
+
+    # At most one row per status and leave type
+    status_counts: dict[str, int] = {}
+    leave_type_counts: dict[str, int] = {}
+    total_requests = 0
+    total_leave_days = 0
+    for status, leave_type, requests, days in session.exec(statement):
+        status_counts[status] = status_counts.get(status, 0) + requests
+        leave_type_counts[leave_type] = leave_type_counts.get(leave_type, 0) + requests
+        total_requests += requests
+        total_leave_days += int(days or 0)
+    return {
+        "total_requests": total_requests,
+        "approved_leave_days": total_leave_days,
+        "status_breakdown": status_counts,
+        "leave_type_breakdown": leave_type_counts,
+    }
+
+
+def team_performance(
+    *,
+    session: Session,
+    start_date: date,
+    end_date: date,
+    supervisor_id: uuid.UUID | None = None,
+) -> list[dict[str, Any]]:
+    active = col(TeamAssignment.is_active) == True  # noqa: E712
+    scope = [active]
+    if supervisor_id:
+        scope.append(col(TeamAssignment.supervisor_id) == supervisor_id)
+    laborer_ids = scoping.team_laborers(supervisor_id=supervisor_id)
+
+    attendance = (
+        select(
+            AttendanceDailyFact.employee_id,
+            func.count().label("attendance_days"),
+            func.sum(fact_hours()).label("hours_worked"),
+        )
+        .where(
+            and_(
+                col(AttendanceDailyFact.employee_id).in_(laborer_ids),
+                AttendanceDailyFact.date >= start_date,
+                AttendanceDailyFact.date <= end_date,
+            )
+        )
+        .group_by(col(AttendanceDailyFact.employee_id))
+        .subquery()
+    )
+    leave = (
+        select(
+            LeaveRequest.employee_id,
+            func.sum(leave_days(LeaveRequest.start_date, LeaveRequest.end_date)).label(
+                "leave_days"
+            ),
+        )
+        .where(
+            and_(
+                col(LeaveRequest.employee_id).in_(laborer_ids),
+                LeaveRequest.start_date <= end_date,
+                LeaveRequest.end_date >= start_date,
+                LeaveRequest.status == LeaveStatus.APPROVED,
+            )
+        )
+        .group_by(col(LeaveRequest.employee_id))
+        .subquery()
+    )
+
+    # More columns than sqlmodel's select() is typed for
+    statement = (
+        sa_select(
+            col(TeamAssignment.team_name),
+            col(TeamAssignment.site_location),
+            col(TeamAssignment.supervisor_id),
+            col(User.id),
+            col(User.full_name),
+            col(User.employee_id),
+            func.coalesce(attendance.c.attendance_days, 0),
+            cast(func.coalesce(attendance.c.hours_worked, 0), Float),
+            cast(func.coalesce(leave.c.leave_days, 0), Integer),
+        )
+        .join(User, col(User.id) == TeamAssignment.laborer_id)
+        .outerjoin(attendance, attendance.c.employee_id == TeamAssignment.laborer_id)
+        .outerjoin(leave, leave.c.employee_id == TeamAssignment.laborer_id)
+        .where(*scope)
+        .order_by(
+            col(TeamAssignment.team_name),
+            col(TeamAssignment.site_location),
+            col(TeamAssignment.assigned_date),
+        )
+    )
+
+    teams: dict[str, dict[str, Any]] = {}
+    for (
+        team_name,
+        site_location,
+        team_supervisor_id,
+        laborer_id,
+        full_name,
+        employee_number,
+        attendance_days,
+        hours_worked,
+        member_leave_days,
+    ) in session.execute(statement):
+        team_key = f"{team_name}_{site_location or 'No Site'}"
+        if team_key not in teams:
+            teams[team_key] = {
+                "team_name": team_name,
+                "site_location": site_location,
+                "supervisor_id": team_supervisor_id,
+                "members": [],
+                "total_attendance_days": 0,
+                "total_hours_worked": 0,
+                "total_leave_days": 0,
+            }
+        team = teams[team_key]
+        team["members"].append(
+            {
+                "employee_id": laborer_id,
+                "full_name": full_name,
+                "employee_number": employee_number,
+                "attendance_days": attendance_days,
+                "hours_worked": round(hours_worked, 2),
+                "leave_days": member_leave_days,
+            }
+        )
+        team["total_attendance_days"] += attendance_days
+        team["total_hours_worked"] += hours_worked
+        team["total_leave_days"] += member_leave_days
+
+    for team in teams.values():
+        member_count = len(team["members"])
+        team["member_count"] = member_count
+        team["average_attendance_per_member"] = (
+            round(team["total_attendance_days"] / member_count, 2)
+            if member_count > 0
+            else 0
+        )
+        team["average_hours_per_member"] = (
+            round(team["total_hours_worked"] / member_count, 2)
+            if member_count > 0
+            else 0
+        )
+        team["total_hours_worked"] = round(team["total_hours_worked"], 2)
+
+    return list(teams.values())
+
+
+def dashboard_statement(current_user: User, today: date) -> Any:
+    """
+    All dashboard counts for the user's role in one statement: one aggregate
+    row per table, with COUNT(*) FILTER for the variants, cross joined.
+    """
+    pending = LeaveRequest.status == LeaveStatus.PENDING
+    if current_user.role == UserRole.LABORER:
+        month_start = today.replace(day=1)
+        on_today = col(AttendanceDailyFact.date) == today
+        month = select(
+            func.count().filter(on_today).label("today_checked_in"),
+            func.count()
+            .filter(on_today, col(AttendanceDailyFact.checked_out) == True)  # noqa: E712
+            .label("today_checked_out"),
+            func.count().label("month_attendance_days"),
+        ).where(
+            AttendanceDailyFact.employee_id == current_user.id,
+            AttendanceDailyFact.date >= month_start,
+        )
+        leave = select(func.count().label("pending_leave_requests")).where(
+            LeaveRequest.employee_id == current_user.id, pending
+        )
+        return select(month.subquery(), leave.subquery())
+
+    if current_user.role == UserRole.SUPERVISOR:
+        team = select(func.count().label("team_members")).where(
+            User.supervisor_id == current_user.id
+        )
+        team_today = select(func.count().label("today_team_attendance")).where(
+            *scoping.employee_scope(AttendanceDailyFact.employee_id, current_user),
+            AttendanceDailyFact.date == today,
+        )
+        approvals = select(func.count().label("pending_leave_approvals")).where(
+            LeaveRequest.supervisor_id == current_user.id, pending
+        )
+        return select(team.subquery(), team_today.subquery(), approvals.subquery())
+
+    active = col(User.is_active) == True  # noqa: E712
+    users = select(
+        func.count().filter(active).label("total_users"),
+        func.count()
+        .filter(active, col(User.role) == UserRole.LABORER)
+        .label("total_laborers"),
+        func.count()
+        .filter(active, col(User.role) == UserRole.SUPERVISOR)
+        .label("total_supervisors"),
+    )
+    today_all = select(func.count().label("today_attendance")).where(
+        AttendanceDailyFact.date == today
+    )
+    pending_all = select(func.count().label("pending_leave_requests")).where(pending)
+    return select(users.subquery(), today_all.subquery(), pending_all.subquery())
@@ -0,0 +1,60 @@
+import uuid
+from typing import Any
+
+from sqlmodel import Session, select
+
+from app.models import TeamAssignment, User, UserRole
+
+
+def direct_reports(supervisor_id: uuid.UUID) -> Any:
+    return select(User.id).where(User.supervisor_id == supervisor_id)
+
+
+def is_direct_report(
+    session: Session, supervisor_id: uuid.UUID, employee_id: uuid.UUID
+) -> bool:
+    statement = direct_reports(supervisor_id).where(User.id == employee_id)
+    return session.exec(statement).first() is not None
+
+
+def team_laborers(
+    *,
+    supervisor_id: uuid.UUID | None = None,
+    team_name: str | None = None,
+    site_location: str | None = None,
+) -> Any:
+    """
+    Laborers actively assigned to the supervisor's teams, optionally narrowed
+    to one team and/or site.
+    """
+    statement = select(TeamAssignment.laborer_id).where(
+        TeamAssignment.is_active == True  # noqa: E712
+    )
+    if supervisor_id:
+        statement = statement.where(TeamAssignment.supervisor_id == supervisor_id)
+    if team_name:
+        statement = statement.where(TeamAssignment.team_name == team_name)
+    if site_location:
+        statement = statement.where(TeamAssignment.site_location == site_location)
+    return statement
+
+
+def employee_scope(
+    employee_id: Any, current_user: User, *, supervisor_id: uuid.UUID | None = None
+) -> list[Any]:
+    """
+    Conditions limiting the `employee_id` column to employees the current user
+    may see. Admins see everyone, or one supervisor's team if `supervisor_id`
+    is given.
+
+    Teams are matched with an `IN (SELECT ...)` subquery rather than a list of
+    ids, so the query is a single statement with the same bind parameters
+    however large the team is.
+    """
+    if current_user.role == UserRole.LABORER:
+        return [employee_id == current_user.id]
+    if current_user.role == UserRole.SUPERVISOR:
+        return [employee_id.in_(direct_reports(current_user.id))]
+    if supervisor_id:
+        return [employee_id.in_(direct_reports(supervisor_id))]
+    return []
@@ -0,0 +1,360 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app import live
+from app.core.config import settings
+from app.models import (
+    AttendanceBulkAction,
+    AttendanceDailyFact,
+    AttendanceLiveEvent,
+    AttendanceLiveTotals,
+    UserRole,
+)
+from app.tests.utils.team import create_attendance
+from app.tests.utils.user import create_random_user, create_user_with_headers
+
+
+def test_check_in_and_out_refresh_daily_fact(client: TestClient, db: Session) -> None:
+    supervisor, _ = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    laborer, headers = create_user_with_headers(
+        client=client, db=db, supervisor_id=supervisor.id
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/attendance/",
+        headers=headers,
+        json={"check_in": datetime.utcnow().isoformat(), "break_duration": 0},
+    )
+    assert r.status_code == 200
+    attendance_id = r.json()["id"]
+
+    fact = db.exec(
+        select(AttendanceDailyFact).where(AttendanceDailyFact.employee_id == laborer.id)
+    ).one()
+    assert fact.checked_out is False
+
+    r = client.post(
+        f"{settings.API_V1_STR}/attendance/check-out/{attendance_id}",
+        headers=headers,
+    )
+    assert r.status_code == 200
+    db.refresh(fact)
+    assert fact.checked_out is True
+
+
+def test_duplicate_check_in(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client=client, db=db)
+    data = {"check_in": datetime.utcnow().isoformat()}
+    r = client.post(f"{settings.API_V1_STR}/attendance/", headers=headers, json=data)
+    assert r.status_code == 200
+    r = client.post(f"{settings.API_V1_STR}/attendance/", headers=headers, json=data)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Attendance already recorded for today"
+
+
+def test_read_attendance_keyset_pagination(client: TestClient, db: Session) -> None:
+    laborer, headers = create_user_with_headers(client=client, db=db)
+    for day in range(1, 6):
+        create_attendance(db, employee=laborer, day=datetime(2025, 5, day))
+
+    url = f"{settings.API_V1_STR}/attendance/"
+    r = client.get(url, headers=headers, params={"limit": 2})
+    page = r.json()
+    assert page["count"] == 5
+    dates = [record["date"] for record in page["data"]]
+    while page["next_cursor"]:
+        r = client.get(
+            url,
+            headers=headers,
+            params={"limit": 2, "cursor": page["next_cursor"], "count_mode": "none"},
+        )
+        assert r.status_code == 200
+        page = r.json()
+        assert page["count"] is None
+        dates += [record["date"] for record in page["data"]]
+    assert dates == sorted(dates, reverse=True)
+    assert len(set(dates)) == 5
+
+    r = client.get(url, headers=headers, params={"count_mode": "estimated"})
+    assert isinstance(r.json()["count"], int)
+
+    r = client.get(url, headers=headers, params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_export_attendance(client: TestClient, db: Session) -> None:
+    laborer, headers = create_user_with_headers(client=client, db=db)
+    other, _ = create_user_with_headers(client=client, db=db)
+    for day in range(1, 4):
+        create_attendance(db, employee=laborer, day=datetime(2025, 6, day))
+    create_attendance(db, employee=other, day=datetime(2025, 6, 1))
+
+    url = f"{settings.API_V1_STR}/attendance/export"
+    r = client.get(url, headers=headers, params={"format": "ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert len(rows) == 3
+    assert {row["employee_id"] for row in rows} == {str(laborer.id)}
+
+    r = client.get(
+        url, headers=headers, params={"start_date": "2025-06-02", "format": "csv"}
+    )
+    assert r.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [row["date"][:10] for row in rows] == ["2025-06-03", "2025-06-02"]
+
+
+def test_bulk_check_in_and_out(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    first = create_random_user(db, supervisor_id=supervisor.id)
+    second = create_random_user(db, supervisor_id=supervisor.id)
+    other_team = create_random_user(db)
+    day = days_ago(2)
+    create_attendance(db, employee=second, day=day, hours=None)
+
+    url = f"{settings.API_V1_STR}/attendance/bulk"
+    badge_time = day.replace(hour=6).isoformat()
+    r = client.post(
+        url,
+        headers=headers,
+        json={
+            "entries": [
+                {"employee_id": str(first.id), "timestamp": badge_time},
+                {"employee_id": str(second.id), "timestamp": badge_time},
+                {"employee_id": str(other_team.id), "timestamp": badge_time},
+                {"employee_id": str(first.id), "timestamp": badge_time},
+            ]
+        },
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert [row["status"] for row in result["data"]] == [
+        "success",
+        "duplicate",
+        "forbidden",
+        "duplicate",
+    ]
+    assert result["succeeded"] == 1
+    assert result["data"][0]["attendance_id"]
+    fact = db.exec(
+        select(AttendanceDailyFact).where(AttendanceDailyFact.employee_id == first.id)
+    ).one()
+    assert fact.checked_out is False
+
+    third = create_random_user(db, supervisor_id=supervisor.id)
+    badge_time = day.replace(hour=15).isoformat()
+    r = client.post(
+        url,
+        headers=headers,
+        json={
+            "action": "check_out",
+            "entries": [
+                {"employee_id": str(first.id), "timestamp": badge_time},
+                {"employee_id": str(third.id), "timestamp": badge_time},
+            ],
+        },
+    )
+    assert r.status_code == 200
+    assert [row["status"] for row in r.json()["data"]] == [
+        "success",
+        "not_checked_in",
+    ]
+    db.refresh(fact)
+    assert fact.checked_out is True
+    assert fact.net_minutes == 9 * 60
+
+    r = client.post(
+        url,
+        headers=headers,
+        json={
+            "action": "check_out",
+            "entries": [{"employee_id": str(first.id), "timestamp": badge_time}],
+        },
+    )
+    assert r.json()["data"][0]["status"] == "duplicate"
+
+
+def days_ago(days: int) -> datetime:
+    # Bulk badge times must be recent
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days)
+
+
+def test_bulk_check_out_after_midnight(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    night_shift = create_random_user(db, supervisor_id=supervisor.id)
+    day = days_ago(2)
+    url = f"{settings.API_V1_STR}/attendance/bulk"
+    r = client.post(
+        url,
+        headers=headers,
+        json={
+            "entries": [
+                {
+                    "employee_id": str(night_shift.id),
+                    "timestamp": day.replace(hour=22).isoformat(),
+                },
+                {
+                    "employee_id": str(night_shift.id),
+                    "timestamp": days_ago(30).isoformat(),
+                },
+                {
+                    "employee_id": str(night_shift.id),
+                    "timestamp": (datetime.utcnow() + timedelta(hours=1)).isoformat(),
+                },
+            ]
+        },
+    )
+    assert [row["status"] for row in r.json()["data"]] == [
+        "success",
+        "invalid",
+        "invalid",
+    ]
+    attendance_id = r.json()["data"][0]["attendance_id"]
+
+    r = client.post(
+        url,
+        headers=headers,
+        json={
+            "action": "check_out",
+            "entries": [
+                {
+                    "employee_id": str(night_shift.id),
+                    "timestamp": (day + timedelta(days=1, hours=6)).isoformat(),
+                }
+            ],
+        },
+    )
+    result = r.json()["data"][0]
+    assert result["status"] == "success"
+    assert result["attendance_id"] == attendance_id
+    fact = db.exec(
+        select(AttendanceDailyFact).where(
+            AttendanceDailyFact.employee_id == night_shift.id
+        )
+    ).one()
+    assert fact.checked_out is True
+    assert fact.net_minutes == 8 * 60
+
+
+def test_bulk_attendance_laborer_forbidden(client: TestClient, db: Session) -> None:
+    laborer, headers = create_user_with_headers(client=client, db=db)
+    r = client.post(
+        f"{settings.API_V1_STR}/attendance/bulk",
+        headers=headers,
+        json={"entries": [{"employee_id": str(laborer.id)}]},
+    )
+    assert r.status_code == 403
+
+
+def test_reassigned_laborer_forbidden(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    laborer = create_random_user(db, supervisor_id=supervisor.id)
+    url = f"{settings.API_V1_STR}/attendance/?employee_id={laborer.id}"
+    assert client.get(url, headers=headers).status_code == 200
+
+    # Moved to another supervisor without going through the API
+    laborer.supervisor_id = create_random_user(db, role=UserRole.SUPERVISOR).id
+    db.add(laborer)
+    db.commit()
+    assert client.get(url, headers=headers).status_code == 403
+    r = client.post(
+        f"{settings.API_V1_STR}/attendance/bulk",
+        headers=headers,
+        json={"entries": [{"employee_id": str(laborer.id)}]},
+    )
+    assert r.json()["data"][0]["status"] == "forbidden"
+
+
+def test_live_attendance_laborer_forbidden(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client=client, db=db, role=UserRole.LABORER)
+    r = client.get(f"{settings.API_V1_STR}/attendance/live", headers=headers)
+    assert r.status_code == 403
+
+
+def test_check_in_publishes_live_event(client: TestClient, db: Session) -> None:
+    supervisor = create_random_user(db, role=UserRole.SUPERVISOR)
+    laborer, headers = create_user_with_headers(
+        client=client, db=db, supervisor_id=supervisor.id
+    )
+
+    async def check_in() -> list[AttendanceLiveEvent | None]:
+        team = live.broker.subscribe(supervisor.id)
+        other_team = live.broker.subscribe(uuid.uuid4())
+        try:
+            r = await asyncio.to_thread(
+                client.post,
+                f"{settings.API_V1_STR}/attendance/",
+                headers=headers,
+                json={"check_in": datetime.utcnow().isoformat()},
+            )
+            assert r.status_code == 200
+            return [
+                await asyncio.wait_for(team.queue.get(), 5),
+                None if other_team.queue.empty() else other_team.queue.get_nowait(),
+            ]
+        finally:
+            live.broker.unsubscribe(team)
+            live.broker.unsubscribe(other_team)
+
+    team_event, other_event = asyncio.run(check_in())
+    assert team_event is not None
+    assert team_event.action == AttendanceBulkAction.CHECK_IN
+    assert team_event.employee_id == laborer.id
+    assert team_event.date == datetime.utcnow().date()
+    assert other_event is None
+
+
+def test_live_stream_keeps_running_totals() -> None:
+    today = date(2025, 6, 2)
+
+    def live_event(action: AttendanceBulkAction, day: date) -> AttendanceLiveEvent:
+        return AttendanceLiveEvent(
+            action=action,
+            attendance_id=uuid.uuid4(),
+            employee_id=uuid.uuid4(),
+            date=day,
+            time=datetime.combine(day, datetime.min.time()),
+        )
+
+    async def read_stream() -> list[str]:
+        subscription = live.broker.subscribe(None)
+        for event in [
+            live_event(AttendanceBulkAction.CHECK_IN, today),
+            live_event(AttendanceBulkAction.CHECK_OUT, today),
+            live_event(AttendanceBulkAction.CHECK_IN, date(2025, 6, 3)),
+            None,
+        ]:
+            subscription.queue.put_nowait(event)
+        totals = AttendanceLiveTotals(date=today, checked_in=4, checked_out=1)
+        return [message async for message in live.stream(subscription, totals)]
+
+    messages = asyncio.run(read_stream())
+    totals = [
+        json.loads(message.split("data: ")[1])
+        for message in messages
+        if message.startswith("event: totals")
+    ]
+    assert [(t["date"], t["checked_in"], t["checked_out"]) for t in totals] == [
+        ("2025-06-02", 4, 1),
+        ("2025-06-02", 5, 1),
+        ("2025-06-02", 5, 2),
+        ("2025-06-03", 1, 0),
+    ]
+    assert messages[1].startswith("event: check_in\n")
+    assert len(live.broker) == 0
@@ -0,0 +1,188 @@
+import uuid
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import LeaveStatus, UserRole
+from app.tests.utils.team import create_leave, create_team_member
+from app.tests.utils.user import create_user_with_headers
+
+
+def test_create_leave_request_rejects_overlap(client: TestClient, db: Session) -> None:
+    supervisor, _ = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    laborer, headers = create_user_with_headers(
+        client=client, db=db, supervisor_id=supervisor.id
+    )
+    existing = create_leave(
+        db, employee=laborer, start=datetime(2025, 9, 1), end=datetime(2025, 9, 5)
+    )
+    create_leave(
+        db,
+        employee=laborer,
+        start=datetime(2025, 9, 10),
+        end=datetime(2025, 9, 12),
+        status=LeaveStatus.REJECTED,
+    )
+    url = f"{settings.API_V1_STR}/leave-requests/"
+
+    def request(start: str, end: str) -> dict[str, str]:
+        return {
+            "leave_type": "vacation",
+            "start_date": start,
+            "end_date": end,
+            "reason": "test",
+        }
+
+    r = client.post(
+        url, headers=headers, json=request("2025-09-05T00:00:00", "2025-09-08T00:00:00")
+    )
+    assert r.status_code == 409
+    assert str(existing.id) in r.json()["detail"]
+
+    # Rejected requests don't block the days
+    r = client.post(
+        url, headers=headers, json=request("2025-09-06T00:00:00", "2025-09-12T00:00:00")
+    )
+    assert r.status_code == 200
+
+    r = client.post(
+        url, headers=headers, json=request("2025-10-05T00:00:00", "2025-10-01T00:00:00")
+    )
+    assert r.status_code == 400
+
+
+def test_leave_calendar(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    north = create_team_member(db, supervisor=supervisor, site_location="North")
+    south = create_team_member(db, supervisor=supervisor, site_location="South")
+    outsider = create_team_member(
+        db,
+        supervisor=create_user_with_headers(
+            client=client, db=db, role=UserRole.SUPERVISOR
+        )[0],
+    )
+    leave = create_leave(
+        db, employee=north, start=datetime(2025, 10, 30), end=datetime(2025, 11, 2)
+    )
+    create_leave(
+        db,
+        employee=south,
+        start=datetime(2025, 11, 2),
+        end=datetime(2025, 11, 3),
+        status=LeaveStatus.PENDING,
+    )
+    create_leave(
+        db,
+        employee=south,
+        start=datetime(2025, 11, 1),
+        end=datetime(2025, 11, 1),
+        status=LeaveStatus.REJECTED,
+    )
+    create_leave(
+        db, employee=outsider, start=datetime(2025, 11, 1), end=datetime(2025, 11, 3)
+    )
+    url = f"{settings.API_V1_STR}/leave-requests/calendar"
+    params = {"start_date": "2025-11-01", "end_date": "2025-11-04"}
+
+    r = client.get(url, headers=headers, params=params)
+    assert r.status_code == 200
+    days = {day["date"]: day["employees"] for day in r.json()["data"]}
+    assert list(days) == ["2025-11-01", "2025-11-02", "2025-11-03", "2025-11-04"]
+    assert [entry["employee_id"] for entry in days["2025-11-01"]] == [str(north.id)]
+    assert days["2025-11-01"][0]["leave_request_id"] == str(leave.id)
+    assert {entry["employee_id"] for entry in days["2025-11-02"]} == {
+        str(north.id),
+        str(south.id),
+    }
+    assert [entry["status"] for entry in days["2025-11-03"]] == ["pending"]
+    assert days["2025-11-04"] == []
+
+    r = client.get(url, headers=headers, params={**params, "site_location": "South"})
+    days = {day["date"]: day["employees"] for day in r.json()["data"]}
+    assert days["2025-11-01"] == []
+    assert [entry["employee_id"] for entry in days["2025-11-02"]] == [str(south.id)]
+
+    r = client.get(
+        url,
+        headers=headers,
+        params={"start_date": "2025-01-01", "end_date": "2025-12-31"},
+    )
+    assert r.status_code == 400
+
+
+def test_update_leave_requests_batch(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    member = create_team_member(db, supervisor=supervisor)
+    outsider = create_team_member(
+        db,
+        supervisor=create_user_with_headers(
+            client=client, db=db, role=UserRole.SUPERVISOR
+        )[0],
+    )
+    first, second, third, fourth = (
+        create_leave(
+            db,
+            employee=member,
+            start=datetime(2025, 12, day),
+            end=datetime(2025, 12, day),
+            status=LeaveStatus.PENDING,
+        )
+        for day in (1, 3, 5, 7)
+    )
+    other = create_leave(
+        db,
+        employee=outsider,
+        start=datetime(2025, 12, 1),
+        end=datetime(2025, 12, 1),
+        status=LeaveStatus.PENDING,
+    )
+    missing = uuid.uuid4()
+
+    r = client.put(
+        f"{settings.API_V1_STR}/leave-requests/batch",
+        headers=headers,
+        json={
+            "entries": [
+                {"id": str(first.id), "status": "approved"},
+                {
+                    "id": str(second.id),
+                    "status": "rejected",
+                    "supervisor_comments": "No",
+                },
+                {"id": str(third.id), "status": "approved"},
+                {"id": str(first.id), "status": "rejected"},
+                {"id": str(other.id), "status": "approved"},
+                {"id": str(missing), "status": "approved"},
+                {"id": str(fourth.id), "status": "pending"},
+            ]
+        },
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert [result["status"] for result in content["data"]] == [
+        "success",
+        "success",
+        "success",
+        "duplicate",
+        "forbidden",
+        "not_found",
+        "invalid",
+    ]
+    assert content["succeeded"] == 3
+
+    for leave_request in (first, second, third, fourth, other):
+        db.refresh(leave_request)
+    assert first.status == LeaveStatus.APPROVED
+    assert second.status == LeaveStatus.REJECTED
+    assert second.supervisor_comments == "No"
+    assert third.status == LeaveStatus.APPROVED
+    assert fourth.status == LeaveStatus.PENDING
+    assert other.status == LeaveStatus.PENDING
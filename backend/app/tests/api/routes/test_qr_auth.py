@@ -0,0 +1,151 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+import psycopg
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.routes import qr_auth
+from app.core.config import settings
+from app.qr_codes import QR_CODE_CHANNEL, MemoryQRCodeStore, SignedQRCodeStore
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def test_validate_qr_code(client: TestClient, db: Session) -> None:
+    employee_id = random_lower_string()[:20]
+    create_random_user(db, employee_id=employee_id)
+    code = client.post(f"{settings.API_V1_STR}/qr-auth/generate").json()["code"]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/qr-auth/validate",
+        params={"qr_code": code, "employee_id": employee_id},
+    )
+    assert r.status_code == 200
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    r = client.post(f"{settings.API_V1_STR}/login/test-token", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["employee_id"] == employee_id
+
+    r = client.post(
+        f"{settings.API_V1_STR}/qr-auth/validate",
+        params={"qr_code": code, "employee_id": employee_id},
+    )
+    assert r.status_code == 401
+    assert r.json()["detail"] == "QR code already used"
+
+
+def test_qr_code_status_after_use(client: TestClient, db: Session) -> None:
+    employee_id = random_lower_string()[:20]
+    create_random_user(db, employee_id=employee_id)
+    code = client.post(f"{settings.API_V1_STR}/qr-auth/generate").json()["code"]
+    url = f"{settings.API_V1_STR}/qr-auth/status/{code}"
+
+    r = client.get(url)
+    assert r.json()["valid"] is True
+    assert 0 < r.json()["remaining_seconds"] <= settings.QR_CODE_EXPIRE_SECONDS
+
+    r = client.post(
+        f"{settings.API_V1_STR}/qr-auth/validate",
+        params={"qr_code": code, "employee_id": employee_id},
+    )
+    assert r.status_code == 200
+    assert client.get(url).json() == {"valid": False, "message": "QR code already used"}
+
+
+def test_validate_qr_code_unknown_code(client: TestClient, db: Session) -> None:
+    employee_id = random_lower_string()[:20]
+    create_random_user(db, employee_id=employee_id)
+    r = client.post(
+        f"{settings.API_V1_STR}/qr-auth/validate",
+        params={"qr_code": random_lower_string(), "employee_id": employee_id},
+    )
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Invalid QR code"
+
+
+def test_memory_qr_code_store() -> None:
+    # The memory store doesn't use the session
+    session: Any = None
+
+    async def scan_concurrently() -> None:
+        store = MemoryQRCodeStore(maxsize=2)
+        first = await store.issue(session)
+        second = await store.issue(session)
+        third = await store.issue(session)
+        # The oldest code is dropped beyond maxsize
+        assert await store.get(session, first.code) is None
+
+        scans = await asyncio.gather(
+            *[store.consume(session, second.code) for _ in range(5)]
+        )
+        assert sum(scan is not None for scan in scans) == 1
+
+        second.expires_at = third.expires_at = datetime.utcnow() - timedelta(1)
+        assert await store.consume(session, third.code) is None
+        assert await store.purge() == 2
+        assert len(store) == 0
+
+    asyncio.run(scan_concurrently())
+
+
+def test_signed_qr_code_single_use(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(qr_auth, "qr_code_store", SignedQRCodeStore())
+    employee_id = random_lower_string()[:20]
+    create_random_user(db, employee_id=employee_id)
+    code = client.post(f"{settings.API_V1_STR}/qr-auth/generate").json()["code"]
+    assert client.get(f"{settings.API_V1_STR}/qr-auth/status/{code}").json()["valid"]
+
+    params = {"qr_code": code, "employee_id": employee_id}
+    r = client.post(f"{settings.API_V1_STR}/qr-auth/validate", params=params)
+    assert r.status_code == 200
+    r = client.post(f"{settings.API_V1_STR}/qr-auth/validate", params=params)
+    assert r.status_code == 401
+    assert r.json()["detail"] == "QR code already used"
+
+    # Another worker only has the database to tell it the code was used
+    monkeypatch.setattr(qr_auth, "qr_code_store", SignedQRCodeStore())
+    r = client.post(f"{settings.API_V1_STR}/qr-auth/validate", params=params)
+    assert r.status_code == 401
+
+    # A tampered code fails the signature check
+    params["qr_code"] = code[:-4] + "AAAA"
+    r = client.post(f"{settings.API_V1_STR}/qr-auth/validate", params=params)
+    assert r.json()["detail"] == "Invalid QR code"
+
+
+def test_signed_qr_code_use_announced_to_other_workers(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(qr_auth, "qr_code_store", SignedQRCodeStore())
+    employee_id = random_lower_string()[:20]
+    create_random_user(db, employee_id=employee_id)
+    code = client.post(f"{settings.API_V1_STR}/qr-auth/generate").json()["code"]
+
+    with psycopg.connect(
+        host=settings.POSTGRES_SERVER,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        dbname=settings.POSTGRES_DB,
+        autocommit=True,
+    ) as conn:
+        conn.execute(f'LISTEN "{QR_CODE_CHANNEL}"')
+        r = client.post(
+            f"{settings.API_V1_STR}/qr-auth/validate",
+            params={"qr_code": code, "employee_id": employee_id},
+        )
+        assert r.status_code == 200
+        nonces = [message.payload for message in conn.notifies(timeout=5, stop_after=1)]
+
+    # What the other worker's listener does; its polls then need no query
+    other = SignedQRCodeStore()
+    for nonce in nonces:
+        other.mark_used(nonce)
+    monkeypatch.setattr(qr_auth, "qr_code_store", other)
+    r = client.get(f"{settings.API_V1_STR}/qr-auth/status/{code}")
+    assert r.json() == {"valid": False, "message": "QR code already used"}
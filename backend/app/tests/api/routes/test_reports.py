@@ -0,0 +1,257 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import LeaveStatus, TeamAssignment, UserRole
+from app.tests.utils.team import create_attendance, create_leave, create_team_member
+from app.tests.utils.user import create_random_user, create_user_with_headers
+from app.tests.utils.utils import random_lower_string
+
+
+def test_team_performance(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    team_name = random_lower_string()
+    first = create_team_member(
+        db, supervisor=supervisor, team_name=team_name, site_location="North"
+    )
+    second = create_team_member(
+        db, supervisor=supervisor, team_name=team_name, site_location="North"
+    )
+    create_attendance(
+        db, employee=first, day=datetime(2025, 3, 3), hours=9, break_duration=30
+    )
+    create_attendance(db, employee=first, day=datetime(2025, 3, 4), hours=8)
+    create_attendance(db, employee=first, day=datetime(2025, 3, 5), hours=None)
+    create_attendance(db, employee=second, day=datetime(2025, 2, 27), hours=8)
+    create_leave(
+        db, employee=second, start=datetime(2025, 3, 5), end=datetime(2025, 3, 7)
+    )
+    create_leave(
+        db,
+        employee=second,
+        start=datetime(2025, 3, 10),
+        end=datetime(2025, 3, 10),
+        status=LeaveStatus.REJECTED,
+    )
+
+    r = client.get(
+        f"{settings.API_V1_STR}/reports/team-performance",
+        headers=headers,
+        params={"start_date": "2025-03-01", "end_date": "2025-03-31"},
+    )
+    assert r.status_code == 200
+    teams = r.json()["teams"]
+    assert len(teams) == 1
+    team = teams[0]
+    assert team["team_name"] == team_name
+    assert team["site_location"] == "North"
+    assert team["supervisor_id"] == str(supervisor.id)
+    assert team["member_count"] == 2
+    assert team["total_attendance_days"] == 3
+    assert team["total_hours_worked"] == 16.5
+    assert team["total_leave_days"] == 3
+    assert team["average_hours_per_member"] == 8.25
+    members = {m["employee_id"]: m for m in team["members"]}
+    assert members[str(first.id)]["attendance_days"] == 3
+    assert members[str(first.id)]["hours_worked"] == 16.5
+    assert members[str(first.id)]["leave_days"] == 0
+    assert members[str(second.id)]["attendance_days"] == 0
+    assert members[str(second.id)]["hours_worked"] == 0
+    assert members[str(second.id)]["leave_days"] == 3
+
+
+def test_team_performance_laborer_forbidden(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client=client, db=db)
+    r = client.get(
+        f"{settings.API_V1_STR}/reports/team-performance",
+        headers=headers,
+        params={"start_date": "2025-03-01", "end_date": "2025-03-31"},
+    )
+    assert r.status_code == 403
+
+
+def test_attendance_summary(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    first = create_team_member(db, supervisor=supervisor)
+    second = create_team_member(db, supervisor=supervisor)
+    create_attendance(
+        db, employee=first, day=datetime(2025, 4, 1), hours=9, break_duration=60
+    )
+    create_attendance(db, employee=second, day=datetime(2025, 4, 1), hours=None)
+    create_attendance(db, employee=first, day=datetime(2025, 4, 2), hours=6)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/reports/attendance-summary",
+        headers=headers,
+        params={"start_date": "2025-04-01", "end_date": "2025-04-30"},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["summary"] == {
+        "total_attendance_records": 3,
+        "unique_employees": 2,
+        "total_hours_worked": 14.0,
+        "average_daily_attendance": 1.5,
+    }
+    first_day, second_day = content["daily_breakdown"]
+    assert first_day["date"].startswith("2025-04-01")
+    assert first_day["employees_present"] == 2
+    assert first_day["employees_checked_out"] == 1
+    assert first_day["total_hours_worked"] == 8.0
+    assert first_day["average_hours_per_employee"] == 4.0
+    assert second_day["employees_present"] == 1
+    assert second_day["total_hours_worked"] == 6.0
+
+
+def test_attendance_summary_admin_filters_by_supervisor(
+    client: TestClient, db: Session
+) -> None:
+    _, headers = create_user_with_headers(client=client, db=db, role=UserRole.ADMIN)
+    supervisor, _ = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    other_supervisor, _ = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    member = create_team_member(db, supervisor=supervisor)
+    other = create_team_member(db, supervisor=other_supervisor)
+    create_attendance(db, employee=member, day=datetime(2025, 5, 5))
+    create_attendance(db, employee=other, day=datetime(2025, 5, 5))
+
+    r = client.get(
+        f"{settings.API_V1_STR}/reports/attendance-summary",
+        headers=headers,
+        params={
+            "start_date": "2025-05-05",
+            "end_date": "2025-05-05",
+            "supervisor_id": str(supervisor.id),
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["summary"]["total_attendance_records"] == 1
+
+
+def test_attendance_summary_filters_on_current_team(
+    client: TestClient, db: Session
+) -> None:
+    _, headers = create_user_with_headers(client=client, db=db, role=UserRole.ADMIN)
+    supervisor = create_random_user(db, role=UserRole.SUPERVISOR)
+    old_team, new_team = random_lower_string(), random_lower_string()
+    laborer = create_team_member(db, supervisor=supervisor, team_name=old_team)
+    create_attendance(db, employee=laborer, day=datetime(2025, 6, 2))
+
+    # Reassigning doesn't touch the fact rows already written
+    assignment = db.exec(
+        select(TeamAssignment).where(TeamAssignment.laborer_id == laborer.id)
+    ).one()
+    assignment.is_active = False
+    db.add(assignment)
+    db.add(
+        TeamAssignment(
+            team_name=new_team,
+            supervisor_id=supervisor.id,
+            laborer_id=laborer.id,
+        )
+    )
+    db.commit()
+
+    def records(team_name: str) -> int:
+        r = client.get(
+            f"{settings.API_V1_STR}/reports/attendance-summary",
+            headers=headers,
+            params={
+                "start_date": "2025-06-02",
+                "end_date": "2025-06-02",
+                "team_name": team_name,
+            },
+        )
+        assert r.status_code == 200
+        return int(r.json()["summary"]["total_attendance_records"])
+
+    assert records(new_team) == 1
+    assert records(old_team) == 0
+
+
+def test_dashboard_stats_refresh_after_check_in(
+    client: TestClient, db: Session
+) -> None:
+    supervisor, supervisor_headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    _, laborer_headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.LABORER, supervisor_id=supervisor.id
+    )
+    create_team_member(db, supervisor=supervisor)
+    url = f"{settings.API_V1_STR}/reports/dashboard-stats"
+
+    r = client.get(url, headers=supervisor_headers)
+    assert r.status_code == 200
+    assert r.json()["team_members"] == 2
+    assert r.json()["today_team_attendance"] == 0
+    r = client.get(url, headers=laborer_headers)
+    assert r.json()["today_checked_in"] is False
+
+    r = client.post(
+        f"{settings.API_V1_STR}/attendance/",
+        headers=laborer_headers,
+        json={"check_in": datetime.utcnow().isoformat(), "break_duration": 0},
+    )
+    assert r.status_code == 200
+
+    # The cached dashboards of the laborer and their supervisor are dropped
+    content = client.get(url, headers=laborer_headers).json()
+    assert content["today_checked_in"] is True
+    assert content["today_checked_out"] is False
+    assert content["month_attendance_days"] == 1
+    content = client.get(url, headers=supervisor_headers).json()
+    assert content["today_team_attendance"] == 1
+    assert content["team_attendance_rate"] == 50.0
+
+
+def test_leave_summary(client: TestClient, db: Session) -> None:
+    supervisor, headers = create_user_with_headers(
+        client=client, db=db, role=UserRole.SUPERVISOR
+    )
+    member = create_team_member(db, supervisor=supervisor)
+    # Four days, two of them inside the window
+    create_leave(
+        db, employee=member, start=datetime(2025, 7, 30), end=datetime(2025, 8, 2)
+    )
+    create_leave(
+        db, employee=member, start=datetime(2025, 8, 10), end=datetime(2025, 8, 12)
+    )
+    create_leave(
+        db,
+        employee=member,
+        start=datetime(2025, 8, 20),
+        end=datetime(2025, 8, 21),
+        status=LeaveStatus.PENDING,
+    )
+    url = f"{settings.API_V1_STR}/reports/leave-summary"
+    params = {"start_date": "2025-08-01", "end_date": "2025-08-31"}
+
+    r = client.get(url, headers=headers, params={**params, "limit": 2})
+    assert r.status_code == 200
+    content = r.json()
+    assert content["summary"] == {
+        "total_requests": 3,
+        "approved_leave_days": 5,
+        "status_breakdown": {"approved": 2, "pending": 1},
+        "leave_type_breakdown": {"sick": 3},
+    }
+    assert len(content["requests"]) == 2
+
+    r = client.get(
+        url, headers=headers, params={**params, "cursor": content["next_cursor"]}
+    )
+    assert [request["status"] for request in r.json()["requests"]] == ["pending"]
+
+    r = client.get(url, headers=headers, params={**params, "include_requests": False})
+    assert r.json()["requests"] is None
+    assert r.json()["summary"]["total_requests"] == 3
@@ -5,9 +5,11 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app import crud
+from app.core.cache import user_cache
 from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User, UserCreate
+from app.tests.utils.user import user_authentication_headers
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -484,3 +486,102 @@ def test_delete_user_without_privileges(
     )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+def test_cached_user_invalidated_on_update(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=username, password=password, full_name="Cached")
+    user = crud.create_user(session=db, user_create=user_in)
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    assert str(user.id) in user_cache._data
+    # Served from the cache, fields outside it still load
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.json()["full_name"] == "Cached"
+    assert r.json()["email"] == username
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
+
+
+def test_cached_user_invalidated_on_delete(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=username, password=password)
+    user = crud.create_user(session=db, user_create=user_in)
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/users/{user.id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 404
+
+
+def test_import_users(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    existing = random_email()
+    crud.create_user(
+        session=db,
+        user_create=UserCreate(email=existing, password=random_lower_string()),
+    )
+    new, password = random_email(), random_lower_string()
+    content = "\n".join(
+        [
+            "email,password,full_name,role,supervisor_id",
+            f"{new},{password},New Laborer,laborer",
+            f"{existing},{random_lower_string()},,laborer",
+            f"not-an-email,{random_lower_string()},,laborer",
+            f"{new},{random_lower_string()},Twice,laborer",
+            f"{random_email()},{random_lower_string()},,laborer,{uuid.uuid4()}",
+        ]
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/users/import",
+        headers=superuser_token_headers,
+        files={"file": ("users.csv", content, "text/csv")},
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert result["created"] == 1
+    assert [error["line"] for error in result["errors"]] == [3, 4, 5, 6]
+    assert result["errors"][1]["errors"][0].startswith("email:")
+    assert result["errors"][3]["errors"][0].startswith("supervisor_id:")
+
+    user = crud.get_user_by_email(session=db, email=new)
+    assert user
+    assert user.full_name == "New Laborer"
+    assert verify_password(password, user.hashed_password)
+
+
+def test_import_users_by_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/users/import",
+        headers=normal_user_token_headers,
+        files={"file": ("users.csv", "email,password\n", "text/csv")},
+    )
+    assert r.status_code == 403
@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_db_pool_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["sync"]["pool"] == "MeasuredQueuePool"
+    assert stats["sync"]["checkouts"] > 0
+    assert stats["sync"]["checked_out"] >= 0
+    assert stats["async"]["pool"] == "MeasuredAsyncQueuePool"
+
+
+def test_db_pool_stats_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
@@ -0,0 +1,33 @@
+import json
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import Worker
+from app.tests.utils.user import create_user_with_headers
+
+
+def test_import_workers(client: TestClient, db: Session) -> None:
+    owner, headers = create_user_with_headers(client=client, db=db)
+    lines = [
+        json.dumps({"name": "Ravi", "department": "Masonry"}),
+        "",
+        json.dumps({"department": "Masonry"}),
+        "{not json",
+        json.dumps({"name": "Sunita", "ifscode": "SBIN0001234"}),
+    ]
+    r = client.post(
+        f"{settings.API_V1_STR}/workers/import",
+        headers=headers,
+        params={"format": "jsonl"},
+        files={"file": ("workers.jsonl", "\n".join(lines), "application/x-ndjson")},
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert result["created"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+    assert result["errors"][1]["errors"][0].startswith("Invalid JSON")
+
+    workers = db.exec(select(Worker).where(Worker.owner_id == owner.id)).all()
+    assert sorted(worker.name for worker in workers) == ["Ravi", "Sunita"]
@@ -7,7 +7,15 @@ from sqlmodel import Session, delete
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
-from app.models import Item, User
+from app.models import (
+    Attendance,
+    AttendanceDailyFact,
+    Item,
+    LeaveRequest,
+    TeamAssignment,
+    User,
+    Worker,
+)
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
 
@@ -17,8 +25,18 @@ def db() -> Generator[Session, None, None]:
     with Session(engine) as session:
         init_db(session)
         yield session
+        statement = delete(AttendanceDailyFact)
+        session.execute(statement)
+        statement = delete(Attendance)
+        session.execute(statement)
+        statement = delete(LeaveRequest)
+        session.execute(statement)
+        statement = delete(TeamAssignment)
+        session.execute(statement)
         statement = delete(Item)
         session.execute(statement)
+        statement = delete(Worker)
+        session.execute(statement)
         statement = delete(User)
         session.execute(statement)
         session.commit()
@@ -0,0 +1,131 @@
+import smtplib
+from datetime import datetime
+from typing import Any
+
+import pytest
+from sqlmodel import Session, select
+
+from app import email_queue
+from app.core.config import settings
+from app.models import OutboundEmail, OutboundEmailStatus
+from app.tests.utils.utils import random_email
+from app.utils import send_email
+
+
+class FakeSMTPBackend:
+    """
+    Stands in for the SMTP connection; the queue only needs `sendmail` and
+    `close`.
+    """
+
+    def __init__(self, fail_for: set[str] | None = None) -> None:
+        self.fail_for = fail_for or set()
+        self.sent: list[str] = []
+        self.closed = False
+
+    def sendmail(self, from_addr: str, to_addrs: list[str], msg: Any, **_: Any) -> None:
+        if to_addrs[0] in self.fail_for:
+            raise smtplib.SMTPRecipientsRefused({to_addrs[0]: (550, b"No such user")})
+        self.sent.extend(to_addrs)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def queue(db: Session, email_to: str) -> OutboundEmail:
+    email = email_queue.enqueue(
+        db, email_to=email_to, subject="Test", html_content="<p>Test</p>"
+    )
+    db.commit()
+    return email
+
+
+def reread(db: Session, email: OutboundEmail) -> OutboundEmail:
+    # Returned rather than refreshed in place, so mypy doesn't keep assuming
+    # the values checked before the refresh
+    db.refresh(email)
+    return email
+
+
+def test_email_worker_reuses_connection(db: Session) -> None:
+    emails = [queue(db, random_email()) for _ in range(3)]
+    backends: list[FakeSMTPBackend] = []
+
+    def backend_factory() -> FakeSMTPBackend:
+        backends.append(FakeSMTPBackend())
+        return backends[-1]
+
+    worker = email_queue.EmailWorker(backend_factory)
+    # Earlier tests may have queued emails too
+    assert worker.drain() >= len(emails)
+
+    assert len(backends) == 1
+    assert {email.email_to for email in emails} <= set(backends[0].sent)
+    for email in emails:
+        db.refresh(email)
+        assert email.status == OutboundEmailStatus.SENT
+        assert email.attempts == 1
+        assert email.sent_at
+        # The body isn't kept once sent
+        assert email.html_content == ""
+
+
+def test_email_worker_retries_with_backoff(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 2)
+    email = queue(db, random_email())
+    backends: list[FakeSMTPBackend] = []
+
+    def backend_factory() -> FakeSMTPBackend:
+        backends.append(FakeSMTPBackend(fail_for={email.email_to}))
+        return backends[-1]
+
+    worker = email_queue.EmailWorker(backend_factory)
+    worker.drain()
+    email = reread(db, email)
+    assert email.status == OutboundEmailStatus.PENDING
+    assert email.attempts == 1
+    assert email.last_error and "No such user" in email.last_error
+    assert email.next_attempt_at > datetime.utcnow()
+    assert email.html_content
+    # The failed connection isn't reused
+    assert backends[-1].closed
+
+    # Due again: the second failure is the last attempt
+    email.next_attempt_at = datetime.utcnow()
+    db.add(email)
+    db.commit()
+    worker.drain()
+    email = reread(db, email)
+    assert email.status == OutboundEmailStatus.FAILED
+    assert email.attempts == 2
+    assert email.html_content == ""
+
+
+def test_retry_delay_doubles_up_to_an_hour(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_SECONDS", 30)
+    assert [
+        email_queue.retry_delay(attempts).total_seconds() for attempts in (1, 2, 3)
+    ] == [30, 60, 120]
+    assert email_queue.retry_delay(20).total_seconds() == email_queue.MAX_RETRY_SECONDS
+
+
+def test_send_email_without_queue_sends_directly(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backend = FakeSMTPBackend()
+    monkeypatch.setattr(email_queue, "smtp_backend", lambda: backend)
+    monkeypatch.setattr(settings, "EMAIL_QUEUE_ENABLED", False)
+    monkeypatch.setattr(settings, "SMTP_HOST", "smtp.example.com")
+    monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "info@example.com")
+    email_to = random_email()
+
+    send_email(email_to=email_to, subject="Test", html_content="<p>Test</p>")
+
+    assert backend.sent == [email_to]
+    assert backend.closed
+    queued = db.exec(
+        select(OutboundEmail).where(OutboundEmail.email_to == email_to)
+    ).first()
+    assert queued is None
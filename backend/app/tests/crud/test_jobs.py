@@ -0,0 +1,110 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import jobs, partitions
+from app.core import db as core_db
+from app.core.config import settings
+from app.models import QRCode, TeamAssignment, UserRole
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+@pytest.fixture()
+def async_engine(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Pooled async connections belong to the app's event loop, not the test's
+    monkeypatch.setattr(
+        core_db,
+        "async_engine",
+        create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), poolclass=NullPool),
+    )
+
+
+@pytest.mark.usefixtures("async_engine")
+def test_purge_expired_qr_codes_in_batches(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "JOB_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "JOB_BATCH_PAUSE_SECONDS", 0)
+    now = datetime.utcnow()
+    expired = [
+        QRCode(code=random_lower_string(), expires_at=now - timedelta(minutes=1))
+        for _ in range(5)
+    ]
+    valid = QRCode(code=random_lower_string(), expires_at=now + timedelta(minutes=5))
+    db.add_all([*expired, valid])
+    db.commit()
+
+    assert asyncio.run(jobs.purge_expired_qr_codes()) >= len(expired)
+
+    codes = [qr_code.code for qr_code in [*expired, valid]]
+    remaining = db.exec(select(QRCode.code).where(col(QRCode.code).in_(codes))).all()
+    assert remaining == [valid.code]
+
+
+@pytest.mark.usefixtures("async_engine")
+def test_team_assignment_history_kept_by_default(db: Session) -> None:
+    supervisor = create_random_user(db, role=UserRole.SUPERVISOR)
+    laborer = create_random_user(db, supervisor_id=supervisor.id)
+    assignment = TeamAssignment(
+        team_name=random_lower_string(),
+        supervisor_id=supervisor.id,
+        laborer_id=laborer.id,
+        assigned_date=datetime.utcnow() - timedelta(days=3650),
+        is_active=False,
+    )
+    db.add(assignment)
+    db.commit()
+
+    assert settings.TEAM_ASSIGNMENT_RETENTION_DAYS is None
+    assert asyncio.run(jobs.purge_inactive_team_assignments()) == 0
+    assert db.get(TeamAssignment, assignment.id)
+
+
+def test_scheduler_runs_shared_jobs_on_leader_only() -> None:
+    ran: list[str] = []
+
+    def job(name: str) -> jobs.Job:
+        async def run() -> int:
+            ran.append(name)
+            return 1
+
+        return jobs.Job(name, interval=60, run=run, leader_only=name == "shared")
+
+    scheduler = jobs.Scheduler([job("shared"), job("local")])
+    asyncio.run(scheduler.run_due())
+    # Not due again until the interval has passed
+    asyncio.run(scheduler.run_due())
+
+    assert not scheduler.is_leader
+    assert ran == ["local"]
+    assert scheduler.jobs[1].last_rows == 1
+
+
+def test_partition_months() -> None:
+    assert partitions.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert partitions.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partitions.partition_name(date(2025, 6, 1)) == "attendance_2025_06"
+    assert partitions.partition_month("attendance_2025_06") == date(2025, 6, 1)
+    assert partitions.partition_month("attendance_default") is None
+
+
+@pytest.mark.usefixtures("async_engine")
+def test_create_attendance_partitions_ahead() -> None:
+    async def create_twice() -> tuple[int, list[str]]:
+        await partitions.create_partitions(months_ahead=6)
+        created = await partitions.create_partitions(months_ahead=6)
+        async with AsyncSession(core_db.async_engine) as session:
+            return created, await partitions.attached_partitions(session)
+
+    created, names = asyncio.run(create_twice())
+    assert created == 0
+    this_month = partitions.month_start(datetime.utcnow().date())
+    for months in range(7):
+        month = partitions.add_months(this_month, months)
+        assert partitions.partition_name(month) in names
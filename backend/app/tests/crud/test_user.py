@@ -1,9 +1,18 @@
+import time
+
+import pytest
 from fastapi.encoders import jsonable_encoder
 from sqlmodel import Session
 
-from app import crud
-from app.core.security import verify_password
-from app.models import User, UserCreate, UserUpdate
+from app import crud, scoping
+from app.core.security import (
+    HashQueueFull,
+    PasswordHasher,
+    pwd_context,
+    verify_password,
+)
+from app.models import User, UserCreate, UserRole, UserUpdate
+from app.tests.utils.user import create_random_user
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -89,3 +98,60 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_authenticate_user_rehashes_outdated_hash(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    user = crud.create_user(session=db, user_create=user_in)
+    old_hash = pwd_context.hash(password, rounds=4)
+    user.hashed_password = old_hash
+    db.add(user)
+    db.commit()
+
+    authenticated_user = crud.authenticate(session=db, email=email, password=password)
+    assert authenticated_user
+    assert authenticated_user.hashed_password != old_hash
+    assert not pwd_context.needs_update(authenticated_user.hashed_password)
+    assert verify_password(password, authenticated_user.hashed_password)
+
+
+def test_password_hasher_queue_limit() -> None:
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    try:
+        future = hasher.submit(time.sleep, 0.5)
+        with pytest.raises(HashQueueFull):
+            hasher.submit(time.sleep, 0)
+        future.result()
+        hasher.submit(time.sleep, 0).result()
+    finally:
+        hasher.shutdown()
+
+
+def test_password_hasher_batch_reserves_whole_queue() -> None:
+    hasher = PasswordHasher(workers=1, max_queue=2)
+    try:
+        future = hasher.submit(time.sleep, 0.5)
+        # Only one slot is left, so none of the batch is submitted
+        with pytest.raises(HashQueueFull):
+            hasher.submit_many(time.sleep, [(0,), (0,)])
+        future.result()
+        futures = hasher.submit_many(time.sleep, [(0,), (0,)])
+        for future in futures:
+            future.result()
+    finally:
+        hasher.shutdown()
+
+
+def test_direct_report_follows_supervisor_changes(db: Session) -> None:
+    first = create_random_user(db, role=UserRole.SUPERVISOR)
+    second = create_random_user(db, role=UserRole.SUPERVISOR)
+    laborer = create_random_user(db, supervisor_id=first.id)
+    assert scoping.is_direct_report(db, first.id, laborer.id)
+
+    crud.update_user(
+        session=db, db_user=laborer, user_in=UserUpdate(supervisor_id=second.id)
+    )
+    assert not scoping.is_direct_report(db, first.id, laborer.id)
+    assert scoping.is_direct_report(db, second.id, laborer.id)
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app import reports
+from app.models import (
+    Attendance,
+    LeaveRequest,
+    LeaveStatus,
+    TeamAssignment,
+    User,
+    UserRole,
+)
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def create_team_member(
+    db: Session,
+    *,
+    supervisor: User,
+    team_name: str | None = None,
+    site_location: str | None = None,
+) -> User:
+    laborer = create_random_user(db, role=UserRole.LABORER, supervisor_id=supervisor.id)
+    assignment = TeamAssignment(
+        team_name=team_name or random_lower_string(),
+        site_location=site_location,
+        supervisor_id=supervisor.id,
+        laborer_id=laborer.id,
+    )
+    db.add(assignment)
+    db.commit()
+    return laborer
+
+
+def create_attendance(
+    db: Session,
+    *,
+    employee: User,
+    day: datetime,
+    hours: float | None = 8,
+    break_duration: int = 0,
+) -> Attendance:
+    check_in = day.replace(hour=7)
+    attendance = Attendance(
+        employee_id=employee.id,
+        date=day,
+        check_in=check_in,
+        check_out=check_in + timedelta(hours=hours) if hours is not None else None,
+        break_duration=break_duration,
+    )
+    db.add(attendance)
+    db.flush()
+    reports.refresh_attendance_facts(
+        session=db, keys=[(attendance.employee_id, attendance.date)]
+    )
+    db.commit()
+    db.refresh(attendance)
+    return attendance
+
+
+def create_leave(
+    db: Session,
+    *,
+    employee: User,
+    start: datetime,
+    end: datetime,
+    status: LeaveStatus = LeaveStatus.APPROVED,
+) -> LeaveRequest:
+    leave_request = LeaveRequest(
+        employee_id=employee.id,
+        supervisor_id=employee.supervisor_id,
+        leave_type="sick",
+        reason="test",
+        start_date=start,
+        end_date=end,
+        status=status,
+    )
+    db.add(leave_request)
+    db.commit()
+    db.refresh(leave_request)
+    return leave_request
@@ -1,3 +1,5 @@
+from typing import Any
+
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
@@ -19,14 +21,25 @@ def user_authentication_headers(
     return headers
 
 
-def create_random_user(db: Session) -> User:
+def create_random_user(db: Session, **kwargs: Any) -> User:
     email = random_email()
     password = random_lower_string()
-    user_in = UserCreate(email=email, password=password)
+    user_in = UserCreate(email=email, password=password, **kwargs)
     user = crud.create_user(session=db, user_create=user_in)
     return user
 
 
+def create_user_with_headers(
+    *, client: TestClient, db: Session, **kwargs: Any
+) -> tuple[User, dict[str, str]]:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password, **kwargs)
+    user = crud.create_user(session=db, user_create=user_in)
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    return user, headers
+
+
 def authentication_token_from_email(
     *, client: TestClient, email: str, db: Session
 ) -> dict[str, str]:
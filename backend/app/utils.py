@@ -1,16 +1,18 @@
 import logging
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
-import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
 
+from app import email_queue
 from app.core import security
 from app.core.config import settings
+from app.models import LeaveRequest
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,12 +24,58 @@ class EmailData:
     subject: str
 
 
+EMAIL_TEMPLATES_DIR = Path(__file__).parent / "email-templates" / "build"
+
+
+class EmailTemplates:
+    """
+    The built email templates, compiled once and kept in memory. Compiled
+    code also goes to Jinja's bytecode cache on disk, so the other workers
+    and later restarts load it instead of compiling the templates again.
+    """
+
+    def __init__(self, directory: Path = EMAIL_TEMPLATES_DIR) -> None:
+        self.environment = Environment(
+            loader=FileSystemLoader(directory),
+            bytecode_cache=FileSystemBytecodeCache(),
+            # The templates ship with the code, don't stat them on every render
+            auto_reload=False,
+            cache_size=-1,
+        )
+
+    def load(self) -> int:
+        """
+        Compile every template ahead of the first email; returns how many.
+        """
+        names = self.environment.list_templates(extensions=["html"])
+        for name in names:
+            self.environment.get_template(name)
+        return len(names)
+
+    def render(self, template_name: str, context: dict[str, Any]) -> str:
+        return self.environment.get_template(template_name).render(context)
+
+    def render_many(
+        self, template_name: str, contexts: Iterable[dict[str, Any]]
+    ) -> list[str]:
+        template = self.environment.get_template(template_name)
+        return [template.render(context) for context in contexts]
+
+
+email_templates = EmailTemplates()
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
-    return html_content
+    return email_templates.render(template_name, context)
+
+
+def render_email_templates(
+    *, template_name: str, contexts: Iterable[dict[str, Any]]
+) -> list[str]:
+    """
+    Render one template for many recipients, looking it up only once.
+    """
+    return email_templates.render_many(template_name, contexts)
 
 
 def send_email(
@@ -36,23 +84,20 @@ def send_email(
     subject: str = "",
     html_content: str = "",
 ) -> None:
+    """
+    Queue an email; it is sent in the background by the email worker (see
+    app.email_queue), so callers don't wait on the SMTP server. With the
+    queue disabled it is sent before returning.
+    """
     assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=subject,
-        html=html_content,
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+    if not settings.EMAIL_QUEUE_ENABLED:
+        email_queue.send_now(
+            email_to=email_to, subject=subject, html_content=html_content
+        )
+        return
+    email_queue.queue_email(
+        email_to=email_to, subject=subject, html_content=html_content
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
-    logger.info(f"send email result: {response}")
 
 
 def generate_test_email(email_to: str) -> EmailData:
@@ -82,9 +127,7 @@ def generate_reset_password_email(email_to: str, email: str, token: str) -> Emai
     return EmailData(html_content=html_content, subject=subject)
 
 
-def generate_new_account_email(
-    email_to: str, username: str, password: str
-) -> EmailData:
+def generate_new_account_email(email_to: str, username: str) -> EmailData:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - New account for user {username}"
     html_content = render_email_template(
@@ -92,7 +135,6 @@ def generate_new_account_email(
         context={
             "project_name": settings.PROJECT_NAME,
             "username": username,
-            "password": password,
             "email": email_to,
             "link": settings.FRONTEND_HOST,
         },
@@ -100,6 +142,40 @@ def generate_new_account_email(
     return EmailData(html_content=html_content, subject=subject)
 
 
+def generate_leave_decision_emails(
+    recipients: Iterable[tuple[str, str, LeaveRequest]],
+) -> list[EmailData]:
+    """
+    The decision email for each (email_to, username, leave_request).
+    """
+    project_name = settings.PROJECT_NAME
+    subjects = []
+    contexts = []
+    for email_to, username, leave_request in recipients:
+        status = leave_request.status.value
+        subjects.append(f"{project_name} - Leave request {status}")
+        contexts.append(
+            {
+                "project_name": settings.PROJECT_NAME,
+                "username": username,
+                "email": email_to,
+                "status": status,
+                "leave_type": leave_request.leave_type,
+                "start_date": leave_request.start_date.date().isoformat(),
+                "end_date": leave_request.end_date.date().isoformat(),
+                "supervisor_comments": leave_request.supervisor_comments,
+                "link": settings.FRONTEND_HOST,
+            }
+        )
+    html_contents = render_email_templates(
+        template_name="leave_decision.html", contexts=contexts
+    )
+    return [
+        EmailData(html_content=html_content, subject=subject)
+        for html_content, subject in zip(html_contents, subjects, strict=True)
+    ]
+
+
 def generate_password_reset_token(email: str) -> str:
     delta = timedelta(hours=settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS)
     now = datetime.now(timezone.utc)